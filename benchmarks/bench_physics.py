@@ -0,0 +1,276 @@
+"""Headless benchmarks for the physics core.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_physics                  # everything
+    python -m benchmarks.bench_physics --only micro     # micro-benchmarks only
+    python -m benchmarks.bench_physics --out bench_output.txt --compare old.json
+
+Results are written as one JSON document so runs of different versions can
+be diffed; --compare prints the ratio to a previous run and exits with 1 if
+anything got slower than --tolerance.
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from components.broad_phase import SpatialHash, SweepAndPrune
+from components.aabb_tree import AABBTree
+from components.profiling import COUNTS, PHASES, StepStats
+from components.scene import Scene
+from components.vector import Vector2D
+from practice_code.body import Circle, Fragment, Polygon, Rectangle, convex_hull
+from practice_code.collision import (polygon_circle_collision, polygons_collision,
+                                     polygons_contact_points)
+
+WIDTH, HEIGHT = 800, 600
+BROAD_PHASES = {
+    "none": lambda: None,
+    "grid": lambda: SpatialHash(cell_size=40),
+    "sap": lambda: SweepAndPrune(),
+    "tree": lambda: AABBTree(),
+}
+
+
+def _regular_polygon(x, y, radius, sides, **kwargs):
+    vertices = [(x + math.cos(2 * math.pi * k / sides) * radius, y + math.sin(2 * math.pi * k / sides) * radius)
+                for k in range(sides)]
+    return Polygon(x, y, vertices, **kwargs)
+
+
+def _time_per_call(func, number, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+# Micro-benchmarks ###########################################################
+
+def micro_benchmarks(number):
+    a = Vector2D(1.5, -2.0)
+    b = Vector2D(0.25, 4.0)
+    c = Vector2D(3.0, 3.0)
+
+    def vector_iadd():
+        v = c
+        v += b
+
+    polygon_1 = _regular_polygon(100, 100, 30, 6)
+    polygon_2 = _regular_polygon(140, 110, 30, 6)
+    polygon_2.angle = 0.3
+    circle = Circle(125, 100, 10)
+
+    random.seed(0)
+    points = [(random.uniform(0, 500), random.uniform(0, 500)) for _ in range(200)]
+
+    cases = {
+        "vector_add": lambda: a + b,
+        "vector_sub": lambda: a - b,
+        "vector_mul_scalar": lambda: a * 0.5,
+        "vector_iadd": vector_iadd,
+        "vector_dot": lambda: a.dot(b),
+        "vector_normalize": lambda: a.normalize(),
+        "vector_rotate": lambda: a.rotate(0.3),
+        "polygons_collision": lambda: polygons_collision(polygon_1, polygon_2),
+        "polygon_circle_collision": lambda: polygon_circle_collision(polygon_1, circle),
+        "polygons_contact_points": lambda: polygons_contact_points(polygon_1, polygon_2),
+        "convex_hull_200": lambda: convex_hull(points),
+    }
+
+    results = []
+    for name, func in cases.items():
+        # 무거운 함수는 호출 횟수를 줄임
+        calls = number if name.startswith("vector") else max(1, number // 20)
+        seconds = _time_per_call(func, calls)
+        results.append({"kind": "micro", "name": name, "ns_per_call": seconds * 1e9, "calls": calls})
+    return results
+
+
+# Scenario benchmarks ########################################################
+
+def _borders():
+    thickness = 10
+    return [
+        Rectangle(x=WIDTH / 2, y=HEIGHT, width=WIDTH, height=thickness, is_static=True, name="Top Border"),
+        Rectangle(x=WIDTH / 2, y=0, width=WIDTH, height=thickness, is_static=True, name="Bottom Border"),
+        Rectangle(x=0, y=HEIGHT / 2, width=thickness, height=HEIGHT, is_static=True, name="Left Border"),
+        Rectangle(x=WIDTH, y=HEIGHT / 2, width=thickness, height=HEIGHT, is_static=True, name="Right Border"),
+    ]
+
+
+def build_polygons(n):
+    bodies = _borders()
+    for _ in range(n):
+        polygon = _regular_polygon(random.uniform(40, WIDTH - 40), random.uniform(40, HEIGHT - 40),
+                                   random.uniform(10, 25), random.randint(3, 7), mass=50)
+        polygon.velocity = Vector2D(random.uniform(-100, 100), random.uniform(-100, 100))
+        bodies.append(polygon)
+    return bodies
+
+
+def build_circles(n):
+    bodies = _borders()
+    for _ in range(n):
+        circle = Circle(random.uniform(20, WIDTH - 20), random.uniform(20, HEIGHT - 20), random.uniform(5, 15))
+        circle.velocity = Vector2D(random.uniform(-100, 100), random.uniform(-100, 100))
+        bodies.append(circle)
+    return bodies
+
+
+def build_fragment(n):
+    # main.py의 F 키와 같은 구성: 원들을 body로 넣고 Fragment도 넣음
+    bodies = _borders()
+    fragment = Fragment(WIDTH / 2, HEIGHT / 2, 10, n)
+    bodies.extend(fragment.circles)
+    bodies.append(fragment)
+    return bodies
+
+
+SCENARIOS = {
+    "polygons": build_polygons,
+    "circles": build_circles,
+    "fragment": build_fragment,
+}
+
+
+def _make_scene(scenario, n, broad_phase, use_store, seed):
+    random.seed(seed)
+    bodies = SCENARIOS[scenario](n)
+    store = None
+    if use_store:
+        from components.body_store import BodyStore
+        store = BodyStore(len(bodies))
+    # 시나리오는 중력 없이 상자 안을 날아다니는 body들 (user-024 이전 결과와 비교할 수 있도록)
+    return Scene(bodies, gravity=0, broad_phase=BROAD_PHASES[broad_phase](), store=store)
+
+
+def _run_steps(scene, steps, dt):
+    start = time.perf_counter()
+    for _ in range(steps):
+        scene.step(dt)
+    return time.perf_counter() - start
+
+
+def _phase_totals(scenario, n, steps, dt, broad_phase, use_store, seed):
+    # 단계별 시간은 Scene.profiler로 따로 한 번 더 돌려서 잰다
+    scene = _make_scene(scenario, n, broad_phase, use_store, seed)
+    stats = StepStats(window=steps)
+    scene.profiler = stats
+    _run_steps(scene, steps, dt)
+    keys = PHASES + COUNTS
+    return {key: sum(record[key] for record in stats.records) for key in keys}
+
+
+def scenario_benchmark(scenario, n, steps, dt, broad_phase, use_store, seed, measure_memory):
+    scene = _make_scene(scenario, n, broad_phase, use_store, seed)
+    total = _run_steps(scene, steps, dt)
+    totals = _phase_totals(scenario, n, steps, dt, broad_phase, use_store, seed)
+
+    result = {
+        "kind": "scenario",
+        "name": "{}_{}_{}{}".format(scenario, n, broad_phase, "_store" if use_store else ""),
+        "scenario": scenario,
+        "n": n,
+        "bodies": len(scene.bodies),
+        "broad_phase": broad_phase,
+        "store": use_store,
+        "steps": steps,
+        "dt": dt,
+        "steps_per_s": steps / total if total > 0 else float("inf"),
+        "phases_s": {key: totals[key] for key in PHASES},
+        "pairs_tested_per_step": totals["pairs_tested"] / steps,
+        "pairs_colliding_per_step": totals["pairs_colliding"] / steps,
+        "contacts_per_step": totals["contact_count"] / steps,
+    }
+
+    if measure_memory:
+        # tracemalloc은 느리므로 시간 측정과 따로 한 번 더 돌림
+        tracemalloc.start()
+        scene = _make_scene(scenario, n, broad_phase, use_store, seed)
+        _run_steps(scene, steps, dt)
+        result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return result
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = {entry["name"]: entry for entry in json.load(f)["results"]}
+
+    regressed = False
+    for entry in results:
+        old = baseline.get(entry["name"])
+        if old is None:
+            continue
+        if entry["kind"] == "micro":
+            ratio = entry["ns_per_call"] / old["ns_per_call"]
+        else:
+            ratio = old["steps_per_s"] / entry["steps_per_s"]
+        # ratio > 1 이면 느려진 것
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  <-- slower"
+            regressed = True
+        print("{:45s} {:6.2f}x{}".format(entry["name"], ratio, flag), file=sys.stderr)
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the physics core without pygame.")
+    parser.add_argument("--only", choices=["micro", "scenario"], help="run only one group")
+    parser.add_argument("--number", type=int, default=20000, help="calls per micro-benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200], help="body counts for scenarios")
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--dt", type=float, default=1 / 360)
+    parser.add_argument("--broad-phase", nargs="+", choices=sorted(BROAD_PHASES), default=["none", "grid"])
+    parser.add_argument("--store", action="store_true", help="also run scenarios with a BodyStore (needs numpy)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    parser.add_argument("--compare", help="previous JSON output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    results = []
+    if args.only in (None, "micro"):
+        results.extend(micro_benchmarks(args.number))
+
+    if args.only in (None, "scenario"):
+        for scenario in SCENARIOS:
+            for n in args.sizes:
+                for broad_phase in args.broad_phase:
+                    for use_store in ([False, True] if args.store else [False]):
+                        results.append(scenario_benchmark(scenario, n, args.steps, args.dt, broad_phase,
+                                                          use_store, args.seed, not args.no_memory))
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+from components.broad_phase import BroadPhase, aabb_overlap, is_active, ray_aabb
+
+
+def _union(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+def _perimeter(a):
+    return 2 * ((a[2] - a[0]) + (a[3] - a[1]))
+
+
+def _contains(outer, inner):
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and inner[2] <= outer[2] and inner[3] <= outer[3]
+
+
+class _Node:
+    __slots__ = ("aabb", "parent", "child1", "child2", "body", "tight", "height")
+
+    def __init__(self, aabb, body=None):
+        self.aabb = aabb
+        self.parent = None
+        self.child1 = None
+        self.child2 = None
+        self.body = body
+        self.tight = None
+        self.height = 0
+
+    def is_leaf(self):
+        return self.child1 is None
+
+
+class AABBTree(BroadPhase):
+    """Dynamic bounding volume hierarchy over body AABBs.
+
+    Leaves store a fat AABB (the body's box grown by margin) and are only
+    reinserted when the body leaves it, so resting and slow bodies cost no
+    tree updates. The tree is balanced with rotations, which keeps queries
+    fast even when 800 px borders sit next to 10 px circles.
+    """
+
+    def __init__(self, margin=5):
+        self.margin = margin
+        self.root = None
+        self._leaves = {}
+
+    def __len__(self):
+        return len(self._leaves)
+
+    def insert(self, body, aabb=None):
+        if aabb is None:
+            aabb = body.get_aabb()
+        leaf = _Node(self._fatten(aabb), body)
+        leaf.tight = aabb
+        self._leaves[id(body)] = leaf
+        self._insert_leaf(leaf)
+        return leaf
+
+    def add(self, body):
+        if id(body) not in self._leaves and body.get_aabb() is not None:
+            self.insert(body)
+
+    def remove(self, body):
+        leaf = self._leaves.pop(id(body), None)
+        if leaf is not None:
+            self._remove_leaf(leaf)
+
+    def update(self, body, aabb=None):
+        """Refresh a body's box. Returns True if it had to be reinserted."""
+        if aabb is None:
+            aabb = body.get_aabb()
+        leaf = self._leaves[id(body)]
+        leaf.tight = aabb
+        if _contains(leaf.aabb, aabb):
+            return False
+
+        self._remove_leaf(leaf)
+        leaf.aabb = self._fatten(aabb)
+        self._insert_leaf(leaf)
+        return True
+
+    def query(self, aabb):
+        """Bodies whose current AABB overlaps aabb."""
+        result = []
+        for leaf in self._query_leaves(aabb):
+            if aabb_overlap(leaf.body.get_aabb(), aabb):
+                result.append(leaf.body)
+        return result
+
+    def raycast(self, origin, direction, max_distance=float("inf")):
+        """(body, distance) for every body AABB hit by the ray, nearest first.
+
+        direction does not need to be normalized; distance is measured in
+        units of direction.
+        """
+        hits = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            if ray_aabb(origin, direction, max_distance, node.aabb) is None:
+                continue
+            if node.is_leaf():
+                t = ray_aabb(origin, direction, max_distance, node.body.get_aabb())
+                if t is not None:
+                    hits.append((t, id(node.body), node.body))
+            else:
+                stack.append(node.child1)
+                stack.append(node.child2)
+
+        hits.sort(key=lambda hit: (hit[0], hit[1]))
+        return [(body, t) for t, _, body in hits]
+
+    def _refresh(self, bodies):
+        # 새 body는 넣고, 움직인 body는 갱신하고, 없어진 body는 뺌. id(body) -> bodies 안의 위치
+        index_of = {}
+        for index, body in enumerate(bodies):
+            aabb = body.get_aabb()
+            if aabb is None:
+                continue
+            index_of[id(body)] = index
+            if id(body) not in self._leaves:
+                self.insert(body, aabb)
+            else:
+                # 잠든 body도 밖에서 옮길 수 있으므로 (snapshot 등) 매번 fat AABB 안에 있는지 확인
+                self.update(body, aabb)
+
+        if len(index_of) != len(self._leaves):
+            for key in [key for key in self._leaves if key not in index_of]:
+                self._remove_leaf(self._leaves.pop(key))
+        return index_of
+
+    def query_many(self, bodies, regions):
+        self._refresh(bodies)
+        return [self.query(region) for region in regions]
+
+    def pairs(self, bodies):
+        index_of = self._refresh(bodies)
+
+        # 움직이는 body에서만 검색: 정적/잠든 body끼리는 짝을 만들지 않음
+        result = []
+        for key, leaf in self._leaves.items():
+            if not is_active(leaf.body):
+                continue
+            i = index_of[key]
+            tight = leaf.tight
+            for other in self._query_leaves(tight):
+                if other is leaf or not aabb_overlap(tight, other.tight):
+                    continue
+                j = index_of[id(other.body)]
+                if not is_active(other.body):
+                    result.append((i, j) if i < j else (j, i))
+                elif i < j:
+                    result.append((i, j))
+
+        result.sort()
+        return result
+
+    def _fatten(self, aabb):
+        margin = self.margin
+        return (aabb[0] - margin, aabb[1] - margin, aabb[2] + margin, aabb[3] + margin)
+
+    def _query_leaves(self, aabb):
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            if not aabb_overlap(node.aabb, aabb):
+                continue
+            if node.is_leaf():
+                yield node
+            else:
+                stack.append(node.child1)
+                stack.append(node.child2)
+
+    def _insert_leaf(self, leaf):
+        if self.root is None:
+            self.root = leaf
+            leaf.parent = None
+            return
+
+        # 비용(둘레)이 가장 적게 늘어나는 형제 노드를 찾는다
+        box = leaf.aabb
+        node = self.root
+        while not node.is_leaf():
+            area = _perimeter(node.aabb)
+            combined = _perimeter(_union(node.aabb, box))
+            cost = 2 * combined
+            inheritance = 2 * (combined - area)
+
+            child_costs = []
+            for child in (node.child1, node.child2):
+                child_cost = _perimeter(_union(box, child.aabb)) + inheritance
+                if not child.is_leaf():
+                    child_cost -= _perimeter(child.aabb)
+                child_costs.append(child_cost)
+
+            if cost < child_costs[0] and cost < child_costs[1]:
+                break
+            node = node.child1 if child_costs[0] < child_costs[1] else node.child2
+
+        sibling = node
+        old_parent = sibling.parent
+        new_parent = _Node(_union(box, sibling.aabb))
+        new_parent.parent = old_parent
+        new_parent.height = sibling.height + 1
+
+        if old_parent is None:
+            self.root = new_parent
+        elif old_parent.child1 is sibling:
+            old_parent.child1 = new_parent
+        else:
+            old_parent.child2 = new_parent
+
+        new_parent.child1 = sibling
+        new_parent.child2 = leaf
+        sibling.parent = new_parent
+        leaf.parent = new_parent
+
+        self._refit(leaf.parent)
+
+    def _remove_leaf(self, leaf):
+        if leaf is self.root:
+            self.root = None
+            return
+
+        parent = leaf.parent
+        grand_parent = parent.parent
+        sibling = parent.child2 if parent.child1 is leaf else parent.child1
+
+        if grand_parent is None:
+            self.root = sibling
+            sibling.parent = None
+        else:
+            if grand_parent.child1 is parent:
+                grand_parent.child1 = sibling
+            else:
+                grand_parent.child2 = sibling
+            sibling.parent = grand_parent
+            self._refit(grand_parent)
+
+        leaf.parent = None
+
+    def _refit(self, node):
+        while node is not None:
+            node = self._balance(node)
+            child1, child2 = node.child1, node.child2
+            node.height = 1 + max(child1.height, child2.height)
+            node.aabb = _union(child1.aabb, child2.aabb)
+            node = node.parent
+
+    def _replace_child(self, old, new):
+        parent = new.parent
+        if parent is None:
+            self.root = new
+        elif parent.child1 is old:
+            parent.child1 = new
+        else:
+            parent.child2 = new
+
+    def _balance(self, a):
+        # 한쪽 높이가 2 이상 차이 나면 회전
+        if a.is_leaf() or a.height < 2:
+            return a
+
+        b, c = a.child1, a.child2
+        balance = c.height - b.height
+
+        if balance > 1:
+            f, g = c.child1, c.child2
+            c.child1 = a
+            c.parent = a.parent
+            a.parent = c
+            self._replace_child(a, c)
+
+            if f.height > g.height:
+                c.child2 = f
+                a.child2 = g
+                g.parent = a
+                a.aabb = _union(b.aabb, g.aabb)
+                c.aabb = _union(a.aabb, f.aabb)
+                a.height = 1 + max(b.height, g.height)
+                c.height = 1 + max(a.height, f.height)
+            else:
+                c.child2 = g
+                a.child2 = f
+                f.parent = a
+                a.aabb = _union(b.aabb, f.aabb)
+                c.aabb = _union(a.aabb, g.aabb)
+                a.height = 1 + max(b.height, f.height)
+                c.height = 1 + max(a.height, g.height)
+            return c
+
+        if balance < -1:
+            d, e = b.child1, b.child2
+            b.child1 = a
+            b.parent = a.parent
+            a.parent = b
+            self._replace_child(a, b)
+
+            if d.height > e.height:
+                b.child2 = d
+                a.child1 = e
+                e.parent = a
+                a.aabb = _union(c.aabb, e.aabb)
+                b.aabb = _union(a.aabb, d.aabb)
+                a.height = 1 + max(c.height, e.height)
+                b.height = 1 + max(a.height, d.height)
+            else:
+                b.child2 = e
+                a.child1 = d
+                d.parent = a
+                a.aabb = _union(c.aabb, d.aabb)
+                b.aabb = _union(a.aabb, e.aabb)
+                a.height = 1 + max(c.height, d.height)
+                b.height = 1 + max(a.height, e.height)
+            return b
+
+        return a
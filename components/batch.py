@@ -0,0 +1,128 @@
+"""Run many independent scenes across a process pool.
+
+    configs = sweep(base, gravity=[9.8, 20], bounce=[0.2, 0.5, 0.8])
+    for result in run_batch(configs, steps=3600, dt=1 / 360, workers=8):
+        print(result["params"], result["metrics"])
+
+Each config is a scene description for load_scene. Results come back as
+they finish (not in config order; result["index"] says which config it
+was), and at most max_pending configs are in flight at any time, so a
+sweep over thousands of configs keeps memory flat.
+"""
+import itertools
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from components.runner import kinetic_energy, max_speed, run_headless
+from components.scene_loader import load_scene, scene_state
+
+
+# load_scene이 읽는 장면 단위 키 (나머지는 body 설명에 넣음)
+SCENE_KEYS = frozenset(("width", "height", "gravity", "borders", "border_thickness", "broad_phase", "seed",
+                        "deterministic", "store", "sleep", "solver", "pair_cache", "parallel", "force_fields"))
+
+# make_body가 모든 body에 대해 받는 키와 종류별로 더 받는 키
+_COMMON_BODY_KEYS = frozenset(("x", "y", "mass", "bounce", "name", "static", "is_static", "velocity", "angle",
+                               "angular_velocity", "ccd", "gravity_scale", "linear_damping", "angular_damping"))
+BODY_KEYS = {
+    "rectangle": _COMMON_BODY_KEYS | {"width", "height"},
+    "polygon": _COMMON_BODY_KEYS | {"vertices"},
+    "circle": _COMMON_BODY_KEYS | {"radius"},
+    "fragment": _COMMON_BODY_KEYS | {"radius", "count", "num_circles", "spacing"},
+}
+
+
+def sweep(base, **choices):
+    """Yields one description per combination of choices.
+
+    Scene-level keys (SCENE_KEYS: gravity, seed, ...) are set on the
+    description itself, whether or not base has them. Any other key
+    (bounce, mass, radius, ...) is set on every body description whose type
+    accepts it (BODY_KEYS), e.g. radius only on circles and fragments.
+    Since width and height are scene keys, they cannot be swept per body.
+    Each description gets a "params" dict with the values used.
+    """
+    keys = list(choices)
+    bodies = base.get("bodies", [])
+    for key in keys:
+        if key not in SCENE_KEYS and not any(key in BODY_KEYS.get(body.get("type"), ()) for body in bodies):
+            raise ValueError("sweep key {!r} is not a scene key and no body accepts it".format(key))
+
+    for values in itertools.product(*(choices[key] for key in keys)):
+        description = dict(base)
+        description["bodies"] = [dict(body) for body in bodies]
+        params = dict(zip(keys, values))
+        for key, value in params.items():
+            if key in SCENE_KEYS:
+                description[key] = value
+            else:
+                for body in description["bodies"]:
+                    if key in BODY_KEYS.get(body.get("type"), ()):
+                        body[key] = value
+        description["params"] = params
+        yield description
+
+
+def simulate(index, description, steps, dt, until_rest=None, keep_states=False):
+    # worker에서 실행: 장면 하나를 끝까지 돌리고 요약만 돌려줌
+    scene = load_scene(description)
+    until = None
+    if until_rest is not None:
+        until = lambda scene, step: max_speed(scene) < until_rest
+
+    summary = run_headless(scene, dt, steps=steps, until=until)
+    if scene.parallel is not None:
+        scene.parallel.close()
+
+    result = {
+        "index": index,
+        "params": description.get("params", {}),
+        "summary": summary,
+        "metrics": {
+            "bodies": len(scene.bodies),
+            "max_speed": max_speed(scene),
+            "kinetic_energy": kinetic_energy(scene),
+            "sleeping": scene.sleep.sleeping_count() if scene.sleep is not None else 0,
+        },
+    }
+    if keep_states:
+        result["states"] = scene_state(scene)
+    return result
+
+
+def run_batch(configs, steps, dt, workers=None, max_pending=None, until_rest=None, keep_states=False,
+              max_tasks_per_child=None):
+    """Runs every config headless for `steps` steps (or until every body is
+    slower than until_rest) and yields one result dict per config.
+
+    The same worker processes are reused for every run; max_tasks_per_child
+    restarts a worker after that many runs if something leaks. configs may
+    be a generator (e.g. sweep()); it is consumed only as fast as workers
+    free up.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    max_pending = max_pending or workers * 2
+
+    options = {"max_workers": workers}
+    if max_tasks_per_child is not None:
+        options["max_tasks_per_child"] = max_tasks_per_child
+
+    configs = iter(configs)
+    index = 0
+    with ProcessPoolExecutor(**options) as pool:
+        pending = set()
+        while True:
+            # 대기 중인 작업이 max_pending개가 될 때까지만 채움
+            while len(pending) < max_pending:
+                description = next(configs, None)
+                if description is None:
+                    break
+                pending.add(pool.submit(simulate, index, description, steps, dt, until_rest, keep_states))
+                index += 1
+
+            if not pending:
+                return
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
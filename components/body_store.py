@@ -0,0 +1,252 @@
+import numpy as np
+
+from components.vector import Vector2D
+from components.circle_batch import collide_circle_pairs
+
+
+class _PositionView(Vector2D):
+    """Vector2D that reads and writes a body's row in BodyStore.position."""
+
+    __slots__ = ("_body",)
+
+    def __init__(self, body):
+        self._body = body
+
+    @property
+    def x(self):
+        body = self._body
+        return float(body._store.position[body._store_index, 0])
+
+    @x.setter
+    def x(self, value):
+        body = self._body
+        body._store.position[body._store_index, 0] = value
+        body._store.version[body._store_index] += 1
+
+    @property
+    def y(self):
+        body = self._body
+        return float(body._store.position[body._store_index, 1])
+
+    @y.setter
+    def y(self, value):
+        body = self._body
+        body._store.position[body._store_index, 1] = value
+        body._store.version[body._store_index] += 1
+
+
+class _VelocityView(Vector2D):
+    """Vector2D that reads and writes a body's row in BodyStore.velocity."""
+
+    __slots__ = ("_body",)
+
+    def __init__(self, body):
+        self._body = body
+
+    @property
+    def x(self):
+        body = self._body
+        return float(body._store.velocity[body._store_index, 0])
+
+    @x.setter
+    def x(self, value):
+        body = self._body
+        body._store.velocity[body._store_index, 0] = value
+
+    @property
+    def y(self):
+        body = self._body
+        return float(body._store.velocity[body._store_index, 1])
+
+    @y.setter
+    def y(self, value):
+        body = self._body
+        body._store.velocity[body._store_index, 1] = value
+
+
+def _inverse(value):
+    if value is None or value == float("inf") or value == 0:
+        return 0.0
+    return 1 / max(value, 1e-8)
+
+
+class BodyStore:
+    """Structure-of-arrays storage for body state.
+
+    Rows [0, count) are packed; removing a body moves the last row into its
+    slot. Attached bodies keep working as usual: center and velocity become
+    Vector2D views into the arrays, angle / angular_velocity read and write
+    them directly. is_static, radius and bounce are read once in attach();
+    set_sleeping() keeps the awake mask in sync with Body.is_sleeping.
+    integrate() moves every dynamic body in one NumPy
+    operation instead of one Vector2D allocation per body.
+    """
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.bodies = []
+        self._allocate(max(capacity, 1))
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, body):
+        return body._store is self
+
+    def _allocate(self, capacity):
+        def grow(array, shape, dtype):
+            new = np.zeros(shape, dtype=dtype)
+            if array is not None:
+                new[:self.count] = array[:self.count]
+            return new
+
+        old = self.__dict__
+        self.capacity = capacity
+        self.position = grow(old.get("position"), (capacity, 2), np.float64)
+        self.velocity = grow(old.get("velocity"), (capacity, 2), np.float64)
+        self.angle = grow(old.get("angle"), capacity, np.float64)
+        self.angular_velocity = grow(old.get("angular_velocity"), capacity, np.float64)
+        self.inv_mass = grow(old.get("inv_mass"), capacity, np.float64)
+        self.inv_inertia = grow(old.get("inv_inertia"), capacity, np.float64)
+        self.dynamic = grow(old.get("dynamic"), capacity, np.float64)
+        self.version = grow(old.get("version"), capacity, np.int64)
+        # 원-원 일괄 충돌 처리용 (원이 아니면 radius = 0)
+        self.radius = grow(old.get("radius"), capacity, np.float64)
+        self.bounce = grow(old.get("bounce"), capacity, np.float64)
+        # 잠든 body는 0 (적분하지 않음)
+        self.awake = grow(old.get("awake"), capacity, np.float64)
+        # 힘 누적과 body별 중력 배율 / 감쇠 (Body.apply_force 등)
+        self.force = grow(old.get("force"), (capacity, 2), np.float64)
+        self.torque = grow(old.get("torque"), capacity, np.float64)
+        self.gravity_scale = grow(old.get("gravity_scale"), capacity, np.float64)
+        self.linear_damping = grow(old.get("linear_damping"), capacity, np.float64)
+        self.angular_damping = grow(old.get("angular_damping"), capacity, np.float64)
+
+    def _arrays(self):
+        return (self.position, self.velocity, self.angle, self.angular_velocity, self.inv_mass,
+                self.inv_inertia, self.dynamic, self.version, self.radius, self.bounce, self.awake,
+                self.force, self.torque, self.gravity_scale, self.linear_damping, self.angular_damping)
+
+    def attach(self, body):
+        if body._store is self:
+            return
+        if body._store is not None:
+            body._store.detach(body)
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+
+        index = self.count
+        center = body.center
+        velocity = body.velocity
+        self.position[index] = (center.x, center.y)
+        self.velocity[index] = (velocity.x, velocity.y)
+        self.angle[index] = body.angle
+        self.angular_velocity[index] = body.angular_velocity
+        self.version[index] = body.transform_version
+        self.dynamic[index] = 0.0 if body.is_static else 1.0
+        self.radius[index] = body.radius if body.shape_type == "Circle" else 0.0
+        self.bounce[index] = body.bounce
+        self.awake[index] = 0.0 if body.is_sleeping else 1.0
+        self.force[index] = (body._force_x, body._force_y)
+        self.torque[index] = body._torque
+
+        body._store = self
+        body._store_index = index
+        body._center_view = _PositionView(body)
+        body._velocity_view = _VelocityView(body)
+        self.refresh_mass(body)
+        self.refresh_motion(body)
+
+        self.bodies.append(body)
+        self.count += 1
+
+    def detach(self, body):
+        if body._store is not self:
+            return
+
+        index = body._store_index
+        # store에 있던 값을 body로 되돌림
+        body._center = Vector2D(*self.position[index])
+        body._velocity = Vector2D(*self.velocity[index])
+        body._angle = float(self.angle[index])
+        body._angular_velocity = float(self.angular_velocity[index])
+        body._force_x, body._force_y = self.force[index].tolist()
+        body._torque = float(self.torque[index])
+        # 캐시가 남아 있지 않도록 버전을 올림
+        body._transform_version = max(body._transform_version, int(self.version[index])) + 1
+        body._store = None
+        body._store_index = -1
+
+        last = self.count - 1
+        if index != last:
+            moved = self.bodies[last]
+            for array in self._arrays():
+                array[index] = array[last]
+            self.bodies[index] = moved
+            moved._store_index = index
+
+        self.bodies.pop()
+        self.count = last
+
+    def refresh_mass(self, body):
+        index = body._store_index
+        self.inv_mass[index] = _inverse(body.mass)
+        self.inv_inertia[index] = _inverse(body.inertia)
+
+    def refresh_motion(self, body):
+        index = body._store_index
+        self.gravity_scale[index] = body.gravity_scale
+        self.linear_damping[index] = body.linear_damping
+        self.angular_damping[index] = body.angular_damping
+
+    def add_force(self, index, fx, fy, torque):
+        self.force[index, 0] += fx
+        self.force[index, 1] += fy
+        self.torque[index] += torque
+
+    def set_sleeping(self, body, sleeping):
+        self.awake[body._store_index] = 0.0 if sleeping else 1.0
+
+    def set_position(self, index, value):
+        self.position[index] = (value[0], value[1])
+        self.version[index] += 1
+
+    def integrate(self, dt, gravity=(0.0, 0.0), fields=()):
+        """Semi-implicit Euler: forces, gravity and fields change the velocity, then it moves the body.
+
+        gravity is an acceleration (gx, gy), scaled per body by gravity_scale;
+        fields are components.forces fields. Accumulated forces are cleared,
+        except on sleeping bodies (they keep them until they wake up).
+        """
+        n = self.count
+        dynamic = self.dynamic[:n] * self.awake[:n]
+        x = self.position[:n, 0]
+        y = self.position[:n, 1]
+        inv_mass = self.inv_mass[:n]
+        acceleration_x = self.force[:n, 0] * inv_mass + gravity[0] * self.gravity_scale[:n]
+        acceleration_y = self.force[:n, 1] * inv_mass + gravity[1] * self.gravity_scale[:n]
+        for field in fields:
+            field_x, field_y = field.accelerations(x, y)
+            acceleration_x += field_x
+            acceleration_y += field_y
+
+        step = dynamic * dt
+        velocity = self.velocity[:n]
+        velocity[:, 0] += acceleration_x * step
+        velocity[:, 1] += acceleration_y * step
+        velocity *= (1 / (1 + step * self.linear_damping[:n]))[:, None]
+        self.angular_velocity[:n] += self.torque[:n] * self.inv_inertia[:n] * step
+        self.angular_velocity[:n] *= 1 / (1 + step * self.angular_damping[:n])
+        # 잠든 body의 힘은 깨어날 때까지 남겨 둠 (정적이거나 적분한 body만 비움)
+        keep = self.dynamic[:n] - dynamic
+        self.force[:n] *= keep[:, None]
+        self.torque[:n] *= keep
+
+        self.position[:n] += self.velocity[:n] * (dynamic * dt)[:, None]
+        self.angle[:n] += self.angular_velocity[:n] * (dynamic * dt)
+        # 멈춰 있는 body는 version을 올리지 않음 (components.pair_cache가 결과를 재사용)
+        moving = (self.velocity[:n, 0] != 0) | (self.velocity[:n, 1] != 0) | (self.angular_velocity[:n] != 0)
+        self.version[:n] += (dynamic * moving).astype(np.int64)
+
+    def collide_circle_pairs(self, rows_1, rows_2):
+        return collide_circle_pairs(self, rows_1, rows_2)
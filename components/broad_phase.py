@@ -0,0 +1,296 @@
+import math
+
+
+def aabb_overlap(a, b):
+    # a, b = (min_x, min_y, max_x, max_y)
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def is_active(body):
+    # 정적이거나 잠든 body끼리는 충돌 검사를 하지 않음
+    return not (body.is_static or body.is_sleeping)
+
+
+def ray_aabb(origin, direction, max_distance, aabb):
+    # slab test, 부딪히면 거리(t), 아니면 None
+    t_min = 0.0
+    t_max = max_distance
+    for axis in (0, 1):
+        o = origin[axis]
+        d = direction[axis]
+        lo = aabb[axis]
+        hi = aabb[axis + 2]
+        if d == 0:
+            if o < lo or o > hi:
+                return None
+            continue
+        t1 = (lo - o) / d
+        t2 = (hi - o) / d
+        if t1 > t2:
+            t1, t2 = t2, t1
+        t_min = max(t_min, t1)
+        t_max = min(t_max, t2)
+        if t_min > t_max:
+            return None
+    return t_min
+
+
+def brute_force_query(bodies, regions):
+    # 영역마다 모든 body를 검사 (broad phase가 없을 때)
+    aabbs = [(body, body.get_aabb()) for body in bodies]
+    return [[body for body, aabb in aabbs if aabb is not None and aabb_overlap(aabb, region)] for region in regions]
+
+
+class BroadPhase:
+    """Finds candidate pairs before the narrow phase (collide).
+
+    pairs() returns a sorted list of index pairs (i, j), i < j, into the
+    given bodies list whose bounding boxes overlap. Bodies whose get_aabb()
+    returns None (e.g. Fragment) are never paired, and neither are two
+    bodies that are both static or asleep.
+
+    Scene calls add(body) / remove(body) as bodies come and go, so broad
+    phases that keep state between steps can update it right away instead
+    of diffing the whole list; the default does nothing.
+
+    query_many(bodies, regions) returns, for each region (min_x, min_y,
+    max_x, max_y), the bodies whose current AABB overlaps it. It is meant
+    for many regions at once (components.ccd); the default checks every
+    body against every region.
+    """
+
+    def pairs(self, bodies):
+        raise NotImplementedError
+
+    def query_many(self, bodies, regions):
+        return brute_force_query(bodies, regions)
+
+    def add(self, body):
+        pass
+
+    def remove(self, body):
+        pass
+
+
+class SpatialHash(BroadPhase):
+    """Uniform grid keyed on each body's AABB.
+
+    cell_size should be around the size of the typical dynamic body; very
+    large bodies (the borders) simply cover more cells.
+    """
+
+    def __init__(self, cell_size=50):
+        self.cell_size = cell_size
+
+    def pairs(self, bodies):
+        inv_cell = 1 / self.cell_size
+        cells = {}
+        aabbs = [None] * len(bodies)
+
+        for index, body in enumerate(bodies):
+            aabb = body.get_aabb()
+            if aabb is None:
+                continue
+            aabbs[index] = aabb
+
+            x0 = math.floor(aabb[0] * inv_cell)
+            y0 = math.floor(aabb[1] * inv_cell)
+            x1 = math.floor(aabb[2] * inv_cell)
+            y1 = math.floor(aabb[3] * inv_cell)
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    cell = cells.get((cx, cy))
+                    if cell is None:
+                        cells[(cx, cy)] = [index]
+                    else:
+                        cell.append(index)
+
+        active = [aabb is not None and is_active(body) for body, aabb in zip(bodies, aabbs)]
+        candidates = set()
+        for members in cells.values():
+            count = len(members)
+            if count < 2:
+                continue
+            # members are appended in index order, so a < b gives i < j
+            for a in range(count - 1):
+                i = members[a]
+                for b in range(a + 1, count):
+                    j = members[b]
+                    if active[i] or active[j]:
+                        candidates.add((i, j))
+
+        return sorted(pair for pair in candidates if aabb_overlap(aabbs[pair[0]], aabbs[pair[1]]))
+
+    def query_many(self, bodies, regions):
+        # 영역들을 격자에 넣고 body마다 자기가 덮는 칸의 영역만 검사
+        inv_cell = 1 / self.cell_size
+        cells = {}
+        for number, region in enumerate(regions):
+            for cx in range(math.floor(region[0] * inv_cell), math.floor(region[2] * inv_cell) + 1):
+                for cy in range(math.floor(region[1] * inv_cell), math.floor(region[3] * inv_cell) + 1):
+                    cells.setdefault((cx, cy), []).append(number)
+
+        results = [[] for _ in regions]
+        if not cells:
+            return results
+        for body in bodies:
+            aabb = body.get_aabb()
+            if aabb is None:
+                continue
+            for cx in range(math.floor(aabb[0] * inv_cell), math.floor(aabb[2] * inv_cell) + 1):
+                for cy in range(math.floor(aabb[1] * inv_cell), math.floor(aabb[3] * inv_cell) + 1):
+                    for number in cells.get((cx, cy), ()):
+                        found = results[number]
+                        # 여러 칸에서 같은 영역을 만날 수 있음
+                        if (not found or found[-1] is not body) and aabb_overlap(aabb, regions[number]):
+                            found.append(body)
+        return results
+
+
+class SweepAndPrune(BroadPhase):
+    """Sort-and-sweep along one axis (0 = x, 1 = y).
+
+    The endpoint list is kept between steps and re-sorted with insertion
+    sort, which is close to linear because bodies move little per step.
+    Membership follows add / remove; the whole list is only diffed again
+    when its length no longer matches what they reported.
+    """
+
+    def __init__(self, axis=0):
+        self.axis = axis
+        # [min on axis, max on axis, aabb, body], sorted by min
+        self._entries = []
+        self._known = set()
+        # AABB가 없어서 entry를 만들지 않은 body (Fragment)
+        self._ignored = set()
+        # remove()로 뺀 entry 수 (body 자리가 None, 다음 pairs()에서 정리)
+        self._removed = 0
+        self._entry_of = {}
+
+    def add(self, body):
+        if id(body) in self._known or id(body) in self._ignored:
+            return
+        if body.get_aabb() is None:
+            self._ignored.add(id(body))
+            return
+        entry = [0.0, 0.0, None, body]
+        self._entries.append(entry)
+        self._entry_of[id(body)] = entry
+        self._known.add(id(body))
+
+    def remove(self, body):
+        self._ignored.discard(id(body))
+        entry = self._entry_of.pop(id(body), None)
+        if entry is None:
+            return
+        entry[3] = None
+        self._known.discard(id(body))
+        self._removed += 1
+
+    def _sync(self, bodies):
+        if self._removed:
+            self._entries = [entry for entry in self._entries if entry[3] is not None]
+            self._removed = 0
+
+        # add / remove로 알고 있는 body 수가 맞으면 그대로 믿음
+        if len(bodies) == len(self._known) + len(self._ignored):
+            return
+
+        # Scene.add / remove를 거치지 않고 bodies가 바뀐 경우: 전부 다시 맞춤
+        current = set()
+        ignored = set()
+        for body in bodies:
+            (current if body.get_aabb() is not None else ignored).add(id(body))
+        self._entries = [entry for entry in self._entries if id(entry[3]) in current]
+        self._entry_of = {id(entry[3]): entry for entry in self._entries}
+        self._known = set(self._entry_of)
+        self._ignored = ignored
+        for body in bodies:
+            if id(body) in current:
+                self.add(body)
+
+    def _refresh(self, bodies):
+        # 현재 AABB로 entry를 갱신하고 다시 정렬
+        self._sync(bodies)
+        axis = self.axis
+        entries = self._entries
+
+        for entry in entries:
+            aabb = entry[3].get_aabb()
+            entry[0] = aabb[axis]
+            entry[1] = aabb[axis + 2]
+            entry[2] = aabb
+
+        # insertion sort: few swaps when the previous order is nearly right
+        for k in range(1, len(entries)):
+            entry = entries[k]
+            key = entry[0]
+            m = k - 1
+            while m >= 0 and entries[m][0] > key:
+                entries[m + 1] = entries[m]
+                m -= 1
+            entries[m + 1] = entry
+
+    def pairs(self, bodies):
+        self._refresh(bodies)
+        index_of = {id(body): index for index, body in enumerate(bodies)}
+        axis = self.axis
+        entries = self._entries
+
+        other = 1 - axis
+        result = []
+        active = []
+        for entry in entries:
+            key = entry[0]
+            active = [a for a in active if a[1] >= key]
+            aabb = entry[2]
+            i = index_of[id(entry[3])]
+            moving = is_active(entry[3])
+            for a in active:
+                other_aabb = a[2]
+                if not moving and not is_active(a[3]):
+                    continue
+                if aabb[other] <= other_aabb[other + 2] and other_aabb[other] <= aabb[other + 2]:
+                    j = index_of[id(a[3])]
+                    result.append((i, j) if i < j else (j, i))
+            active.append(entry)
+
+        result.sort()
+        return result
+
+    def query_many(self, bodies, regions):
+        # body entry와 영역을 min 순서로 함께 훑음 (pairs와 같은 방식)
+        self._refresh(bodies)
+        axis = self.axis
+        other = 1 - axis
+        entries = self._entries
+        order = sorted(range(len(regions)), key=lambda number: regions[number][axis])
+        results = [[] for _ in regions]
+
+        active_entries = []
+        active_regions = []
+        i = k = 0
+        while k < len(order) or (active_regions and i < len(entries)):
+            if k < len(order) and (i == len(entries) or regions[order[k]][axis] < entries[i][0]):
+                number = order[k]
+                k += 1
+                region = regions[number]
+                active_entries = [a for a in active_entries if a[1] >= region[axis]]
+                for a in active_entries:
+                    aabb = a[2]
+                    if aabb[other] <= region[other + 2] and region[other] <= aabb[other + 2]:
+                        results[number].append(a[3])
+                active_regions.append(number)
+            else:
+                entry = entries[i]
+                i += 1
+                key = entry[0]
+                aabb = entry[2]
+                active_regions = [number for number in active_regions if regions[number][axis + 2] >= key]
+                for number in active_regions:
+                    region = regions[number]
+                    if aabb[other] <= region[other + 2] and region[other] <= aabb[other + 2]:
+                        results[number].append(entry[3])
+                active_entries = [a for a in active_entries if a[1] >= key]
+                active_entries.append(entry)
+        return results
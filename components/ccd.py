@@ -0,0 +1,325 @@
+"""Continuous collision detection for bodies with body.ccd = True.
+
+Scene.update_position moves every body as usual, then sweeps each ccd body
+from where it was to where it ended up and, if it would have passed
+through something on the way, pulls it back to the time of impact (plus
+a little penetration so the regular collision step sees the contact).
+
+Other bodies are swept too, in a straight line over velocity * dt, so
+bodies moving together (the circles of a Fragment) do not stop each
+other. The time of impact is found by conservative advancement: at the current
+time t the distance d to the other shape and the direction n of the gap
+are measured. No point of the body closes the gap faster than
+bound = displacement . n + |rotation| * radius, so t can safely be
+advanced by d / bound.
+"""
+import math
+
+from components.vector import Vector2D
+
+
+def _polygon_at(body, x, y, angle):
+    cos = math.cos(angle)
+    sin = math.sin(angle)
+    return [(v.x * cos - v.y * sin + x, v.x * sin + v.y * cos + y) for v in body.local_vertices]
+
+
+def _shapes_at(body, x, y, angle):
+    # [("circle", (x, y), radius)] 또는 [("polygon", vertices, 0), ...] (오목한 다각형은 볼록 조각마다 하나)
+    if body.shape_type == "Circle":
+        return [("circle", (x, y), body.radius)]
+    return [("polygon", _polygon_at(part, x, y, angle), 0.0) for part in body.pieces or (body,)]
+
+
+def _current_shapes(body):
+    if body.shape_type == "Circle":
+        return [("circle", (body.center.x, body.center.y), body.radius)]
+    return [("polygon", [(v.x, v.y) for v in part.get_vertices()], 0.0) for part in body.pieces or (body,)]
+
+
+def _closest_on_segment(point, a, b):
+    px, py = point
+    ax, ay = a
+    abx = b[0] - ax
+    aby = b[1] - ay
+    length = abx * abx + aby * aby
+    t = 0.0 if length == 0 else max(0.0, min(1.0, ((px - ax) * abx + (py - ay) * aby) / length))
+    return ax + abx * t, ay + aby * t
+
+
+def _inside(point, vertices):
+    # 볼록 다각형 안에 있는지 (감는 방향과 무관)
+    px, py = point
+    sign = 0
+    count = len(vertices)
+    for i in range(count):
+        ax, ay = vertices[i]
+        bx, by = vertices[(i + 1) % count]
+        cross = (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+        if cross != 0:
+            if sign == 0:
+                sign = 1 if cross > 0 else -1
+            elif (cross > 0) != (sign > 0):
+                return False
+    return True
+
+
+def _point_polygon(point, vertices):
+    # (거리, point에서 다각형 위 가장 가까운 점으로 가는 단위 벡터), 안에 있으면 (0, None)
+    if _inside(point, vertices):
+        return 0.0, None
+    count = len(vertices)
+    best = None
+    for i in range(count):
+        cx, cy = _closest_on_segment(point, vertices[i], vertices[(i + 1) % count])
+        dx = cx - point[0]
+        dy = cy - point[1]
+        distance = math.sqrt(dx * dx + dy * dy)
+        if best is None or distance < best[0]:
+            best = (distance, dx, dy)
+    distance, dx, dy = best
+    if distance == 0:
+        return 0.0, None
+    return distance, (dx / distance, dy / distance)
+
+
+def _separated(vertices_1, vertices_2):
+    # SAT: 두 다각형의 변 법선 중 하나라도 나누면 떨어져 있음
+    for vertices in (vertices_1, vertices_2):
+        count = len(vertices)
+        for i in range(count):
+            ax, ay = vertices[i]
+            bx, by = vertices[(i + 1) % count]
+            nx = ay - by
+            ny = bx - ax
+            min_1 = min(x * nx + y * ny for x, y in vertices_1)
+            max_1 = max(x * nx + y * ny for x, y in vertices_1)
+            min_2 = min(x * nx + y * ny for x, y in vertices_2)
+            max_2 = max(x * nx + y * ny for x, y in vertices_2)
+            if max_1 < min_2 or max_2 < min_1:
+                return True
+    return False
+
+
+def shape_distance(shape_1, shape_2):
+    """(distance, normal) between two shapes from _shapes_at / _current_shapes.
+
+    normal is the unit vector from shape_1 toward shape_2 along the
+    shortest gap; (0, None) if they overlap.
+    """
+    kind_1, data_1, radius_1 = shape_1
+    kind_2, data_2, radius_2 = shape_2
+    if kind_1 == "circle" and kind_2 == "circle":
+        dx = data_2[0] - data_1[0]
+        dy = data_2[1] - data_1[1]
+        distance = math.sqrt(dx * dx + dy * dy)
+        normal = (dx / distance, dy / distance) if distance else None
+    elif kind_1 == "circle":
+        distance, normal = _point_polygon(data_1, data_2)
+    elif kind_2 == "circle":
+        distance, normal = _point_polygon(data_2, data_1)
+        if normal is not None:
+            normal = (-normal[0], -normal[1])
+    elif not _separated(data_1, data_2):
+        return 0.0, None
+    else:
+        # 떨어진 볼록 다각형 사이 거리는 한쪽 꼭짓점과 다른 쪽 변 사이에서 나옴
+        distance, normal = min((_point_polygon(vertex, data_2) for vertex in data_1), key=lambda item: item[0])
+        other, other_normal = min((_point_polygon(vertex, data_1) for vertex in data_2), key=lambda item: item[0])
+        if other < distance:
+            distance, normal = other, (-other_normal[0], -other_normal[1])
+
+    distance -= radius_1 + radius_2
+    if distance <= 0 or normal is None:
+        return 0.0, None
+    return distance, normal
+
+
+def _closest(shapes_1, shapes_2):
+    # 가장 가까운 조각 쌍의 (distance, normal, shape_1, shape_2), 겹치는 쌍이 있으면 그 쌍
+    best = None
+    for shape_1 in shapes_1:
+        for shape_2 in shapes_2:
+            distance, normal = shape_distance(shape_1, shape_2)
+            if normal is None:
+                return distance, normal, shape_1, shape_2
+            if best is None or distance < best[0]:
+                best = (distance, normal, shape_1, shape_2)
+    return best
+
+
+def _project(shape, axis):
+    kind, data, radius = shape
+    nx, ny = axis
+    if kind == "circle":
+        center = data[0] * nx + data[1] * ny
+        return center - radius, center + radius
+    values = [x * nx + y * ny for x, y in data]
+    return min(values), max(values)
+
+
+def _centroid(shape):
+    kind, data, _ = shape
+    if kind == "circle":
+        return data
+    return sum(x for x, _ in data) / len(data), sum(y for _, y in data) / len(data)
+
+
+def overlap_axis(shape_1, shape_2):
+    """Unit axis of least overlap (SAT) for two overlapping shapes, pointing from shape_1 toward shape_2."""
+    axes = []
+    for kind, data, _ in (shape_1, shape_2):
+        if kind == "polygon":
+            count = len(data)
+            for i in range(count):
+                ax, ay = data[i]
+                bx, by = data[(i + 1) % count]
+                axes.append((ay - by, bx - ax))
+    center_1 = _centroid(shape_1)
+    center_2 = _centroid(shape_2)
+    for circle, other in ((shape_1, shape_2), (shape_2, shape_1)):
+        if circle[0] == "circle":
+            # 원은 상대의 가장 가까운 꼭짓점 (또는 중심) 방향도 축으로 씀
+            points = other[1] if other[0] == "polygon" else [other[1]]
+            cx, cy = circle[1]
+            px, py = min(points, key=lambda point: (point[0] - cx) ** 2 + (point[1] - cy) ** 2)
+            axes.append((px - cx, py - cy))
+
+    best = None
+    for nx, ny in axes:
+        length = math.hypot(nx, ny)
+        if length == 0:
+            continue
+        axis = (nx / length, ny / length)
+        min_1, max_1 = _project(shape_1, axis)
+        min_2, max_2 = _project(shape_2, axis)
+        overlap = min(max_1, max_2) - max(min_1, min_2)
+        if best is None or overlap < best[0]:
+            best = (overlap, axis)
+    if best is None:
+        return None
+
+    nx, ny = best[1]
+    if (center_2[0] - center_1[0]) * nx + (center_2[1] - center_1[1]) * ny < 0:
+        return -nx, -ny
+    return nx, ny
+
+
+def _reach(body):
+    # 중심에서 가장 먼 점까지의 거리 (회전으로 움직이는 최대 거리 계산용)
+    if body.shape_type == "Circle":
+        return 0.0
+    return max(math.hypot(v.x, v.y) for v in body.local_vertices)
+
+
+def time_of_impact(body, start, end, other, other_motion=(0.0, 0.0), tolerance=0.25, max_iterations=20):
+    """Fraction t (0..1) of the motion start -> end at which body touches other.
+
+    start and end are (x, y, angle). other is where it is now, at the end of
+    its own straight motion other_motion (dx, dy) this step. Returns None
+    if they do not meet. If they already overlap at start, the regular
+    collision step handles it, unless body keeps moving deeper in (then 0,
+    otherwise a fast body could be pushed through).
+    """
+    # other가 멈춰 있는 좌표계에서 계산: 시작점은 other_motion만큼 밀리고 이동량은 상대 이동량
+    x = start[0] + other_motion[0]
+    y = start[1] + other_motion[1]
+    dx = end[0] - start[0] - other_motion[0]
+    dy = end[1] - start[1] - other_motion[1]
+    rotation = end[2] - start[2]
+    spin = abs(rotation) * _reach(body)
+
+    targets = _current_shapes(other)
+    t = 0.0
+    for _ in range(max_iterations):
+        shapes = _shapes_at(body, x + dx * t, y + dy * t, start[2] + rotation * t)
+        distance, normal, shape, target = _closest(shapes, targets)
+        if normal is None:
+            if t > 0:
+                # 진행 중에 겹침 (회전 때문)
+                return t
+            return 0.0 if _moves_deeper(shape, target, dx, dy, tolerance) else None
+        # 가장 가까운 방향으로 다가가는 속도의 상한
+        bound = dx * normal[0] + dy * normal[1] + spin
+        if bound <= 0:
+            # 멀어지거나 옆으로 미끄러지는 중
+            return None
+        if distance < tolerance:
+            return t
+        t += distance / bound
+        if t >= 1.0:
+            return None
+    return t
+
+
+def _moves_deeper(shape, target, dx, dy, tolerance):
+    # 처음부터 겹쳐 있을 때: 겹친 방향으로 tolerance보다 더 들어가면 그 자리에서 멈춤
+    axis = overlap_axis(shape, target)
+    return axis is not None and dx * axis[0] + dy * axis[1] > tolerance
+
+
+def _swept_aabb(body, start, end):
+    margin = _reach(body) if body.shape_type != "Circle" else body.radius
+    return (min(start[0], end[0]) - margin, min(start[1], end[1]) - margin,
+            max(start[0], end[0]) + margin, max(start[1], end[1]) + margin)
+
+
+def _max_motion(bodies, dt):
+    # ccd가 아닌 body들이 이번 step에 움직인 최대 거리 (축마다)
+    max_x = max_y = 0.0
+    for body in bodies:
+        if body.is_static or body.is_sleeping or body.is_fragment or body.ccd:
+            continue
+        velocity = body.velocity
+        max_x = max(max_x, abs(velocity.x))
+        max_y = max(max_y, abs(velocity.y))
+    return max_x * dt, max_y * dt
+
+
+def advance_to_impact(scene, moves, dt, tolerance=0.25, penetration=1.0):
+    """Pulls ccd bodies back to their first time of impact.
+
+    moves: [(body, (x, y, angle) before the step)]; the other bodies are
+    taken to have moved velocity * dt in a straight line, so each swept
+    region is grown by the largest such motion of a non-ccd body to also
+    find bodies that crossed it during the step. (Two ccd bodies are only
+    found if one's swept region reaches the other's final AABB, so regions
+    stay small when many fast bodies use ccd.) penetration is how far
+    (at most) a body is allowed into what it hit, so that the contact is
+    found and resolved by the regular collision step.
+    Returns the number of bodies that were pulled back.
+    """
+    clamped = 0
+    moves = [(body, start, (body.center.x, body.center.y, body.angle)) for body, start in moves]
+    moves = [move for move in moves if move[1] != move[2]]
+    if not moves:
+        return clamped
+    # 모든 ccd body의 지나간 영역을 broad phase에 한 번에 물어봄
+    grow_x, grow_y = _max_motion(scene.bodies, dt)
+    regions = []
+    for body, start, end in moves:
+        aabb = _swept_aabb(body, start, end)
+        regions.append((aabb[0] - grow_x, aabb[1] - grow_y, aabb[2] + grow_x, aabb[3] + grow_y))
+    nearby = scene.query_aabbs(regions)
+    for (body, start, end), others in zip(moves, nearby):
+        first = None
+        for other in others:
+            if other is body:
+                continue
+            if other.is_static or other.is_sleeping:
+                other_motion = (0.0, 0.0)
+            else:
+                other_motion = (other.velocity.x * dt, other.velocity.y * dt)
+            t = time_of_impact(body, start, end, other, other_motion, tolerance)
+            if t is not None and (first is None or t < first):
+                first = t
+
+        if first is None:
+            continue
+        bound = math.hypot(end[0] - start[0], end[1] - start[1]) + abs(end[2] - start[2]) * _reach(body)
+        t = min(1.0, first + penetration / bound)
+        if t < 1.0:
+            body.center = Vector2D(start[0] + (end[0] - start[0]) * t, start[1] + (end[1] - start[1]) * t)
+            body.angle = start[2] + (end[2] - start[2]) * t
+            clamped += 1
+    return clamped
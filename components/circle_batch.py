@@ -0,0 +1,95 @@
+import numpy as np
+
+
+def collide_circle_pairs(store, rows_1, rows_2):
+    """Circle-circle collide() for many pairs at once.
+
+    rows_1, rows_2 are BodyStore row indices (body_1, body_2 as collide()
+    would get them). Follows circles_collision -> circles_contact_points ->
+    response_with_rotation, but every pair reads the state from before the
+    batch and the corrections are summed (Jacobi style) instead of applied
+    one pair after another.
+
+    Returns (contact_points, rows_1, rows_2) for the k pairs that actually
+    collided: a (k, 2) array and their row indices.
+    """
+    rows_1 = np.asarray(rows_1, dtype=np.intp)
+    rows_2 = np.asarray(rows_2, dtype=np.intp)
+
+    position = store.position
+    radius_1 = store.radius[rows_1]
+    radius_2 = store.radius[rows_2]
+    delta = position[rows_2] - position[rows_1]
+    distance = np.hypot(delta[:, 0], delta[:, 1])
+
+    hit = distance < radius_1 + radius_2
+    if not hit.any():
+        return np.empty((0, 2)), rows_1[:0], rows_2[:0]
+
+    rows_1 = rows_1[hit]
+    rows_2 = rows_2[hit]
+    radius_1 = radius_1[hit]
+    radius_2 = radius_2[hit]
+    delta = delta[hit]
+    distance = distance[hit]
+
+    # normal은 body_1 -> body_2 방향 (response_with_rotation에서 뒤집은 뒤의 방향)
+    normal = np.zeros_like(delta)
+    nonzero = distance > 0
+    normal[nonzero] = delta[nonzero] / distance[nonzero, None]
+    depth = radius_1 + radius_2 - distance
+
+    center_1 = position[rows_1]
+    center_2 = position[rows_2]
+    contact = center_1 + normal * radius_1[:, None]
+
+    # separate_bodies: 정적인 쪽은 움직이지 않고 둘 다 움직이면 반씩
+    dynamic_1 = store.dynamic[rows_1]
+    dynamic_2 = store.dynamic[rows_2]
+    both = dynamic_1 * dynamic_2
+    share_1 = np.where(both > 0, 0.5, dynamic_1)
+    share_2 = np.where(both > 0, 0.5, dynamic_2)
+    separation = normal * depth[:, None]
+    center_1 = center_1 - separation * share_1[:, None]
+    center_2 = center_2 + separation * share_2[:, None]
+    np.add.at(position, rows_1, -separation * share_1[:, None])
+    np.add.at(position, rows_2, separation * share_2[:, None])
+    np.add.at(store.version, rows_1, 1)
+    np.add.at(store.version, rows_2, 1)
+
+    r_1 = contact - center_1
+    r_2 = contact - center_2
+    r_1_perp = np.stack((-r_1[:, 1], r_1[:, 0]), axis=1)
+    r_2_perp = np.stack((-r_2[:, 1], r_2[:, 0]), axis=1)
+
+    velocity = store.velocity
+    angular_velocity = store.angular_velocity
+    relative_velocity = ((velocity[rows_2] + r_2_perp * angular_velocity[rows_2, None])
+                         - (velocity[rows_1] + r_1_perp * angular_velocity[rows_1, None]))
+    penetration_velocity = np.einsum("ij,ij->i", relative_velocity, normal)
+
+    # 서로 멀어지는 쌍은 분리만 하고 충격량은 주지 않음
+    approaching = penetration_velocity <= 0
+    inv_mass_1 = store.inv_mass[rows_1]
+    inv_mass_2 = store.inv_mass[rows_2]
+    inv_inertia_1 = store.inv_inertia[rows_1]
+    inv_inertia_2 = store.inv_inertia[rows_2]
+    restitution = np.minimum(store.bounce[rows_1], store.bounce[rows_2])
+
+    denominator = (inv_mass_1 + inv_mass_2
+                   + np.einsum("ij,ij->i", r_1_perp, normal) ** 2 * inv_inertia_1
+                   + np.einsum("ij,ij->i", r_2_perp, normal) ** 2 * inv_inertia_2)
+    approaching &= denominator > 0
+
+    j = np.zeros_like(depth)
+    j[approaching] = -(1 + restitution[approaching]) * penetration_velocity[approaching] / denominator[approaching]
+    impulse = normal * j[:, None]
+
+    np.add.at(velocity, rows_1, -impulse * inv_mass_1[:, None])
+    np.add.at(velocity, rows_2, impulse * inv_mass_2[:, None])
+    cross_1 = r_1[:, 0] * impulse[:, 1] - r_1[:, 1] * impulse[:, 0]
+    cross_2 = r_2[:, 0] * impulse[:, 1] - r_2[:, 1] * impulse[:, 0]
+    np.add.at(angular_velocity, rows_1, -cross_1 * inv_inertia_1)
+    np.add.at(angular_velocity, rows_2, cross_2 * inv_inertia_2)
+
+    return contact, rows_1, rows_2
@@ -0,0 +1,184 @@
+"""Convex decomposition of simple polygons (ear clipping + Hertel-Mehlhorn).
+
+Points are (x, y) tuples. Polygon uses convex_decomposition() once when it
+is built from a concave outline, so collision detection can run SAT on
+convex pieces.
+"""
+
+
+def _cross(o, a, b):
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def signed_area(points):
+    # 반시계 방향이면 양수
+    area = 0.0
+    count = len(points)
+    for i in range(count):
+        x1, y1 = points[i]
+        x2, y2 = points[(i + 1) % count]
+        area += x1 * y2 - x2 * y1
+    return area / 2
+
+
+def mass_properties(points):
+    """(area, (cx, cy), second moment about the origin) for unit density.
+
+    points must be a simple polygon; the area is positive either way round.
+    """
+    area = 0.0
+    cx = cy = 0.0
+    moment = 0.0
+    count = len(points)
+    for i in range(count):
+        x1, y1 = points[i]
+        x2, y2 = points[(i + 1) % count]
+        cross = x1 * y2 - x2 * y1
+        area += cross
+        cx += (x1 + x2) * cross
+        cy += (y1 + y2) * cross
+        moment += cross * (x1 * x1 + x1 * x2 + x2 * x2 + y1 * y1 + y1 * y2 + y2 * y2)
+    area /= 2
+    if area == 0:
+        return 0.0, (0.0, 0.0), 0.0
+    return abs(area), (cx / (6 * area), cy / (6 * area)), abs(moment / 12)
+
+
+def clean_outline(points, tolerance=1e-9):
+    """Drops repeated points and points on a straight line between their neighbours."""
+    points = [point for index, point in enumerate(points) if point != points[index - 1]]
+    changed = True
+    while changed and len(points) >= 3:
+        changed = False
+        for index in range(len(points)):
+            a = points[index - 1]
+            b = points[index]
+            c = points[(index + 1) % len(points)]
+            scale = abs(b[0] - a[0]) + abs(b[1] - a[1]) + abs(c[0] - b[0]) + abs(c[1] - b[1])
+            if abs(_cross(a, b, c)) <= tolerance * scale * scale:
+                del points[index]
+                changed = True
+                break
+    return points
+
+
+def _segments_touch(a, b, c, d):
+    d1 = _cross(c, d, a)
+    d2 = _cross(c, d, b)
+    d3 = _cross(a, b, c)
+    d4 = _cross(a, b, d)
+    if ((d1 > 0 and d2 < 0) or (d1 < 0 and d2 > 0)) and ((d3 > 0 and d4 < 0) or (d3 < 0 and d4 > 0)):
+        return True
+
+    def on_segment(p, q, r):
+        # r이 p-q 위에 있는지 (한 직선 위에 있을 때)
+        return min(p[0], q[0]) <= r[0] <= max(p[0], q[0]) and min(p[1], q[1]) <= r[1] <= max(p[1], q[1])
+
+    return ((d1 == 0 and on_segment(c, d, a)) or (d2 == 0 and on_segment(c, d, b))
+            or (d3 == 0 and on_segment(a, b, c)) or (d4 == 0 and on_segment(a, b, d)))
+
+
+def is_simple(points):
+    """True if no two non-adjacent edges touch (the outline does not cross itself)."""
+    count = len(points)
+    for i in range(count):
+        a = points[i]
+        b = points[(i + 1) % count]
+        for j in range(i + 2, count):
+            if i == 0 and j == count - 1:
+                continue
+            if _segments_touch(a, b, points[j], points[(j + 1) % count]):
+                return False
+    return True
+
+
+def is_convex(points):
+    """True for a simple outline whose corners all turn the same way."""
+    sign = 0
+    count = len(points)
+    for i in range(count):
+        cross = _cross(points[i - 1], points[i], points[(i + 1) % count])
+        if cross != 0:
+            if sign == 0:
+                sign = 1 if cross > 0 else -1
+            elif (cross > 0) != (sign > 0):
+                return False
+    return is_simple(points)
+
+
+def _in_triangle(p, a, b, c):
+    return _cross(a, b, p) >= 0 and _cross(b, c, p) >= 0 and _cross(c, a, p) >= 0
+
+
+def triangulate(points):
+    """Ear clipping. points: simple, counter-clockwise. Returns index triples (CCW), or None if stuck."""
+    indices = list(range(len(points)))
+    triangles = []
+    while len(indices) > 3:
+        count = len(indices)
+        for k in range(count):
+            i_prev, i, i_next = indices[k - 1], indices[k], indices[(k + 1) % count]
+            a, b, c = points[i_prev], points[i], points[i_next]
+            if _cross(a, b, c) <= 0:
+                continue
+            if any(_in_triangle(points[m], a, b, c) for m in indices if m not in (i_prev, i, i_next)):
+                continue
+            triangles.append((i_prev, i, i_next))
+            del indices[k]
+            break
+        else:
+            return None
+    triangles.append(tuple(indices))
+    return triangles
+
+
+def _merge(p, q, a, b):
+    # p에는 a -> b, q에는 b -> a 변이 있을 때 그 변을 없애고 합침
+    k = p.index(a)
+    m = q.index(b)
+    p = p[k + 1:] + p[:k + 1]
+    q = q[m + 1:] + q[:m + 1]
+    return p + q[1:-1]
+
+
+def merge_convex(points, pieces):
+    """Hertel-Mehlhorn: removes inner diagonals while both sides stay convex."""
+    pieces = [list(piece) for piece in pieces]
+    merged = True
+    while merged:
+        merged = False
+        edges = {}
+        for number, piece in enumerate(pieces):
+            for index in range(len(piece)):
+                edges[(piece[index], piece[(index + 1) % len(piece)])] = number
+        for (a, b), number in edges.items():
+            other = edges.get((b, a))
+            if other is None or other <= number:
+                continue
+            candidate = _merge(pieces[number], pieces[other], a, b)
+            corners = [points[index] for index in candidate]
+            count = len(corners)
+            if all(_cross(corners[i - 1], corners[i], corners[(i + 1) % count]) >= 0 for i in range(count)):
+                pieces[number] = candidate
+                del pieces[other]
+                merged = True
+                break
+    return pieces
+
+
+def convex_decomposition(points):
+    """Convex pieces (lists of points, CCW) covering the simple polygon points.
+
+    Returns None if points is not a simple polygon.
+    """
+    points = clean_outline(list(points))
+    if len(points) < 3 or not is_simple(points):
+        return None
+    if signed_area(points) < 0:
+        points.reverse()
+    if is_convex(points):
+        return [points]
+    triangles = triangulate(points)
+    if triangles is None:
+        return None
+    return [clean_outline([points[index] for index in piece]) for piece in merge_convex(points, triangles)]
@@ -0,0 +1,73 @@
+"""Force fields for Scene(force_fields=[...]).
+
+A field gives an acceleration (like gravity, independent of mass) at a
+point. acceleration_at(x, y) is used for single bodies;
+accelerations(xs, ys) takes NumPy arrays and is used by BodyStore to
+handle every body at once. Only arithmetic and comparisons are used, so
+this module does not import numpy itself.
+"""
+
+
+class ForceField:
+    def acceleration_at(self, x, y):
+        raise NotImplementedError
+
+    def accelerations(self, xs, ys):
+        raise NotImplementedError
+
+
+class UniformField(ForceField):
+    """Constant acceleration inside region (min_x, min_y, max_x, max_y), e.g. wind.
+
+    region=None covers everything.
+    """
+
+    def __init__(self, acceleration, region=None):
+        self.acceleration = (acceleration[0], acceleration[1])
+        self.region = region
+
+    def acceleration_at(self, x, y):
+        region = self.region
+        if region is not None and not (region[0] <= x <= region[2] and region[1] <= y <= region[3]):
+            return 0.0, 0.0
+        return self.acceleration
+
+    def accelerations(self, xs, ys):
+        ax, ay = self.acceleration
+        region = self.region
+        if region is None:
+            return ax + xs * 0, ay + ys * 0
+        inside = (xs >= region[0]) & (xs <= region[2]) & (ys >= region[1]) & (ys <= region[3])
+        return inside * ax, inside * ay
+
+
+class RadialField(ForceField):
+    """Pulls toward center (strength > 0) or pushes away (strength < 0) within radius.
+
+    The acceleration is strength at the center and falls off linearly to 0
+    at radius.
+    """
+
+    def __init__(self, center, radius, strength):
+        self.center = (center[0], center[1])
+        self.radius = radius
+        self.strength = strength
+
+    def acceleration_at(self, x, y):
+        dx = self.center[0] - x
+        dy = self.center[1] - y
+        distance = (dx * dx + dy * dy) ** 0.5
+        if distance == 0 or distance >= self.radius:
+            return 0.0, 0.0
+        scale = self.strength * (1 - distance / self.radius) / distance
+        return dx * scale, dy * scale
+
+    def accelerations(self, xs, ys):
+        dx = self.center[0] - xs
+        dy = self.center[1] - ys
+        distance = (dx * dx + dy * dy) ** 0.5
+        inside = (distance > 0) & (distance < self.radius)
+        # 범위 밖(또는 중심)은 0으로 나누지 않도록 거리를 1로 바꿔 둠
+        safe = distance * inside + (1 - inside)
+        scale = inside * self.strength * (1 - distance / self.radius) / safe
+        return dx * scale, dy * scale
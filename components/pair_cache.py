@@ -0,0 +1,164 @@
+from practice_code.collision import collision_normal, find_contact_points, manifold_contact_points
+
+
+class PairEntry:
+    __slots__ = ("body_1", "body_2", "step", "axis", "edge_1", "edge_2", "normal_poses", "normal", "depth",
+                 "contact_poses", "contact_manifold", "contact_points", "parts")
+
+    def __init__(self, body_1, body_2):
+        self.body_1 = body_1
+        self.body_2 = body_2
+        self.step = 0
+        # 마지막으로 두 다각형을 갈라놓은 축 (겹쳐 있으면 None)
+        self.axis = None
+        # 마지막 clipping에서 쓴 각 다각형의 꼭짓점 번호
+        self.edge_1 = None
+        self.edge_2 = None
+        # 결과를 계산했을 때의 (x, y, angle) 두 개를 이어 붙인 것
+        self.normal_poses = None
+        self.normal = None
+        self.depth = None
+        self.contact_poses = None
+        self.contact_manifold = None
+        self.contact_points = None
+        # 오목한 다각형이 낀 쌍: collision_normal이 고른 (조각 1, 조각 2)
+        self.parts = None
+
+
+class PairCache:
+    """Narrow-phase results kept per body pair between steps.
+
+    Scene(pair_cache=PairCache()) asks the cache instead of calling
+    collision_normal / find_contact_points directly. For each pair it keeps
+    the last separating axis (tried first by polygons_collision, so pairs
+    that stay apart usually cost one projection), the vertices of the last
+    reference/incident edges (the clipping search starts there) and the
+    last normal, depth and contact points.
+
+    Results are reused while both bodies stay within linear_tolerance
+    (per axis) and angular_tolerance (radians) of where they were when the
+    results were computed, so a resting pile that sinks a little under
+    gravity every step still hits the cache. The reused depth is corrected
+    for the translation along the normal; contact points are returned as
+    they were (off by at most the tolerance). Separated pairs are only
+    reused if neither body moved at all. A circle's angle is ignored, since
+    its collisions do not depend on it.
+
+    With the default tolerances the results are approximate: a run with
+    the cache drifts slightly from the same run without it (around 1e-4
+    after a few seconds of a 60-box pile with a ContactSolver).
+    linear_tolerance=0 and angular_tolerance=0 reuse results only for
+    bodies that did not move and reproduce the uncached run exactly.
+
+    Returned contact point lists are shared with the cache; do not modify
+    them. Scene calls begin() once per step; entries for pairs that were
+    not looked at during the previous step are dropped there.
+    """
+
+    def __init__(self, linear_tolerance=0.01, angular_tolerance=0.001):
+        self.linear_tolerance = linear_tolerance
+        self.angular_tolerance = angular_tolerance
+        # (id(body_1), id(body_2)) -> PairEntry
+        self.entries = {}
+        # id(body) -> 그 body가 들어 있는 key들 (forget을 body의 쌍 개수만큼만 걸리게)
+        self._keys_of = {}
+        self.step = 0
+        self.hits = 0
+        self.misses = 0
+
+    def begin(self):
+        # 지난 step에 broad phase가 넘기지 않은 쌍은 버림
+        step = self.step
+        stale = [key for key, entry in self.entries.items() if entry.step != step]
+        for key in stale:
+            del self.entries[key]
+            self._unlink(key)
+        self.step += 1
+
+    def clear(self):
+        self.entries = {}
+        self._keys_of = {}
+
+    def forget(self, body):
+        for key in self._keys_of.pop(id(body), ()):
+            self.entries.pop(key, None)
+            self._unlink(key)
+
+    def _unlink(self, key):
+        for body_key in key:
+            keys = self._keys_of.get(body_key)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_of[body_key]
+
+    def _entry(self, body_1, body_2):
+        key = (id(body_1), id(body_2))
+        entry = self.entries.get(key)
+        # id는 지워진 body의 것이 재사용될 수 있으므로 body 자체도 확인
+        if entry is None or entry.body_1 is not body_1 or entry.body_2 is not body_2:
+            entry = PairEntry(body_1, body_2)
+            self.entries[key] = entry
+            self._keys_of.setdefault(key[0], set()).add(key)
+            self._keys_of.setdefault(key[1], set()).add(key)
+        entry.step = self.step
+        return entry
+
+    @staticmethod
+    def _poses(body_1, body_2):
+        # (x, y, angle) 두 개, 원은 회전해도 결과가 같으므로 angle을 0으로
+        center_1 = body_1.center
+        center_2 = body_2.center
+        return (center_1.x, center_1.y, 0.0 if body_1.shape_type == "Circle" else body_1.angle,
+                center_2.x, center_2.y, 0.0 if body_2.shape_type == "Circle" else body_2.angle)
+
+    def _close(self, old, poses):
+        # 두 body 모두 old에서 tolerance 안쪽으로만 움직였는지
+        linear = self.linear_tolerance
+        angular = self.angular_tolerance
+        for k in (0, 3):
+            if (abs(poses[k] - old[k]) > linear or abs(poses[k + 1] - old[k + 1]) > linear
+                    or abs(poses[k + 2] - old[k + 2]) > angular):
+                return False
+        return True
+
+    def collision_normal(self, body_1, body_2):
+        entry = self._entry(body_1, body_2)
+        poses = self._poses(body_1, body_2)
+        old = entry.normal_poses
+        if old is not None:
+            if old == poses:
+                self.hits += 1
+                return entry.normal, entry.depth
+            normal = entry.normal
+            if normal is not None and self._close(old, poses):
+                # normal은 body_2 -> body_1 방향: body_1이 normal 쪽으로 움직인 만큼 얕아짐
+                depth = entry.depth - ((poses[0] - old[0] - poses[3] + old[3]) * normal.x
+                                       + (poses[1] - old[1] - poses[4] + old[4]) * normal.y)
+                if depth > 0:
+                    self.hits += 1
+                    return normal, depth
+
+        self.misses += 1
+        normal, depth = collision_normal(body_1, body_2, entry)
+        entry.normal_poses = poses
+        entry.normal = normal
+        entry.depth = depth
+        return normal, depth
+
+    def contact_points(self, body_1, body_2, normal, manifold=False):
+        # manifold=True면 solver용 clipping 접촉점 (manifold_contact_points)
+        entry = self._entry(body_1, body_2)
+        poses = self._poses(body_1, body_2)
+        old = entry.contact_poses
+        if old is not None and entry.contact_manifold == manifold and (old == poses or self._close(old, poses)):
+            return entry.contact_points
+
+        if manifold:
+            contact_points = manifold_contact_points(body_1, body_2, normal, entry)
+        else:
+            contact_points = find_contact_points(body_1, body_2, entry)
+        entry.contact_poses = poses
+        entry.contact_manifold = manifold
+        entry.contact_points = contact_points
+        return contact_points
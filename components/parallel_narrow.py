@@ -0,0 +1,256 @@
+"""Narrow phase over a process pool (needs numpy).
+
+The main process copies every body's world-space shape into shared memory
+once per step; workers attach to it, rebuild light stand-ins for the bodies
+a chunk of pairs refers to and run the same collision_normal /
+find_contact_points functions as the serial loop. Only pair indices go to
+the workers and only (normal, depth, contact points) come back.
+"""
+import multiprocessing
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from components.pair_cache import PairEntry
+from components.vector import Vector2D
+from practice_code.collision import collision_normal, find_contact_points, manifold_contact_points
+
+# shapes 배열의 열: center_x, center_y, radius, 꼭짓점 시작 위치, 꼭짓점 개수, 종류
+_POLYGON = 0
+_CIRCLE = 1
+_OTHER = 2
+_SHAPE_COLUMNS = 6
+
+
+class _Shape:
+    # worker 안에서 Polygon / Circle 대신 쓰는 객체 (collision.py가 쓰는 속성만 있음)
+    __slots__ = ("shape_type", "center", "radius", "pieces", "_vertices", "_normals")
+
+    def get_vertices(self):
+        return self._vertices
+
+    def get_normals(self):
+        return self._normals
+
+
+# worker 프로세스마다 붙어 있는 공유 메모리 {name: SharedMemory}
+_attached = {}
+
+
+def _drop_stale(names):
+    # main 프로세스가 공유 메모리를 새로 만들었으면 예전 것은 닫음
+    for name in list(_attached):
+        if name not in names:
+            _attached.pop(name).close()
+
+
+def _view(name, shape):
+    shm = _attached.get(name)
+    if shm is None:
+        # pool worker는 main 프로세스의 resource tracker를 같이 쓰므로 따로 등록을 뺄 필요 없음
+        shm = SharedMemory(name=name)
+        _attached[name] = shm
+    return np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _build_shape(index, shapes, vertices, normals):
+    center_x, center_y, radius, start, count, kind = shapes[index]
+    if kind == _OTHER:
+        return None
+
+    shape = _Shape()
+    shape.pieces = None
+    shape.center = Vector2D(center_x, center_y)
+    shape.radius = radius
+    if kind == _CIRCLE:
+        shape.shape_type = "Circle"
+        shape._vertices = shape._normals = None
+    else:
+        shape.shape_type = "Polygon"
+        start = int(start)
+        end = start + int(count)
+        shape._vertices = [Vector2D(x, y) for x, y in vertices[start:end]]
+        shape._normals = [Vector2D(x, y) for x, y in normals[start:end]]
+    return shape
+
+
+def _detect_chunk(names, body_count, vertex_count, pairs, manifold):
+    _drop_stale(names)
+    shapes = _view(names[0], (body_count, _SHAPE_COLUMNS)).tolist()
+    vertices = _view(names[1], (vertex_count, 2)).tolist()
+    normals = _view(names[2], (vertex_count, 2)).tolist()
+
+    built = {}
+    results = []
+    for position, (i, j) in enumerate(pairs):
+        for index in (i, j):
+            if index not in built:
+                built[index] = _build_shape(index, shapes, vertices, normals)
+        body_1 = built[i]
+        body_2 = built[j]
+        if body_1 is None or body_2 is None:
+            continue
+
+        normal, depth = collision_normal(body_1, body_2)
+        if normal is None or depth is None:
+            continue
+        if manifold:
+            contact_points = manifold_contact_points(body_1, body_2, normal)
+        else:
+            contact_points = find_contact_points(body_1, body_2)
+        if contact_points is None:
+            continue
+        results.append((position, normal.x, normal.y, depth,
+                        [(point.x, point.y) for point in contact_points if point is not None]))
+    return results
+
+
+def _release(segments):
+    for shm in segments:
+        shm.close()
+        shm.unlink()
+    segments.clear()
+
+
+class ParallelNarrowPhase:
+    """Runs the narrow-phase tests of one step on a ProcessPoolExecutor.
+
+    Scene(parallel=ParallelNarrowPhase()) hands the candidate pairs to
+    detect() whenever there are at least min_pairs of them (fewer are not
+    worth the round trip). detect() returns (pair, normal, depth,
+    contact_points) for every colliding pair in the order the pairs were
+    given, so the Scene applies responses in the same order every run.
+
+    Unlike the serial loop, every pair is tested against the positions at
+    the start of the phase; a response does not move bodies before the
+    following pairs are tested (with a ContactSolver this makes no
+    difference). The pair cache is not used for pairs sent to the pool.
+    Pairs with a concave Polygon (body.pieces) are tested in the main
+    process, since only whole outlines go to shared memory.
+
+    Call close() (or use it as a context manager) to stop the workers and
+    free the shared memory.
+    """
+
+    def __init__(self, workers=None, min_pairs=2000, chunks_per_worker=4):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.min_pairs = min_pairs
+        self.chunks_per_worker = chunks_per_worker
+        self._executor = None
+        # [shapes, vertices, normals] 공유 메모리, 모자라면 더 크게 새로 만듦
+        self._segments = []
+        self._capacities = (0, 0)
+        self._finalizer = weakref.finalize(self, _release, self._segments)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        _release(self._segments)
+        self._capacities = (0, 0)
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _reserve(self, body_count, vertex_count):
+        body_capacity, vertex_capacity = self._capacities
+        if body_count <= body_capacity and vertex_count <= vertex_capacity and self._segments:
+            return
+        body_capacity = max(body_count, body_capacity * 2, 64)
+        vertex_capacity = max(vertex_count, vertex_capacity * 2, 256)
+        _release(self._segments)
+        self._segments.append(SharedMemory(create=True, size=body_capacity * _SHAPE_COLUMNS * 8))
+        self._segments.append(SharedMemory(create=True, size=vertex_capacity * 2 * 8))
+        self._segments.append(SharedMemory(create=True, size=vertex_capacity * 2 * 8))
+        self._capacities = (body_capacity, vertex_capacity)
+
+    def _publish(self, bodies):
+        # 모든 body의 월드 좌표 모양을 공유 메모리에 씀
+        rows = []
+        vertex_rows = []
+        normal_rows = []
+        for body in bodies:
+            center = body.center
+            if body.is_fragment:
+                rows.append((center.x, center.y, 0.0, 0.0, 0.0, _OTHER))
+            elif body.shape_type == "Circle":
+                rows.append((center.x, center.y, body.radius, 0.0, 0.0, _CIRCLE))
+            elif body.shape_type == "Polygon":
+                vertices = body.get_vertices()
+                rows.append((center.x, center.y, 0.0, len(vertex_rows), len(vertices), _POLYGON))
+                vertex_rows.extend((v.x, v.y) for v in vertices)
+                normal_rows.extend((n.x, n.y) for n in body.get_normals())
+            else:
+                rows.append((center.x, center.y, 0.0, 0.0, 0.0, _OTHER))
+
+        body_count = len(rows)
+        vertex_count = len(vertex_rows)
+        self._reserve(body_count, vertex_count)
+        shapes, vertices, normals = self._segments
+        np.ndarray((body_count, _SHAPE_COLUMNS), dtype=np.float64, buffer=shapes.buf)[:] = rows
+        if vertex_count:
+            np.ndarray((vertex_count, 2), dtype=np.float64, buffer=vertices.buf)[:] = vertex_rows
+            np.ndarray((vertex_count, 2), dtype=np.float64, buffer=normals.buf)[:] = normal_rows
+        return body_count, vertex_count
+
+    def detect(self, bodies, pairs, manifold=False):
+        """pairs: list of (i, j) indices into bodies. manifold=True gives
+        manifold_contact_points (for a ContactSolver)."""
+        if not pairs:
+            return []
+
+        # 오목한 다각형(조각으로 나뉜 body)이 낀 쌍은 여기서 직접 계산
+        local = [position for position, (i, j) in enumerate(pairs) if bodies[i].pieces or bodies[j].pieces]
+        positions = range(len(pairs))
+        if local:
+            skip = set(local)
+            positions = [position for position in positions if position not in skip]
+
+        # (pairs에서의 위치, 결과)
+        found = []
+        if positions:
+            remote = [pairs[position] for position in positions]
+            body_count, vertex_count = self._publish(bodies)
+            names = [shm.name for shm in self._segments]
+
+            chunk_count = max(1, min(len(remote), self.workers * self.chunks_per_worker))
+            chunk_size = -(-len(remote) // chunk_count)
+            chunks = [remote[start:start + chunk_size] for start in range(0, len(remote), chunk_size)]
+
+            pool = self._pool()
+            futures = [pool.submit(_detect_chunk, names, body_count, vertex_count, chunk, manifold) for chunk in chunks]
+
+            for chunk_index, future in enumerate(futures):
+                offset = chunk_index * chunk_size
+                for position, normal_x, normal_y, depth, points in future.result():
+                    found.append((positions[offset + position], (remote[offset + position], Vector2D(normal_x, normal_y),
+                                                                 depth, [Vector2D(x, y) for x, y in points])))
+
+        for position in local:
+            i, j = pairs[position]
+            # 법선을 구할 때 고른 조각 쌍을 접촉점에도 쓰도록 PairEntry에 담아 넘김
+            entry = PairEntry(bodies[i], bodies[j])
+            normal, depth = collision_normal(bodies[i], bodies[j], entry)
+            if normal is None or depth is None:
+                continue
+            if manifold:
+                contact_points = manifold_contact_points(bodies[i], bodies[j], normal, entry)
+            else:
+                contact_points = find_contact_points(bodies[i], bodies[j], entry)
+            if contact_points is None:
+                continue
+            found.append((position, (pairs[position], normal, depth, [point for point in contact_points if point is not None])))
+
+        if local:
+            found.sort(key=lambda item: item[0])
+        return [result for _, result in found]
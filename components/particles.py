@@ -0,0 +1,73 @@
+import numpy as np
+
+
+class ParticleSystem:
+    """Fixed-capacity particles in NumPy arrays (position, velocity, radius, life).
+
+    Live particles are always rows 0..count-1. update() moves them all at
+    once and packs the survivors to the front, so dead particles cost no
+    per-item removal. emit() adds a whole burst in one call; when the
+    arrays are full the rest of the burst is dropped.
+    """
+
+    def __init__(self, capacity=100000, seed=None):
+        self.capacity = capacity
+        self.position = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        self.radius = np.zeros(capacity, dtype=np.int32)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, position, count, life, speed=(1, 5), radius=(2, 5), velocity=(0, 0)):
+        """Bursts count particles out of position in random directions.
+
+        speed and radius are (min, max) ranges (radius inclusive); velocity
+        is added to every new particle (e.g. the velocity of what broke).
+        Returns how many particles were actually added.
+        """
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return 0
+        start = self.count
+        end = start + count
+        rng = self.rng
+
+        angle = rng.uniform(0, 2 * np.pi, count)
+        magnitude = rng.uniform(speed[0], speed[1], count)
+        self.position[start:end] = position
+        self.velocity[start:end, 0] = np.cos(angle) * magnitude + velocity[0]
+        self.velocity[start:end, 1] = np.sin(angle) * magnitude + velocity[1]
+        self.radius[start:end] = rng.integers(radius[0], radius[1] + 1, count)
+        self.life[start:end] = life
+        self.count = end
+        return count
+
+    def update(self, steps=1):
+        """Advances every particle by steps frames and drops the dead ones."""
+        n = self.count
+        if n == 0 or steps <= 0:
+            return
+        self.position[:n] += self.velocity[:n] * steps
+        self.life[:n] -= steps
+
+        alive = self.life[:n] > 0
+        if alive.all():
+            return
+        # 살아남은 파티클을 앞쪽으로 모음
+        keep = np.flatnonzero(alive)
+        k = len(keep)
+        for array in (self.position, self.velocity, self.radius, self.life):
+            array[:k] = array[keep]
+        self.count = k
+
+    def alive(self):
+        """(position, radius) views of the live particles."""
+        n = self.count
+        return self.position[:n], self.radius[:n]
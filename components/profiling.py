@@ -0,0 +1,63 @@
+from collections import deque
+
+# Scene.step이 넘겨주는 기록의 시간 항목 (초)
+PHASES = ("integration", "broad_phase", "narrow_phase", "contact_points", "response", "circle_batch")
+# 개수 항목
+COUNTS = ("pairs_tested", "pairs_colliding", "contact_count")
+
+
+def new_record():
+    record = dict.fromkeys(PHASES, 0.0)
+    record.update(dict.fromkeys(COUNTS, 0))
+    record["total"] = 0.0
+    return record
+
+
+class StepStats:
+    """Rolling statistics over the last `window` Scene.step records.
+
+    An instance is callable, so it can be used directly as Scene.profiler:
+
+        stats = StepStats()
+        scene.profiler = stats
+        ...
+        print(stats.summary())
+    """
+
+    def __init__(self, window=360):
+        self.records = deque(maxlen=window)
+        self.steps = 0
+
+    def __call__(self, record):
+        self.records.append(record)
+        self.steps += 1
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def last(self):
+        return self.records[-1] if self.records else None
+
+    def mean(self, key):
+        if not self.records:
+            return 0.0
+        return sum(record[key] for record in self.records) / len(self.records)
+
+    def max(self, key):
+        if not self.records:
+            return 0.0
+        return max(record[key] for record in self.records)
+
+    def summary(self):
+        keys = PHASES + COUNTS + ("total",)
+        return {
+            "steps": self.steps,
+            "window": len(self.records),
+            "mean": {key: self.mean(key) for key in keys},
+            "max": {key: self.max(key) for key in keys},
+        }
+
+    def reset(self):
+        self.records.clear()
+        self.steps = 0
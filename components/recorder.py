@@ -0,0 +1,182 @@
+"""Streams per-step body states to disk (needs numpy).
+
+    recorder = TrajectoryRecorder("run.trj")
+    scene.recorder = recorder          # called after every Scene.step
+    ...
+    recorder.close()
+
+    for step, time, bodies, states in read_trajectory("run.trj"):
+        ...                            # states: (n, 6) x, y, angle, vx, vy, angular_velocity
+
+Each frame is compared with the previous one: only bodies whose state
+changed are written, as the XOR of the float64 bit patterns (lossless, and
+mostly zero bytes for small changes, which compresses well). Unchanged
+bodies (static walls, sleeping piles) cost nothing. Frames are collected
+into chunks of chunk_frames and each chunk is zlib-compressed and written
+out, so memory use does not grow with the length of the run. Whenever the
+set of bodies changes, a key frame with the full state and the body names
+is written.
+
+File: b"TRJ1", then chunks of (<II compressed size, frame count) + data.
+"""
+import json
+import struct
+import zlib
+
+import numpy as np
+
+MAGIC = b"TRJ1"
+KEY = b"K"
+DELTA = b"D"
+COLUMNS = ("x", "y", "angle", "vx", "vy", "angular_velocity")
+
+_FRAME = struct.Struct("<cqdI")
+_CHUNK = struct.Struct("<II")
+_COUNT = struct.Struct("<I")
+
+
+def body_states(bodies):
+    # (n, 6) float64: x, y, angle, vx, vy, angular_velocity
+    states = np.empty((len(bodies), len(COLUMNS)), dtype=np.float64)
+    for index, body in enumerate(bodies):
+        center = body.center
+        velocity = body.velocity
+        states[index] = (center.x, center.y, body.angle, velocity.x, velocity.y, body.angular_velocity)
+    return states
+
+
+def _body_info(body):
+    return {"name": body.name, "type": "Fragment" if body.is_fragment else body.shape_type,
+            "static": body.is_static}
+
+
+def encode_frames():
+    """Generator: send (step, time, bodies) and get back the bytes of that frame."""
+    previous_ids = None
+    previous = None
+    encoded = None
+    while True:
+        step, time, bodies = yield encoded
+        states = body_states(bodies)
+        ids = [id(body) for body in bodies]
+
+        if ids != previous_ids:
+            info = json.dumps([_body_info(body) for body in bodies]).encode("utf-8")
+            encoded = b"".join((_FRAME.pack(KEY, step, time, len(bodies)), _COUNT.pack(len(info)), info,
+                                states.tobytes()))
+        else:
+            bits = states.view(np.uint64) ^ previous.view(np.uint64)
+            changed = np.flatnonzero(bits.any(axis=1)).astype(np.uint32)
+            encoded = b"".join((_FRAME.pack(DELTA, step, time, len(bodies)), _COUNT.pack(len(changed)),
+                                changed.tobytes(), bits[changed].tobytes()))
+
+        previous_ids = ids
+        previous = states
+
+
+def write_chunks(file, chunk_frames, level):
+    """Generator: send frame bytes; every chunk_frames frames (or on send(None))
+    the collected frames are compressed and written."""
+    buffer = []
+    while True:
+        frame = yield
+        if frame is not None:
+            buffer.append(frame)
+        if buffer and (frame is None or len(buffer) >= chunk_frames):
+            data = zlib.compress(b"".join(buffer), level)
+            file.write(_CHUNK.pack(len(data), len(buffer)))
+            file.write(data)
+            buffer = []
+
+
+class TrajectoryRecorder:
+    """Scene.recorder hook: records the scene after every step."""
+
+    def __init__(self, path, chunk_frames=256, level=6, every=1):
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.every = every
+        self.steps = 0
+        self.time = 0.0
+        self.frames = 0
+
+        self._encoder = encode_frames()
+        next(self._encoder)
+        self._writer = write_chunks(self.file, chunk_frames, level)
+        next(self._writer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __call__(self, scene, dt):
+        self.steps += 1
+        self.time += dt
+        if self.steps % self.every == 0:
+            self.record(scene.bodies, self.steps, self.time)
+
+    def record(self, bodies, step, time):
+        self._writer.send(self._encoder.send((step, time, bodies)))
+        self.frames += 1
+
+    def flush(self):
+        # 모인 프레임을 지금 바로 압축해서 씀
+        self._writer.send(None)
+        self.file.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self._writer.close()
+        self._encoder.close()
+        self.file.close()
+
+
+def _read_chunks(file):
+    while True:
+        header = file.read(_CHUNK.size)
+        if len(header) < _CHUNK.size:
+            return
+        size, count = _CHUNK.unpack(header)
+        yield count, zlib.decompress(file.read(size))
+
+
+def read_trajectory(path):
+    """Yields (step, time, bodies, states) for every recorded frame.
+
+    bodies is the list of {"name", "type", "static"} from the last key
+    frame (the same list object until the set of bodies changes); states is
+    a fresh (n, 6) array.
+    """
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("{} is not a trajectory file".format(path))
+
+        bodies = None
+        bits = None
+        for count, data in _read_chunks(file):
+            offset = 0
+            for _ in range(count):
+                kind, step, time, n = _FRAME.unpack_from(data, offset)
+                offset += _FRAME.size
+                (length,) = _COUNT.unpack_from(data, offset)
+                offset += _COUNT.size
+
+                if kind == KEY:
+                    bodies = json.loads(data[offset:offset + length].decode("utf-8"))
+                    offset += length
+                    bits = np.frombuffer(data, dtype=np.uint64, count=n * len(COLUMNS),
+                                         offset=offset).reshape(n, len(COLUMNS)).copy()
+                    offset += bits.nbytes
+                else:
+                    changed = np.frombuffer(data, dtype=np.uint32, count=length, offset=offset)
+                    offset += changed.nbytes
+                    delta = np.frombuffer(data, dtype=np.uint64, count=length * len(COLUMNS),
+                                          offset=offset).reshape(length, len(COLUMNS))
+                    offset += delta.nbytes
+                    bits[changed] ^= delta
+
+                yield step, time, bodies, bits.view(np.float64).copy()
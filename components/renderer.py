@@ -0,0 +1,122 @@
+import math
+from itertools import repeat
+
+import numpy as np
+import pygame
+
+# 스프라이트 배경으로 쓰는 색 (투명 처리)
+_COLORKEY = (255, 0, 255)
+# 파티클 좌표를 int64 하나로 묶을 때 음수를 피하려고 더하는 값
+_OFFSET = 1 << 15
+
+
+class Renderer:
+    """Draws Scene bodies and particles with as few pygame calls as possible.
+
+    Circles and particles are blitted from pre-rendered sprites (one per
+    radius and color) in a single Surface.blits call. Polygon screen points
+    are cached per body and only rebuilt when the drawn transform changes;
+    if it is the body's current transform, the cached world vertices from
+    get_vertices() are reused.
+
+    World space is y-up, the screen is y-down: screen y = height - y.
+    """
+
+    def __init__(self, screen, height, polygon_color=(0, 0, 0), circle_color=(0, 255, 255),
+                 name_colors=None):
+        self.screen = screen
+        self.height = height
+        self.polygon_color = polygon_color
+        self.circle_color = circle_color
+        # body.name -> 다각형 색 (body마다 한 번만 찾음)
+        self.name_colors = dict(name_colors or {})
+        self._sprites = {}
+        # id(body) -> [body, color, transform, screen points]
+        self._polygons = {}
+
+    def sprite(self, radius, color):
+        """Cached surface with a filled circle of radius, centered at (radius, radius)."""
+        key = (radius, color)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((2 * radius, 2 * radius))
+            sprite.fill(_COLORKEY)
+            pygame.draw.circle(sprite, color, (radius, radius), radius)
+            sprite.set_colorkey(_COLORKEY)
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert()
+            self._sprites[key] = sprite
+        return sprite
+
+    def draw_bodies(self, bodies, transform=None):
+        """Draws polygons and circles.
+
+        transform(body) -> (x, y, angle) is the pose to draw, e.g.
+        Scene.interpolated_transform; by default the current pose.
+        """
+        height = self.height
+        screen = self.screen
+        blits = []
+        polygons = self._polygons
+
+        for body in bodies:
+            shape = body.shape_type
+            if shape == "Circle":
+                if transform is None:
+                    x, y = body.center.x, body.center.y
+                else:
+                    x, y, _ = transform(body)
+                radius = int(body.radius)
+                if radius > 0:
+                    blits.append((self.sprite(radius, self.circle_color), (int(x) - radius, int(height - y) - radius)))
+            elif shape == "Polygon":
+                entry = polygons.get(id(body))
+                if entry is None or entry[0] is not body:
+                    entry = polygons[id(body)] = [body, self.name_colors.get(body.name, self.polygon_color), None, None]
+                pose = (body.center.x, body.center.y, body.angle) if transform is None else transform(body)
+                if pose != entry[2]:
+                    entry[2] = pose
+                    entry[3] = self._polygon_points(body, pose)
+                pygame.draw.polygon(screen, entry[1], entry[3])
+
+        if blits:
+            screen.blits(blits, doreturn=False)
+
+        # 지워진 body의 캐시 정리
+        if len(polygons) > 2 * len(bodies) + 64:
+            alive = {id(body) for body in bodies}
+            for key in [key for key in polygons if key not in alive]:
+                del polygons[key]
+
+    def _polygon_points(self, body, pose):
+        height = self.height
+        x, y, angle = pose
+        if x == body.center.x and y == body.center.y and angle == body.angle:
+            # 현재 상태 그대로: 물리에서 쓰는 꼭짓점 캐시를 재사용
+            return [(v.x, height - v.y) for v in body.get_vertices()]
+        cos = math.cos(angle)
+        sin = math.sin(angle)
+        return [(v.x * cos - v.y * sin + x, height - (v.x * sin + v.y * cos + y)) for v in body.local_vertices]
+
+    def draw_particles(self, positions, radii, color=(0, 0, 0)):
+        """positions (n, 2) in world space and integer radii (n,), e.g. ParticleSystem.alive().
+
+        Particles outside the screen are skipped. Radii must be below 256.
+        """
+        if len(radii) == 0:
+            return
+        width, height = self.screen.get_size()
+        radii = radii.astype(np.int64)
+        left = positions[:, 0].astype(np.int64) - radii
+        top = (self.height - positions[:, 1]).astype(np.int64) - radii
+        visible = (radii > 0) & (left < width) & (top < height) & (left + 2 * radii > 0) & (top + 2 * radii > 0)
+
+        # 같은 자리에 같은 크기로 겹친 파티클은 한 번만 그림 (막 터진 직후엔 거의 다 겹침)
+        keys = np.unique(((left[visible] + _OFFSET) << 24) | ((top[visible] + _OFFSET) << 8) | radii[visible])
+        radii = keys & 0xFF
+        corners = np.column_stack(((keys >> 24) - _OFFSET, ((keys >> 8) & 0xFFFF) - _OFFSET))
+
+        # 크기별로 같은 스프라이트를 한 번의 blits로
+        for radius in np.unique(radii).tolist():
+            sprite = self.sprite(radius, color)
+            self.screen.blits(zip(repeat(sprite), corners[radii == radius].tolist()), doreturn=False)
@@ -0,0 +1,103 @@
+import hashlib
+import random
+import struct
+import time
+
+from components.scene_loader import scene_state
+
+
+def max_speed(scene):
+    speed = 0.0
+    for body in scene.bodies:
+        if body.is_static or body.is_fragment:
+            continue
+        speed = max(speed, body.velocity.magnitude())
+    return speed
+
+
+def kinetic_energy(scene):
+    energy = 0.0
+    for body in scene.bodies:
+        if body.is_static or body.is_fragment:
+            continue
+        velocity = body.velocity
+        energy += 0.5 * body.mass * (velocity.x * velocity.x + velocity.y * velocity.y)
+        energy += 0.5 * body.inertia * body.angular_velocity * body.angular_velocity
+    return energy
+
+
+_STATE = struct.Struct("<6d")
+
+
+def state_digest(scene):
+    # body_id 순서로 모든 body 상태의 float 비트를 해시 (bit 단위로 같은지 비교용)
+    digest = hashlib.sha1()
+    for body in sorted(scene.bodies, key=scene.body_id):
+        center = body.center
+        velocity = body.velocity
+        digest.update(_STATE.pack(center.x, center.y, body.angle, velocity.x, velocity.y, body.angular_velocity))
+    return digest.hexdigest()
+
+
+def verify_replay(build, dt, steps, shuffle_seed=None):
+    """Builds two scenes with build() and steps them side by side.
+
+    With shuffle_seed the second scene's body list is shuffled first (a
+    Scene(deterministic=True) must not care). Returns the first step after
+    which the two state digests differ, or None if all steps matched.
+    """
+    scene_1 = build()
+    scene_2 = build()
+    if shuffle_seed is not None:
+        for body in scene_2.bodies:
+            scene_2.body_id(body)
+        random.Random(shuffle_seed).shuffle(scene_2.bodies)
+
+    for step in range(1, steps + 1):
+        scene_1.step(dt)
+        scene_2.step(dt)
+        if state_digest(scene_1) != state_digest(scene_2):
+            return step
+    return None
+
+
+def run_headless(scene, dt, steps=None, until=None, snapshot_every=0, on_snapshot=None, max_steps=1000000):
+    """Steps scene at a fixed dt without any rendering.
+
+    Stops after `steps` steps, or as soon as until(scene, step) returns True
+    (checked after every step), whichever comes first. Every
+    `snapshot_every` steps (and after the last one) on_snapshot(step, time,
+    states) is called with scene_state(scene).
+
+    Returns {"steps", "sim_time", "wall_time", "stopped_by"}.
+    """
+    if steps is None and until is None:
+        raise ValueError("run_headless needs steps or until")
+
+    limit = steps if steps is not None else max_steps
+    stopped_by = "steps" if steps is not None else "max_steps"
+    start = time.perf_counter()
+
+    step = 0
+    last_snapshot = -1
+    while step < limit:
+        scene.step(dt)
+        step += 1
+
+        if on_snapshot is not None and snapshot_every and step % snapshot_every == 0:
+            on_snapshot(step, step * dt, scene_state(scene))
+            last_snapshot = step
+
+        if until is not None and until(scene, step):
+            stopped_by = "until"
+            break
+
+    if on_snapshot is not None and last_snapshot != step:
+        on_snapshot(step, step * dt, scene_state(scene))
+
+    return {
+        "steps": step,
+        "sim_time": step * dt,
+        "wall_time": time.perf_counter() - start,
+        "stopped_by": stopped_by,
+    }
@@ -1,56 +1,516 @@
 from practice_code.body import Body
-from practice_code.collision import collide
+from components.vector import Vector2D
+from practice_code.collision import collision_normal, find_contact_points, manifold_contact_points, response_with_rotation
+from components.broad_phase import BroadPhase, aabb_overlap, brute_force_query, is_active, ray_aabb
+from components.aabb_tree import AABBTree
+from components.ccd import advance_to_impact
+from components.profiling import new_record
+import random
+import time
+
+
+def _no_clock():
+    # profiler가 없을 때 handle_collisions의 시간 측정을 건너뜀
+    return 0.0
 
 
 class Scene:
-    def __init__(self, bodies: list[Body], gravity = 9.8):
+    def __init__(self, bodies: list[Body], gravity = 9.8, broad_phase: BroadPhase = None, store = None,
+                 fixed_dt = 1 / 360, max_substeps = 8, sleep = None, solver = None, pair_cache = None,
+                 parallel = None, seed = None, deterministic = False, force_fields = None):
         self.bodies: list[Body] = bodies
+        # 장면마다 따로 쓰는 난수 (Fragment, 파티클 등), seed가 같으면 같은 결과
+        self.rng = random.Random(seed)
+        # True면 충돌 쌍을 body_id 순서로 처리 (bodies 리스트 순서와 무관하게 같은 결과)
+        self.deterministic = deterministic
+        self._next_body_id = 0
+        # handle(body_id) -> body, handle -> bodies 안의 위치 (add / remove를 O(1)로)
+        self._handles = {}
+        self._positions = {}
+        self._reindex()
         self._contact_points = []
+        # 이번 step에 실제로 충돌한 (body_1, body_2) 쌍
+        self._colliding_pairs = []
+        # None이면 모든 쌍을 검사 (O(n^2))
+        self.broad_phase = broad_phase
+        # components.body_store.BodyStore, 있으면 위치 적분을 한 번에 처리
+        # (store를 쓸 때는 body를 Scene.add / Scene.remove로만 넣고 뺄 것)
+        self.store = store
+        if store is not None:
+            for body in bodies:
+                if not body.is_fragment:
+                    store.attach(body)
         
         
+        # y축이 위쪽이므로 중력 가속도는 (0, -gravity), body마다 gravity_scale을 곱함
         self.gravity = gravity
+        # components.forces의 힘 장 (영역 안의 body에 가속도를 더함)
+        # 실행 중에 바꿀 때는 add_force_field / remove_force_field (잠든 body를 깨움)
+        self.force_fields = list(force_fields) if force_fields is not None else []
+        # components.solver.ContactSolver, 있으면 충돌 응답을 모아서 반복 계산
+        self.solver = solver
+        # components.sleep.SleepSystem, 있으면 멈춘 body들을 재움
+        self.sleep = sleep
+        # components.pair_cache.PairCache, 있으면 쌍마다 지난 step의 충돌 결과를 재사용
+        self.pair_cache = pair_cache
+        # components.parallel_narrow.ParallelNarrowPhase, 쌍이 많을 때 충돌 검사를 여러 프로세스로 나눔
+        self.parallel = parallel
+        # step마다 단계별 시간/개수 기록(dict)을 받는 함수, 예: components.profiling.StepStats()
+        self.profiler = None
+        # step이 끝날 때마다 recorder(scene, dt)로 호출, 예: components.recorder.TrajectoryRecorder
+        self.recorder = None
+
+        # advance()용 고정 시간 간격
+        self.fixed_dt = fixed_dt
+        self.max_substeps = max_substeps
+        self.max_frame_time = 0.25
+        self.alpha = 0.0
+        self._accumulator = 0.0
+        self._previous_transforms = {}
+
+    def body_id(self, body):
+        # 처음 물어볼 때 번호를 붙임 (Scene.add를 거치지 않고 들어온 body도)
+        if body.body_id is None:
+            body.body_id = self._next_body_id
+            self._next_body_id += 1
+        return body.body_id
+
+    def _register(self, body):
+        # body_id를 handle로 씀, 다른 Scene에서 받은 번호가 이미 쓰이고 있으면 새 번호
+        handle = body.body_id
+        if handle is None or self._handles.get(handle, body) is not body:
+            handle = body.body_id = self._next_body_id
+        self._next_body_id = max(self._next_body_id, handle + 1)
+        self._handles[handle] = body
+        return handle
+
+    def _reindex(self):
+        self._handles = {}
+        self._positions = {}
+        for index, body in enumerate(self.bodies):
+            self._positions[self._register(body)] = index
+
+    def _index_of(self, body):
+        handle = body.body_id
+        index = self._positions.get(handle) if handle is not None else None
+        if index is not None and index < len(self.bodies) and self.bodies[index] is body:
+            return index
+        if index is None and len(self._positions) == len(self.bodies):
+            return None
+
+        # bodies 리스트를 직접 고친 경우: 위치 표를 다시 만듦
+        self._reindex()
+        index = self._positions.get(body.body_id)
+        if index is None or self.bodies[index] is not body:
+            return None
+        return index
+
+    def get(self, handle):
+        # handle로 body 찾기, 이미 지워졌으면 None
+        return self._handles.get(handle)
 
     def add(self, body: Body):
+        """Adds body and returns its handle (a stable int, also body.body_id)."""
+        handle = self._register(body)
+        self._positions[handle] = len(self.bodies)
         self.bodies.append(body)
+        if self.store is not None and not body.is_fragment:
+            self.store.attach(body)
+        if self.broad_phase is not None:
+            self.broad_phase.add(body)
+        return handle
 
     #remove 추가
 
     def remove(self, body):
-        if body in self.bodies:
-            self.bodies.remove(body)
+        """Removes a body (or handle) in O(1); unknown bodies are ignored.
+
+        The last body in self.bodies takes the removed body's place, so the
+        order of self.bodies changes (deterministic scenes do not care).
+        """
+        if isinstance(body, int):
+            body = self._handles.get(body)
+            if body is None:
+                return
+        index = self._index_of(body)
+        if index is None:
+            return
+
+        last = self.bodies.pop()
+        if last is not body:
+            self.bodies[index] = last
+            self._positions[last.body_id] = index
+        del self._positions[body.body_id]
+        del self._handles[body.body_id]
+
+        if self.store is not None:
+            self.store.detach(body)
+        if self.broad_phase is not None:
+            self.broad_phase.remove(body)
+        if self.sleep is not None:
+            # 이 body 위에서 잠든 섬은 깨움
+            self.sleep.forget(self, body)
+        if self.pair_cache is not None:
+            self.pair_cache.forget(body)
+        if self.solver is not None:
+            self.solver.forget(body)
+
+    def add_many(self, bodies):
+        return [self.add(body) for body in bodies]
+
+    def remove_many(self, bodies):
+        for body in bodies:
+            self.remove(body)
+
+    def add_fragment(self, fragment):
+        # 원들과 Fragment를 한 번에 (main.py의 F 키)
+        return self.add_many(fragment.circles + [fragment])
+
+    def remove_fragment(self, fragment):
+        self.remove_many(fragment.circles + [fragment])
+
+    def add_force_field(self, field):
+        self.force_fields.append(field)
+        if self.sleep is not None:
+            # 잠든 body도 새 힘을 받도록
+            self.sleep.wake_all(self)
+
+    def remove_force_field(self, field):
+        self.force_fields.remove(field)
+        if self.sleep is not None:
+            self.sleep.wake_all(self)
+
+    def wake(self, body):
+        # 밖에서 잠든 body의 속도를 바꿀 때 호출
+        if self.sleep is not None and body.is_sleeping:
+            self.sleep.wake(self, body)
             
     def update_position(self, dt):
+        if self.sleep is not None:
+            # 잠든 동안 apply_force / apply_torque를 받은 body를 섬째로 깨움
+            self.sleep.wake_pending(self)
+
+        # ccd body는 움직이기 전 위치를 기억해 두었다가 지나친 충돌이 있으면 되돌림 (components.ccd)
+        # (방금 깨어난 body도 포함되도록 wake_pending 뒤에)
+        ccd_moves = [(body, (body.center.x, body.center.y, body.angle)) for body in self.bodies
+                     if body.ccd and not body.is_static and not body.is_sleeping]
+
+        if self.store is not None:
+            # 모든 body를 한 번에 적분하고 Fragment는 중심만 다시 계산
+            self.store.integrate(dt, (0.0, -self.gravity), self.force_fields)
+            if ccd_moves:
+                advance_to_impact(self, ccd_moves, dt)
+            for body in self.bodies:
+                if body.is_fragment:
+                    body.update_center()
+            return
+
+        fragments = []
         for body in self.bodies:
             if body.is_fragment:  # is_fluid 속성으로 Fluid 객체 확인
                 for circle in body.circles:  # Fluid 내부의 Circle 객체들 처리
-                    if not circle.is_static:
+                    if self._handles.get(circle.body_id) is circle:
+                        # Scene에 들어 있는 원은 아래에서 다른 body처럼 적분됨 (두 번 움직이지 않도록)
+                        continue
+                    if not circle.is_static and not circle.is_sleeping and (circle.velocity.x or circle.velocity.y):
                         circle.center += circle.velocity * dt
                         # 필요한 경우, 각 Circle의 angle과 angular_velocity 업데이트
                         # circle.angle += circle.angular_velocity * dt
-                # Fluid 객체의 중심을 업데이트
-                body.update_center()
-            elif body.is_static == False:  # 일반 Body 객체 처리
-                body.center += body.velocity * dt
-                body.angle += body.angular_velocity * dt
+                fragments.append(body)
+            elif body.is_static == False and not body.is_sleeping:  # 일반 Body 객체 처리
+                self._apply_forces(body, dt)
+                # 멈춰 있으면 건드리지 않아야 transform_version이 그대로 남아 캐시가 유지됨
+                velocity = body.velocity
+                if velocity.x or velocity.y:
+                    body.center += velocity * dt
+                if body.angular_velocity:
+                    body.angle += body.angular_velocity * dt
+            elif body.is_static:
+                # 정적인 body에 준 힘은 버림 (잠든 body는 깨어날 때까지 쌓아 둠)
+                body._force_x = body._force_y = body._torque = 0.0
+
+        if ccd_moves:
+            advance_to_impact(self, ccd_moves, dt)
+
+        # Fluid 객체의 중심은 원들이 모두 움직인 뒤에 계산 (bodies 순서와 무관하게)
+        for body in fragments:
+            body.update_center()
+
+
+    def _apply_forces(self, body, dt):
+        # semi-implicit Euler: 힘, 중력, 힘 장으로 속도를 먼저 바꾸고 (BodyStore.integrate와 같은 순서)
+        inv_mass = 1 / body.mass if body.mass else 0.0
+        acceleration_x = body._force_x * inv_mass
+        acceleration_y = body._force_y * inv_mass - self.gravity * body._gravity_scale
+        if self.force_fields:
+            center = body.center
+            for field in self.force_fields:
+                field_x, field_y = field.acceleration_at(center.x, center.y)
+                acceleration_x += field_x
+                acceleration_y += field_y
+
+        if acceleration_x or acceleration_y or body._linear_damping:
+            # 매 step Vector2D를 새로 만들지 않고 제자리에서 바꿈
+            velocity = body.velocity
+            damping = 1 / (1 + dt * body._linear_damping)
+            velocity.x = (velocity.x + acceleration_x * dt) * damping
+            velocity.y = (velocity.y + acceleration_y * dt) * damping
+        if body._torque or body._angular_damping:
+            inertia = body.inertia
+            inv_inertia = 1 / inertia if inertia and inertia != float("inf") else 0.0
+            body.angular_velocity = ((body.angular_velocity + body._torque * inv_inertia * dt)
+                                     * (1 / (1 + dt * body._angular_damping)))
+        body._force_x = body._force_y = body._torque = 0.0
+
+    def candidate_pairs(self):
+        if self.broad_phase is not None:
+            pairs = self.broad_phase.pairs(self.bodies)
+        else:
+            active = [is_active(body) for body in self.bodies]
+            pairs = ((i, j) for i in range(len(self.bodies) - 1) for j in range(i + 1, len(self.bodies))
+                     if active[i] or active[j])
 
+        if self.deterministic:
+            return self._ordered_pairs(pairs)
+        return pairs
 
-    def handle_collisions(self):
+    def _ordered_pairs(self, pairs):
+        # body_id가 작은 쪽을 body_1로, 쌍은 (id_1, id_2) 순서로
+        ids = [self.body_id(body) for body in self.bodies]
+        ordered = [(i, j) if ids[i] < ids[j] else (j, i) for i, j in pairs]
+        ordered.sort(key=lambda pair: (ids[pair[0]], ids[pair[1]]))
+        return ordered
+
+    def query_aabb(self, aabb):
+        # aabb = (min_x, min_y, max_x, max_y) 영역과 겹치는 body들
+        if isinstance(self.broad_phase, AABBTree):
+            return self.broad_phase.query(aabb)
+
+        result = []
+        for body in self.bodies:
+            body_aabb = body.get_aabb()
+            if body_aabb is not None and aabb_overlap(body_aabb, aabb):
+                result.append(body)
+        return result
+
+    def query_aabbs(self, regions):
+        # 여러 영역을 한 번에 (components.ccd), broad phase가 있으면 body 수 + 영역 수에 비례
+        if self.broad_phase is not None:
+            return self.broad_phase.query_many(self.bodies, regions)
+        return brute_force_query(self.bodies, regions)
+
+    def raycast(self, origin, direction, max_distance=float("inf")):
+        # [(body, distance)], 가까운 순서 (AABB 기준)
+        if isinstance(self.broad_phase, AABBTree):
+            return self.broad_phase.raycast(origin, direction, max_distance)
+
+        hits = []
+        for body in self.bodies:
+            body_aabb = body.get_aabb()
+            if body_aabb is None:
+                continue
+            t = ray_aabb(origin, direction, max_distance, body_aabb)
+            if t is not None:
+                hits.append((body, t))
+        hits.sort(key=lambda hit: hit[1])
+        return hits
+
+    def save(self, path):
+        # 바이너리 스냅샷으로 저장 (components.snapshot, numpy 필요)
+        from components.snapshot import save_scene
+        save_scene(self, path)
+
+    @staticmethod
+    def load(path, frame=-1, **scene_options):
+        from components.snapshot import load_snapshot
+        return load_snapshot(path, frame, **scene_options)
+
+    def _collision_normal(self, body_1, body_2):
+        if self.pair_cache is not None:
+            return self.pair_cache.collision_normal(body_1, body_2)
+        return collision_normal(body_1, body_2)
+
+    def _find_contact_points(self, body_1, body_2, normal):
+        # solver가 있으면 clipping으로 만든 접촉점 (manifold_contact_points)
+        manifold = self.solver is not None
+        if self.pair_cache is not None:
+            return self.pair_cache.contact_points(body_1, body_2, normal, manifold)
+        if manifold:
+            return manifold_contact_points(body_1, body_2, normal)
+        return find_contact_points(body_1, body_2)
+
+    def handle_collisions(self, record=None):
+        # record: profiler용 dict (components.profiling.new_record), 있을 때만 단계별 시간/개수를 잰다
+        clock = time.perf_counter if record is not None else _no_clock
         self._contact_points = []
-        for i in range(len(self.bodies) - 1):
-            for j in range(i + 1, len(self.bodies)):
-                if self.bodies[i] == self.bodies[j]:
-                    continue
+        self._colliding_pairs = []
+        store = self.store
+        solver = self.solver
+        if self.pair_cache is not None:
+            self.pair_cache.begin()
 
-                contact_points = collide(self.bodies[i], self.bodies[j])
-                if contact_points is None:
-                    continue
+        start = clock()
+        pairs = self.candidate_pairs()
+        if self.parallel is not None or record is not None:
+            pairs = list(pairs)
+        broad_phase = clock() - start
 
-                for point in contact_points:
-                    if point is None:
-                        continue
+        if self.parallel is not None and len(pairs) >= self.parallel.min_pairs:
+            start = clock()
+            self._handle_pairs_parallel(pairs)
+            if record is not None:
+                # pool 안의 검사와 응답을 나눠 잴 수 없으므로 모두 narrow_phase로 기록
+                record["broad_phase"] = broad_phase
+                record["narrow_phase"] = clock() - start
+                record["pairs_tested"] = len(pairs)
+                record["pairs_colliding"] = len(self._colliding_pairs)
+                record["contact_count"] = len(self._contact_points)
+            return
+
+        if solver is not None:
+            # solver를 쓸 때는 응답 없이 접촉만 모아서 solver에 넘김
+            solver.begin()
+        circle_rows_1 = []
+        circle_rows_2 = []
+        narrow_phase = contact_time = response_time = 0.0
 
+        for i, j in pairs:
+            body_1 = self.bodies[i]
+            body_2 = self.bodies[j]
+            if body_1 is body_2:
+                continue
+
+            # store에 있는 원-원 쌍은 모아서 한 번에 처리
+            if (store is not None and solver is None and body_1.shape_type == "Circle"
+                    and body_2.shape_type == "Circle" and body_1._store is store and body_2._store is store):
+                circle_rows_1.append(body_1._store_index)
+                circle_rows_2.append(body_2._store_index)
+                continue
+
+            # collide()와 같은 순서: 법선 -> 접촉점 -> 응답
+            t0 = clock()
+            normal, depth = self._collision_normal(body_1, body_2)
+            t1 = clock()
+            narrow_phase += t1 - t0
+            if normal is None or depth is None:
+                continue
+
+            contact_points = self._find_contact_points(body_1, body_2, normal)
+            t2 = clock()
+            contact_time += t2 - t1
+            if contact_points is None:
+                # 오목한 body의 조각끼리는 겹치지 않음
+                continue
+            if solver is not None:
+                solver.add_contact(body_1, body_2, normal, depth, contact_points)
+            else:
+                response_with_rotation(body_1, body_2, normal, depth, contact_points)
+            t3 = clock()
+            response_time += t3 - t2
+            self._colliding_pairs.append((body_1, body_2))
+
+            for point in contact_points:
+                if point is not None:
                     self._contact_points.append(point)
 
+        circle_batch = 0.0
+        if circle_rows_1:
+            start = clock()
+            points, rows_1, rows_2 = store.collide_circle_pairs(circle_rows_1, circle_rows_2)
+            for x, y in points.tolist():
+                self._contact_points.append(Vector2D(x, y))
+            for row_1, row_2 in zip(rows_1.tolist(), rows_2.tolist()):
+                self._colliding_pairs.append((store.bodies[row_1], store.bodies[row_2]))
+            circle_batch = clock() - start
+
+        if record is not None:
+            record["broad_phase"] = broad_phase
+            record["narrow_phase"] = narrow_phase
+            record["contact_points"] = contact_time
+            record["response"] = response_time
+            if circle_rows_1:
+                record["circle_batch"] = circle_batch
+            record["pairs_tested"] = len(pairs)
+            record["pairs_colliding"] = len(self._colliding_pairs)
+            record["contact_count"] = len(self._contact_points)
+
+    def _handle_pairs_parallel(self, pairs):
+        # 검사는 process pool에서, 응답은 여기서 pairs 순서대로
+        solver = self.solver
+        if solver is not None:
+            solver.begin()
+        for (i, j), normal, depth, contact_points in self.parallel.detect(self.bodies, pairs, solver is not None):
+            body_1 = self.bodies[i]
+            body_2 = self.bodies[j]
+            if solver is not None:
+                solver.add_contact(body_1, body_2, normal, depth, contact_points)
+            else:
+                response_with_rotation(body_1, body_2, normal, depth, contact_points)
+            self._colliding_pairs.append((body_1, body_2))
+            self._contact_points.extend(contact_points)
+
+    def advance(self, frame_time):
+        """Runs as many fixed_dt steps as frame_time covers (at most max_substeps).
+
+        Leftover time carries over to the next call. Returns the number of
+        steps taken; afterwards self.alpha (0..1) says how far the real time
+        is between the previous and the current physics state, for
+        interpolated rendering (see interpolated_transform).
+        """
+        self._accumulator += min(frame_time, self.max_frame_time)
+        substeps = min(int(self._accumulator / self.fixed_dt), self.max_substeps)
+
+        for index in range(substeps):
+            if index == substeps - 1:
+                # 마지막 step 직전 상태를 보간용으로 저장
+                self._previous_transforms = {id(body): (body.center.x, body.center.y, body.angle)
+                                             for body in self.bodies}
+            self.step(self.fixed_dt)
+            self._accumulator -= self.fixed_dt
+
+        if substeps == self.max_substeps and self._accumulator >= self.fixed_dt:
+            # 따라잡지 못한 시간은 버린다 (spiral of death 방지), 한 step 미만만 남김
+            self._accumulator %= self.fixed_dt
+
+        self.alpha = min(self._accumulator / self.fixed_dt, 1.0)
+        return substeps
+
+    def interpolated_transform(self, body, alpha=None):
+        # (x, y, angle), 직전 step과 현재 step 사이를 alpha로 보간
+        if alpha is None:
+            alpha = self.alpha
+        x, y, angle = body.center.x, body.center.y, body.angle
+        previous = self._previous_transforms.get(id(body))
+        if previous is None:
+            return x, y, angle
+        return (previous[0] + (x - previous[0]) * alpha,
+                previous[1] + (y - previous[1]) * alpha,
+                previous[2] + (angle - previous[2]) * alpha)
+
     def step(self, dt):
+        if self.profiler is None:
+            self.update_position(dt)
+            self.handle_collisions()
+            if self.solver is not None:
+                self.solver.solve(dt)
+            if self.sleep is not None:
+                self.sleep.update(self, dt, self._colliding_pairs)
+            if self.recorder is not None:
+                self.recorder(self, dt)
+            return
+
+        record = new_record()
+        start = time.perf_counter()
         self.update_position(dt)
-        self.handle_collisions()
+        record["integration"] = time.perf_counter() - start
+        self.handle_collisions(record)
+        if self.solver is not None:
+            solve_start = time.perf_counter()
+            self.solver.solve(dt)
+            record["response"] += time.perf_counter() - solve_start
+        if self.sleep is not None:
+            self.sleep.update(self, dt, self._colliding_pairs)
+        record["total"] = time.perf_counter() - start
+        self.profiler(record)
+        if self.recorder is not None:
+            self.recorder(self, dt)
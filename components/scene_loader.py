@@ -0,0 +1,208 @@
+"""Build a Scene from a plain description (dict / JSON file).
+
+Nothing here imports pygame, so scenes can be built in tests, batch jobs
+and the headless runner. Example description:
+
+    {
+        "width": 800, "height": 600, "gravity": 9.8,
+        "borders": true,
+        "broad_phase": {"type": "grid", "cell_size": 40},
+        "seed": 1,
+        "deterministic": true,
+        "sleep": {"time_to_sleep": 0.5},
+        "solver": {"iterations": 8},
+        "pair_cache": true,
+        "parallel": {"workers": 8, "min_pairs": 2000},
+        "force_fields": [{"type": "uniform", "acceleration": [30, 0], "region": [0, 0, 200, 600]},
+                         {"type": "radial", "center": [600, 300], "radius": 150, "strength": -200}],
+        "bodies": [
+            {"type": "polygon", "vertices": [[100, 100], [160, 100], [130, 150]], "mass": 50,
+             "velocity": [40, 0], "ccd": true},
+            {"type": "circle", "x": 400, "y": 300, "radius": 10, "gravity_scale": 0, "linear_damping": 0.5},
+            {"type": "rectangle", "x": 400, "y": 100, "width": 200, "height": 20, "static": true},
+            {"type": "fragment", "x": 600, "y": 300, "radius": 10, "count": 20}
+        ]
+    }
+"""
+import json
+
+from components.aabb_tree import AABBTree
+from components.broad_phase import SpatialHash, SweepAndPrune
+from components.forces import RadialField, UniformField
+from components.pair_cache import PairCache
+from components.scene import Scene
+from components.sleep import SleepSystem
+from components.solver import ContactSolver
+from components.vector import Vector2D
+from practice_code.body import Circle, Fragment, Polygon, Rectangle
+
+
+def make_borders(width, height, thickness=10):
+    return [
+        Rectangle(x=width / 2, y=height, width=width, height=thickness, is_static=True, name="Top Border"),
+        Rectangle(x=width / 2, y=0, width=width, height=thickness, is_static=True, name="Bottom Border"),
+        Rectangle(x=0, y=height / 2, width=thickness, height=height, is_static=True, name="Left Border"),
+        Rectangle(x=width, y=height / 2, width=thickness, height=height, is_static=True, name="Right Border"),
+    ]
+
+
+def polygon_from_points(points, is_static=False, mass=50, name=None, **kwargs):
+    # main.py에서 마우스로 찍은 점들로 다각형을 만들 때와 같은 방식 (중심 = 점들의 평균)
+    avg_x = sum(point[0] for point in points) / len(points)
+    avg_y = sum(point[1] for point in points) / len(points)
+    if name is None:
+        name = "Player Polygon (Static)" if is_static else "Player Polygon (Movable)"
+    return Polygon(x=avg_x, y=avg_y, vertices=points, mass=0 if is_static else mass,
+                   is_static=is_static, name=name, **kwargs)
+
+
+def make_broad_phase(description):
+    if description is None:
+        return None
+    if isinstance(description, str):
+        description = {"type": description}
+
+    options = dict(description)
+    kind = options.pop("type")
+    if kind == "grid":
+        return SpatialHash(**options)
+    if kind == "sap":
+        return SweepAndPrune(**options)
+    if kind == "tree":
+        return AABBTree(**options)
+    raise ValueError("Unknown broad phase type: {}".format(kind))
+
+
+def make_force_field(description):
+    options = dict(description)
+    kind = options.pop("type")
+    if kind == "uniform":
+        return UniformField(**options)
+    if kind == "radial":
+        return RadialField(**options)
+    raise ValueError("Unknown force field type: {}".format(kind))
+
+
+def make_body(description, rng=None):
+    """Returns the list of bodies to add for one body description.
+
+    rng (random.Random) is used for the random parts (Fragment circles).
+    """
+    options = dict(description)
+    kind = options.pop("type")
+    velocity = options.pop("velocity", None)
+    angle = options.pop("angle", None)
+    angular_velocity = options.pop("angular_velocity", None)
+    ccd = options.pop("ccd", False)
+    motion = {key: options.pop(key) for key in ("gravity_scale", "linear_damping", "angular_damping")
+              if key in options}
+    if "static" in options:
+        options["is_static"] = options.pop("static")
+
+    if kind == "rectangle":
+        bodies = [Rectangle(**options)]
+    elif kind == "polygon":
+        vertices = options.pop("vertices")
+        if "x" in options and "y" in options:
+            bodies = [Polygon(vertices=vertices, **options)]
+        else:
+            bodies = [polygon_from_points(vertices, **options)]
+    elif kind == "circle":
+        bodies = [Circle(**options)]
+    elif kind == "fragment":
+        options["num_circles"] = options.pop("count", options.get("num_circles", 10))
+        fragment = Fragment(rng=rng, **options)
+        # main.py의 F 키처럼 원들도 body로 넣는다
+        bodies = fragment.circles + [fragment]
+    else:
+        raise ValueError("Unknown body type: {}".format(kind))
+
+    body = bodies[0] if kind != "fragment" else None
+    if body is not None:
+        if velocity is not None:
+            body.velocity = Vector2D(velocity[0], velocity[1])
+        if angle is not None:
+            body.angle = angle
+        if angular_velocity is not None:
+            body.angular_velocity = angular_velocity
+    elif velocity is not None:
+        for circle in bodies[:-1]:
+            circle.velocity = Vector2D(velocity[0], velocity[1])
+
+    # Fragment는 원들에만 (Fragment 자체는 충돌하지 않음)
+    for body in bodies:
+        body.ccd = ccd and not body.is_fragment
+        for key, value in motion.items():
+            setattr(body, key, value)
+    return bodies
+
+
+def load_scene(description):
+    width = description.get("width", 800)
+    height = description.get("height", 600)
+
+    store = None
+    if description.get("store", False):
+        from components.body_store import BodyStore
+        store = BodyStore()
+
+    sleep = description.get("sleep")
+    if sleep is not None and sleep is not False:
+        sleep = SleepSystem(**(sleep if isinstance(sleep, dict) else {}))
+    else:
+        sleep = None
+
+    solver = description.get("solver")
+    if solver is not None and solver is not False:
+        solver = ContactSolver(**(solver if isinstance(solver, dict) else {}))
+    else:
+        solver = None
+
+    parallel = description.get("parallel")
+    if parallel is not None and parallel is not False:
+        from components.parallel_narrow import ParallelNarrowPhase
+        parallel = ParallelNarrowPhase(**(parallel if isinstance(parallel, dict) else {}))
+    else:
+        parallel = None
+
+    scene = Scene([], description.get("gravity", 9.8), broad_phase=make_broad_phase(description.get("broad_phase")),
+                  store=store, sleep=sleep, solver=solver,
+                  pair_cache=PairCache() if description.get("pair_cache", False) else None, parallel=parallel,
+                  seed=description.get("seed"), deterministic=description.get("deterministic", False),
+                  force_fields=[make_force_field(field) for field in description.get("force_fields", [])])
+
+    if description.get("borders", True):
+        for border in make_borders(width, height, description.get("border_thickness", 10)):
+            scene.add(border)
+
+    for body_description in description.get("bodies", []):
+        for body in make_body(body_description, scene.rng):
+            scene.add(body)
+
+    return scene
+
+
+def load_scene_file(path):
+    with open(path) as f:
+        return load_scene(json.load(f))
+
+
+def body_state(body):
+    state = {
+        "name": body.name,
+        "type": "Fragment" if body.is_fragment else body.shape_type,
+        "x": body.center.x,
+        "y": body.center.y,
+    }
+    if not body.is_fragment:
+        state.update({
+            "angle": body.angle,
+            "vx": body.velocity.x,
+            "vy": body.velocity.y,
+            "angular_velocity": body.angular_velocity,
+        })
+    return state
+
+
+def scene_state(scene):
+    return [body_state(body) for body in scene.bodies]
@@ -0,0 +1,191 @@
+from components.vector import Vector2D
+
+
+class SleepSystem:
+    """Puts resting piles of bodies to sleep and wakes them together.
+
+    After every step, each awake dynamic body whose speed and angular speed
+    stay under the thresholds accumulates sleep_time. Bodies in contact form
+    islands (static bodies do not join islands, so everything resting on the
+    floor is not one island); an island falls asleep once all of its bodies
+    have rested for time_to_sleep seconds. Sleeping bodies are skipped by
+    integration and never paired with static or other sleeping bodies in
+    the broad phase. When an awake body touches a sleeping one, the whole
+    island it fell asleep with wakes up.
+
+    Removing a body with Scene.remove wakes the islands that touched it,
+    and so does apply_force / apply_torque on a sleeping body (at the start
+    of the next step, before the force is integrated). Changing a sleeping
+    body's velocity from outside does not wake it; call Scene.wake(body)
+    for that.
+    """
+
+    def __init__(self, linear_threshold=2.0, angular_threshold=0.05, time_to_sleep=0.5):
+        self.linear_threshold = linear_threshold
+        self.angular_threshold = angular_threshold
+        self.time_to_sleep = time_to_sleep
+        # id(body) -> 함께 잠든 body 리스트
+        self._islands = {}
+        # 힘을 받아서 다음 step에 깨울 잠든 body들
+        self._pending = []
+
+    def sleeping_count(self):
+        return len(self._islands)
+
+    def wake(self, scene, body):
+        island = self._islands.get(id(body))
+        members = island if island is not None else [body]
+        for member in members:
+            self._islands.pop(id(member), None)
+            member.is_sleeping = False
+            member.sleep_time = 0.0
+            if scene.store is not None and member._store is scene.store:
+                scene.store.set_sleeping(member, False)
+        return members
+
+    def request_wake(self, body):
+        # Body.apply_force / apply_torque에서 호출
+        self._pending.append(body)
+
+    def wake_pending(self, scene):
+        # Scene.update_position 처음에 호출
+        pending = self._pending
+        if not pending:
+            return
+        self._pending = []
+        for body in pending:
+            if body.is_sleeping:
+                self.wake(scene, body)
+
+    def wake_all(self, scene):
+        # 힘 장이 바뀌었을 때 등: 잠든 섬을 모두 깨움
+        for island in {id(island): island for island in self._islands.values()}.values():
+            self.wake(scene, island[0])
+
+    def forget(self, scene, body, margin=1.0):
+        """Called by Scene.remove: drops body from its island and wakes what rested on it.
+
+        Sleeping bodies whose AABB is within margin of body's AABB wake up
+        with their islands, as does the rest of body's own island;
+        otherwise boxes sleeping on a removed shelf would hang in mid-air.
+        body must already be out of scene.bodies.
+        """
+        if body in self._pending:
+            self._pending.remove(body)
+        island = self._islands.pop(id(body), None)
+        if island is not None:
+            if body in island:
+                island.remove(body)
+            if island:
+                self.wake(scene, island[0])
+
+        aabb = body.get_aabb()
+        if aabb is None or not self._islands:
+            return
+        region = (aabb[0] - margin, aabb[1] - margin, aabb[2] + margin, aabb[3] + margin)
+        for other in scene.query_aabb(region):
+            if other is not body and other.is_sleeping:
+                self.wake(scene, other)
+
+    def sleep_bodies(self, scene, bodies, margin=1.0):
+        """Puts bodies to sleep from outside (e.g. a restored snapshot).
+
+        Bodies whose AABBs come within margin of each other share an
+        island, standing in for the contacts they fell asleep with.
+        Static bodies and fragments are left alone.
+        """
+        bodies = [body for body in bodies if not body.is_static and not body.is_fragment]
+        for body in bodies:
+            if body.is_sleeping:
+                self.wake(scene, body)
+        bodies = [body for body in bodies if body.get_aabb() is not None]
+        if not bodies:
+            return
+
+        parent = {id(body): id(body) for body in bodies}
+
+        def find(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        regions = [(aabb[0] - margin, aabb[1] - margin, aabb[2] + margin, aabb[3] + margin)
+                   for aabb in (body.get_aabb() for body in bodies)]
+        for body, found in zip(bodies, scene.query_aabbs(regions)):
+            for other in found:
+                if id(other) in parent:
+                    root_1 = find(id(body))
+                    root_2 = find(id(other))
+                    if root_1 != root_2:
+                        parent[root_1] = root_2
+
+        islands = {}
+        for body in bodies:
+            islands.setdefault(find(id(body)), []).append(body)
+        for island in islands.values():
+            self._sleep(scene, island)
+
+    def _sleep(self, scene, island):
+        for body in island:
+            body.is_sleeping = True
+            body.velocity = Vector2D(0, 0)
+            body.angular_velocity = 0.0
+            self._islands[id(body)] = island
+            body._sleep_system = self
+            if scene.store is not None and body._store is scene.store:
+                scene.store.set_sleeping(body, True)
+
+    def update(self, scene, dt, contact_pairs):
+        linear_threshold_sq = self.linear_threshold * self.linear_threshold
+        angular_threshold = self.angular_threshold
+
+        awake = []
+        for body in scene.bodies:
+            if body.is_static or body.is_sleeping or body.is_fragment:
+                continue
+            awake.append(body)
+            velocity = body.velocity
+            if (velocity.x * velocity.x + velocity.y * velocity.y < linear_threshold_sq
+                    and abs(body.angular_velocity) < angular_threshold):
+                body.sleep_time += dt
+            else:
+                body.sleep_time = 0.0
+
+        # 접촉한 쌍으로 union-find
+        parent = {id(body): id(body) for body in awake}
+
+        def find(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        for body_1, body_2 in contact_pairs:
+            if body_1.is_static or body_2.is_static:
+                continue
+            if body_1.is_sleeping != body_2.is_sleeping:
+                # 깨어 있는 body가 잠든 body를 건드림
+                sleeper = body_1 if body_1.is_sleeping else body_2
+                mover = body_2 if body_1.is_sleeping else body_1
+                if mover.sleep_time < self.time_to_sleep:
+                    for member in self.wake(scene, sleeper):
+                        awake.append(member)
+                        parent[id(member)] = id(member)
+                continue
+            if body_1.is_sleeping:
+                continue
+            root_1 = find(id(body_1))
+            root_2 = find(id(body_2))
+            if root_1 != root_2:
+                parent[root_1] = root_2
+
+        islands = {}
+        for body in awake:
+            if body.is_sleeping:
+                continue
+            islands.setdefault(find(id(body)), []).append(body)
+
+        for island in islands.values():
+            if min(body.sleep_time for body in island) >= self.time_to_sleep:
+                self._sleep(scene, island)
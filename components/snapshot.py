@@ -0,0 +1,316 @@
+"""Binary scene snapshots (needs numpy).
+
+File layout (little endian, no padding):
+
+    header      HEADER_DTYPE
+    bodies      body_count x BODY_DTYPE      (shape, mass, fragment membership...)
+    vertices    vertex_count x 2 float64     (local vertices of every polygon)
+    frames      n x frame_dtype(body_count)  (step, time, per-body state)
+
+Everything that does not change during a run is written once; every frame
+has the same size, so SnapshotReader memory-maps the frames and frame k is
+just an offset into the file. A recording assumes the scene keeps the same
+bodies in the same order while it is written. Names are cut to 32 bytes.
+
+    with SnapshotWriter("run.scn", scene) as writer:
+        for step in range(3600):
+            scene.step(dt)
+            writer.write(scene, step, step * dt)
+
+    reader = SnapshotReader("run.scn")
+    scene = reader.build_scene(0)
+    reader.apply(scene, 1800)           # scrub to frame 1800
+"""
+import math
+
+import numpy as np
+
+from components.scene import Scene
+from components.vector import Vector2D
+from practice_code.body import Body, Circle, Fragment, Polygon, Rectangle
+
+MAGIC = b"SCNB"
+VERSION = 2
+
+POLYGON = 0
+RECTANGLE = 1
+CIRCLE = 2
+FRAGMENT = 3
+OTHER = 4
+
+STATIC = 1
+SLEEPING = 2
+HAS_NAME = 4
+CCD = 8
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"), ("version", "<u4"), ("body_count", "<u4"), ("vertex_count", "<u4"), ("gravity", "<f8"),
+])
+
+BODY_DTYPE = np.dtype([
+    ("kind", "u1"), ("flags", "u1"), ("vertex_count", "<u2"), ("vertex_start", "<u4"),
+    # 이 body가 속한 Fragment의 번호 (없으면 -1)
+    ("fragment", "<i4"),
+    ("mass", "<f8"), ("inertia", "<f8"), ("bounce", "<f8"),
+    ("radius", "<f8"), ("width", "<f8"), ("height", "<f8"),
+    ("gravity_scale", "<f8"), ("linear_damping", "<f8"), ("angular_damping", "<f8"),
+    ("name", "S32"),
+])
+
+STATE_DTYPE = np.dtype([
+    ("x", "<f8"), ("y", "<f8"), ("angle", "<f8"),
+    ("vx", "<f8"), ("vy", "<f8"), ("angular_velocity", "<f8"),
+    ("flags", "u1"),
+])
+
+
+def frame_dtype(body_count):
+    return np.dtype([("step", "<i8"), ("time", "<f8"), ("bodies", STATE_DTYPE, (body_count,))])
+
+
+def _kind(body):
+    if body.is_fragment:
+        return FRAGMENT
+    if isinstance(body, Rectangle):
+        return RECTANGLE
+    if isinstance(body, Polygon):
+        return POLYGON
+    if isinstance(body, Circle):
+        return CIRCLE
+    return OTHER
+
+
+def _shape_tables(scene):
+    bodies = scene.bodies
+    table = np.zeros(len(bodies), dtype=BODY_DTYPE)
+    fragment_of = {}
+    for index, body in enumerate(bodies):
+        if body.is_fragment:
+            for circle in body.circles:
+                fragment_of[id(circle)] = index
+
+    vertices = []
+    for index, body in enumerate(bodies):
+        row = table[index]
+        kind = _kind(body)
+        flags = STATIC if body.is_static else 0
+        if body.ccd:
+            flags |= CCD
+        if body.name is not None:
+            flags |= HAS_NAME
+            row["name"] = body.name.encode("utf-8")[:32]
+        row["kind"] = kind
+        row["flags"] = flags
+        row["fragment"] = fragment_of.get(id(body), -1)
+        row["mass"] = body.mass
+        row["inertia"] = body.inertia if body.inertia is not None else math.nan
+        row["bounce"] = body.bounce
+        row["gravity_scale"] = body.gravity_scale
+        row["linear_damping"] = body.linear_damping
+        row["angular_damping"] = body.angular_damping
+        if kind in (POLYGON, RECTANGLE):
+            row["vertex_start"] = len(vertices)
+            row["vertex_count"] = len(body.local_vertices)
+            vertices.extend((v.x, v.y) for v in body.local_vertices)
+        if kind == RECTANGLE:
+            row["width"] = body.width
+            row["height"] = body.height
+        elif kind == CIRCLE:
+            row["radius"] = body.radius
+
+    return table, np.array(vertices, dtype="<f8").reshape(-1, 2)
+
+
+def capture(scene, step=0, time=0.0):
+    """One frame of scene as a frame_dtype record."""
+    bodies = scene.bodies
+    frame = np.zeros((), dtype=frame_dtype(len(bodies)))
+    frame["step"] = step
+    frame["time"] = time
+    states = frame["bodies"]
+    for index, body in enumerate(bodies):
+        center = body.center
+        velocity = body.velocity
+        states[index] = (center.x, center.y, body.angle, velocity.x, velocity.y, body.angular_velocity,
+                         SLEEPING if body.is_sleeping else 0)
+    return frame
+
+
+class SnapshotWriter:
+    """Writes the header and shape tables for scene, then one frame per write()."""
+
+    def __init__(self, path, scene):
+        self.body_count = len(scene.bodies)
+        table, vertices = _shape_tables(scene)
+        header = np.zeros((), dtype=HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["version"] = VERSION
+        header["body_count"] = self.body_count
+        header["vertex_count"] = len(vertices)
+        header["gravity"] = scene.gravity
+
+        self.file = open(path, "wb")
+        self.file.write(header.tobytes())
+        self.file.write(table.tobytes())
+        self.file.write(vertices.tobytes())
+        self.frames = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, scene, step=0, time=0.0):
+        if len(scene.bodies) != self.body_count:
+            raise ValueError("scene has {} bodies, recording was started with {}".format(
+                len(scene.bodies), self.body_count))
+        self.file.write(capture(scene, step, time).tobytes())
+        self.frames += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def save_scene(scene, path, step=0, time=0.0):
+    with SnapshotWriter(path, scene) as writer:
+        writer.write(scene, step, time)
+
+
+class SnapshotReader:
+    """Reads a snapshot file; frames are memory-mapped, not parsed."""
+
+    def __init__(self, path):
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(header) == 0 or header["magic"][0] != MAGIC:
+            raise ValueError("{} is not a scene snapshot".format(path))
+        if header["version"][0] != VERSION:
+            raise ValueError("unsupported snapshot version {}".format(header["version"][0]))
+
+        self.path = path
+        self.body_count = int(header["body_count"][0])
+        self.gravity = float(header["gravity"][0])
+        vertex_count = int(header["vertex_count"][0])
+
+        offset = HEADER_DTYPE.itemsize
+        self.bodies = np.fromfile(path, dtype=BODY_DTYPE, count=self.body_count, offset=offset)
+        offset += BODY_DTYPE.itemsize * self.body_count
+        self.vertices = np.fromfile(path, dtype="<f8", count=vertex_count * 2, offset=offset).reshape(-1, 2)
+        offset += 16 * vertex_count
+
+        self.frame_dtype = frame_dtype(self.body_count)
+        self.frames = np.memmap(path, dtype=self.frame_dtype, mode="r", offset=offset)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def frame(self, index):
+        # 구조화 배열 한 줄: frame["step"], frame["time"], frame["bodies"]["x"] ...
+        return self.frames[index]
+
+    def _make_body(self, row, state):
+        kind = int(row["kind"])
+        flags = int(row["flags"])
+        name = row["name"].decode("utf-8", errors="ignore") if flags & HAS_NAME else None
+        is_static = bool(flags & STATIC)
+        x, y = float(state["x"]), float(state["y"])
+
+        # 생성자를 거치지 않고 저장된 값을 그대로 넣음 (무게중심, 관성 모멘트 다시 계산 안 함)
+        if kind == POLYGON or kind == RECTANGLE:
+            cls = Rectangle if kind == RECTANGLE else Polygon
+            body = cls.__new__(cls)
+            Body.__init__(body, x, y, float(row["mass"]), float(row["bounce"]), name, is_static)
+            start = int(row["vertex_start"])
+            local = self.vertices[start:start + int(row["vertex_count"])].tolist()
+            body.local_vertices = [Vector2D(vx, vy) for vx, vy in local]
+            body._cache_version = -1
+            body.shape_type = "Polygon"
+            if kind == RECTANGLE:
+                body.width = float(row["width"])
+                body.height = float(row["height"])
+            else:
+                # 볼록 조각은 저장하지 않고 외곽선에서 다시 나눔
+                body.decompose()
+        elif kind == CIRCLE:
+            body = Circle.__new__(Circle)
+            Body.__init__(body, x, y, float(row["mass"]), float(row["bounce"]), name, is_static)
+            body.radius = float(row["radius"])
+            body.shape_type = "Circle"
+        elif kind == FRAGMENT:
+            body = Fragment.__new__(Fragment)
+            Body.__init__(body, x, y, float(row["mass"]), float(row["bounce"]), name, is_static)
+            body.is_fragment = True
+            body.circles = []
+        else:
+            body = Body(x, y, float(row["mass"]), float(row["bounce"]), name, is_static)
+
+        inertia = float(row["inertia"])
+        body.inertia = None if math.isnan(inertia) else inertia
+        body.ccd = bool(flags & CCD)
+        body.gravity_scale = float(row["gravity_scale"])
+        body.linear_damping = float(row["linear_damping"])
+        body.angular_damping = float(row["angular_damping"])
+        return body
+
+    def build_scene(self, frame=-1, **scene_options):
+        """A new Scene with the bodies of this file at the given frame.
+
+        scene_options go to Scene (broad_phase, store, sleep, ...).
+        """
+        states = self.frames[frame]["bodies"]
+        bodies = [self._make_body(self.bodies[index], states[index]) for index in range(self.body_count)]
+        for index, fragment_index in enumerate(self.bodies["fragment"].tolist()):
+            if fragment_index >= 0:
+                bodies[fragment_index].circles.append(bodies[index])
+
+        scene_options.setdefault("gravity", self.gravity)
+        scene = Scene([], **scene_options)
+        for body in bodies:
+            scene.add(body)
+        self.apply(scene, frame)
+        return scene
+
+    def apply(self, scene, frame):
+        """Moves the bodies of scene (built from this file) to the given frame.
+
+        Sleep changes go through scene.sleep: bodies asleep in the frame are
+        put to sleep again, touching ones sharing an island. Without a sleep
+        system every body is restored awake. Moved bodies are taken out of
+        and put back into scene.broad_phase, as Scene.add does.
+        """
+        if len(scene.bodies) != self.body_count:
+            raise ValueError("scene has {} bodies, snapshot has {}".format(len(scene.bodies), self.body_count))
+
+        states = self.frames[frame]["bodies"]
+        columns = [states[name].tolist() for name in ("x", "y", "angle", "vx", "vy", "angular_velocity", "flags")]
+        store = scene.store
+        sleep = scene.sleep
+        broad_phase = scene.broad_phase
+        sleepers = []
+        for body, x, y, angle, vx, vy, angular_velocity, flags in zip(scene.bodies, *columns):
+            if body.is_sleeping:
+                if sleep is not None:
+                    sleep.wake(scene, body)
+                else:
+                    body.is_sleeping = False
+                    body.sleep_time = 0.0
+                    if store is not None and body._store is store:
+                        store.set_sleeping(body, False)
+            center = body.center
+            moved = center.x != x or center.y != y or body.angle != angle
+            body.center = Vector2D(x, y)
+            body.angle = angle
+            body.velocity = Vector2D(vx, vy)
+            body.angular_velocity = angular_velocity
+            if moved and broad_phase is not None:
+                broad_phase.remove(body)
+                broad_phase.add(body)
+            if flags & SLEEPING:
+                sleepers.append(body)
+
+        if sleepers and sleep is not None:
+            sleep.sleep_bodies(scene, sleepers)
+
+def load_snapshot(path, frame=-1, **scene_options):
+    return SnapshotReader(path).build_scene(frame, **scene_options)
@@ -0,0 +1,209 @@
+from components.vector import Vector2D
+
+
+def _inverse(value):
+    if value is None or value == float("inf") or value == 0:
+        return 0.0
+    return 1 / max(value, 1e-8)
+
+
+class ContactPoint:
+    __slots__ = ("point", "r_1", "r_2", "normal_mass", "tangent_mass", "normal_impulse", "tangent_impulse", "bias",
+                 "persistent")
+
+    def __init__(self, point):
+        self.point = point
+        self.r_1 = None
+        self.r_2 = None
+        self.normal_mass = 0.0
+        self.tangent_mass = 0.0
+        # 누적 충격량 (warm starting에 다음 step까지 유지)
+        self.normal_impulse = 0.0
+        self.tangent_impulse = 0.0
+        self.bias = 0.0
+        # 지난 step에도 있던 접촉이면 True (반발 없이 버티기만 함)
+        self.persistent = False
+
+
+class Manifold:
+    """Up to two contact points between body_1 and body_2.
+
+    normal points from body_1 to body_2 (the direction response_with_rotation
+    uses after flipping collide()'s normal).
+    """
+
+    def __init__(self, body_1, body_2, normal, depth, points):
+        self.body_1 = body_1
+        self.body_2 = body_2
+        self.normal = normal
+        self.depth = depth
+        self.points = [ContactPoint(point) for point in points]
+
+
+class ContactSolver:
+    """Sequential-impulse contact solver with warm starting.
+
+    Scene(solver=ContactSolver()) collects one Manifold per colliding pair
+    instead of calling response_with_rotation, then solve() runs
+    `iterations` velocity passes over all contacts. Each contact keeps its
+    accumulated impulse clamped to >= 0, and a contact that is still there
+    next step (same body pair, point within match_distance) starts from
+    last step's impulse and never bounces. Friction impulses along the contact tangent are
+    clamped to `friction` times the normal impulse. Overlap beyond `slop` is removed by moving the
+    bodies `position_correction` of the way apart, split by inverse mass.
+    """
+
+    def __init__(self, iterations=8, warm_starting=True, friction=0.4, position_correction=0.8, slop=0.5,
+                 match_distance=2.0, restitution_threshold=20.0):
+        self.iterations = iterations
+        self.friction = friction
+        self.warm_starting = warm_starting
+        self.position_correction = position_correction
+        self.slop = slop
+        self.match_distance = match_distance
+        # 이보다 느리게 부딪히면 튕기지 않음 (쌓인 물체의 떨림 방지)
+        self.restitution_threshold = restitution_threshold
+        # (id(body_1), id(body_2)) -> Manifold, 지난 step의 접촉
+        self.manifolds = {}
+        self._current = {}
+
+    def begin(self):
+        self._current = {}
+
+    def forget(self, body):
+        # Scene.remove에서 호출: 같은 id(body)를 받은 새 body가 지난 충격량을 물려받지 않도록
+        key = id(body)
+        for manifolds in (self.manifolds, self._current):
+            for pair in [pair for pair in manifolds if key in pair]:
+                del manifolds[pair]
+
+    def add_contact(self, body_1, body_2, normal, depth, contact_points):
+        # normal은 collide()와 같은 방향(body_2 -> body_1)으로 받음
+        manifold = Manifold(body_1, body_2, -normal, depth, contact_points)
+        key = (id(body_1), id(body_2))
+
+        old = self.manifolds.get(key)
+        if old is not None:
+            match_sq = self.match_distance * self.match_distance
+            for contact in manifold.points:
+                for old_contact in old.points:
+                    dx = contact.point.x - old_contact.point.x
+                    dy = contact.point.y - old_contact.point.y
+                    if dx * dx + dy * dy < match_sq:
+                        contact.persistent = True
+                        if self.warm_starting:
+                            contact.normal_impulse = old_contact.normal_impulse
+                            contact.tangent_impulse = old_contact.tangent_impulse
+                        break
+
+        self._current[key] = manifold
+        return manifold
+
+    def _apply(self, body_1, body_2, r_1, r_2, impulse_x, impulse_y, inv_1, inv_2, inv_i_1, inv_i_2):
+        if inv_1 or inv_i_1:
+            velocity = body_1.velocity
+            velocity.x -= impulse_x * inv_1
+            velocity.y -= impulse_y * inv_1
+            body_1.angular_velocity -= (r_1.x * impulse_y - r_1.y * impulse_x) * inv_i_1
+        if inv_2 or inv_i_2:
+            velocity = body_2.velocity
+            velocity.x += impulse_x * inv_2
+            velocity.y += impulse_y * inv_2
+            body_2.angular_velocity += (r_2.x * impulse_y - r_2.y * impulse_x) * inv_i_2
+
+    def solve(self, dt):
+        manifolds = list(self._current.values())
+        prepared = []
+
+        # 1. 접촉점마다 유효 질량, 반발 목표 속도 계산 + warm start
+        for manifold in manifolds:
+            body_1 = manifold.body_1
+            body_2 = manifold.body_2
+            inv_1 = _inverse(body_1.mass)
+            inv_2 = _inverse(body_2.mass)
+            inv_i_1 = _inverse(body_1.inertia)
+            inv_i_2 = _inverse(body_2.inertia)
+            normal = manifold.normal
+            tangent = Vector2D(-normal.y, normal.x)
+            restitution = min(body_1.bounce, body_2.bounce)
+
+            for contact in manifold.points:
+                r_1 = contact.point - body_1.center
+                r_2 = contact.point - body_2.center
+                contact.r_1 = r_1
+                contact.r_2 = r_2
+                rn_1 = r_1.cross(normal)
+                rn_2 = r_2.cross(normal)
+                k = inv_1 + inv_2 + rn_1 * rn_1 * inv_i_1 + rn_2 * rn_2 * inv_i_2
+                contact.normal_mass = 1 / k if k > 0 else 0.0
+                rt_1 = r_1.cross(tangent)
+                rt_2 = r_2.cross(tangent)
+                k = inv_1 + inv_2 + rt_1 * rt_1 * inv_i_1 + rt_2 * rt_2 * inv_i_2
+                contact.tangent_mass = 1 / k if k > 0 else 0.0
+
+                normal_velocity = self._normal_velocity(body_1, body_2, r_1, r_2, normal)
+                if not contact.persistent and normal_velocity < -self.restitution_threshold:
+                    contact.bias = -restitution * normal_velocity
+                else:
+                    contact.bias = 0.0
+
+                if contact.normal_impulse or contact.tangent_impulse:
+                    impulse_x = normal.x * contact.normal_impulse + tangent.x * contact.tangent_impulse
+                    impulse_y = normal.y * contact.normal_impulse + tangent.y * contact.tangent_impulse
+                    self._apply(body_1, body_2, r_1, r_2, impulse_x, impulse_y, inv_1, inv_2, inv_i_1, inv_i_2)
+
+            prepared.append((manifold, tangent, inv_1, inv_2, inv_i_1, inv_i_2))
+
+        # 2. 속도 반복: 마찰은 법선 충격량 * friction 안으로, 법선 누적 충격량은 0 이상으로 제한
+        friction = self.friction
+        for _ in range(self.iterations):
+            for manifold, tangent, inv_1, inv_2, inv_i_1, inv_i_2 in prepared:
+                body_1 = manifold.body_1
+                body_2 = manifold.body_2
+                normal = manifold.normal
+                for contact in manifold.points:
+                    if friction:
+                        tangent_velocity = self._normal_velocity(body_1, body_2, contact.r_1, contact.r_2, tangent)
+                        delta = -contact.tangent_mass * tangent_velocity
+                        limit = friction * contact.normal_impulse
+                        old_impulse = contact.tangent_impulse
+                        contact.tangent_impulse = max(-limit, min(old_impulse + delta, limit))
+                        delta = contact.tangent_impulse - old_impulse
+                        if delta:
+                            self._apply(body_1, body_2, contact.r_1, contact.r_2, tangent.x * delta,
+                                        tangent.y * delta, inv_1, inv_2, inv_i_1, inv_i_2)
+
+                    normal_velocity = self._normal_velocity(body_1, body_2, contact.r_1, contact.r_2, normal)
+                    delta = contact.normal_mass * (contact.bias - normal_velocity)
+                    old_impulse = contact.normal_impulse
+                    contact.normal_impulse = max(old_impulse + delta, 0.0)
+                    delta = contact.normal_impulse - old_impulse
+                    if delta:
+                        self._apply(body_1, body_2, contact.r_1, contact.r_2, normal.x * delta, normal.y * delta,
+                                    inv_1, inv_2, inv_i_1, inv_i_2)
+
+        # 3. 위치 보정: 겹친 깊이에서 slop을 뺀 만큼 질량 비율로 밀어냄
+        for manifold, _, inv_1, inv_2, _, _ in prepared:
+            total = inv_1 + inv_2
+            correction = max(manifold.depth - self.slop, 0.0) * self.position_correction
+            if total == 0 or correction == 0:
+                continue
+            normal = manifold.normal
+            move = correction / total
+            if inv_1:
+                manifold.body_1.center -= normal * (move * inv_1)
+            if inv_2:
+                manifold.body_2.center += normal * (move * inv_2)
+
+        self.manifolds = self._current
+        self._current = {}
+
+    @staticmethod
+    def _normal_velocity(body_1, body_2, r_1, r_2, normal):
+        velocity_1 = body_1.velocity
+        velocity_2 = body_2.velocity
+        w_1 = body_1.angular_velocity
+        w_2 = body_2.angular_velocity
+        dvx = (velocity_2.x - w_2 * r_2.y) - (velocity_1.x - w_1 * r_1.y)
+        dvy = (velocity_2.y + w_2 * r_2.x) - (velocity_1.y + w_1 * r_1.x)
+        return dvx * normal.x + dvy * normal.y
@@ -1,12 +1,25 @@
 import math
 
+
+def _vector(x, y):
+    # float 변환 없이 바로 만드는 생성자 (x, y가 이미 float일 때만 사용)
+    v = _new(Vector2D)
+    v.x = x
+    v.y = y
+    return v
+
+
 class Vector2D:
+    __slots__ = ("x", "y")
+
     def __init__(self, x=0, y=0):
         self.x = float(x)
         self.y = float(y)
 
     def add(self, other):
-        if isinstance(other, Vector2D):
+        if other.__class__ is Vector2D:
+            return _vector(self.x + other.x, self.y + other.y)
+        elif isinstance(other, Vector2D):
             return Vector2D(self.x + other.x, self.y + other.y)
         elif isinstance(other, tuple) or isinstance(other, list):
             return Vector2D(self.x + other[0], self.y + other[1])
@@ -16,7 +29,9 @@ class Vector2D:
             raise TypeError("Unsupported operand type(s) for +: 'Vector2D' and '{}'".format(type(other).__name__))
         
     def sub(self, other):
-        if isinstance(other, Vector2D):
+        if other.__class__ is Vector2D:
+            return _vector(self.x - other.x, self.y - other.y)
+        elif isinstance(other, Vector2D):
             return Vector2D(self.x - other.x, self.y - other.y)
         elif isinstance(other, tuple) or isinstance(other, list):
             return Vector2D(self.x - other[0], self.y - other[1])
@@ -26,7 +41,9 @@ class Vector2D:
             raise TypeError("Unsupported operand type(s) for -: 'Vector2D' and '{}'".format(type(other).__name__))
         
     def mul(self, other):
-        if isinstance(other, Vector2D):
+        if other.__class__ is float:
+            return _vector(self.x * other, self.y * other)
+        elif isinstance(other, Vector2D):
             return Vector2D(self.x * other.x, self.y * other.y)
         elif isinstance(other, tuple) or isinstance(other, list):
             return Vector2D(self.x * other[0], self.y * other[1])
@@ -36,7 +53,9 @@ class Vector2D:
             raise TypeError("Unsupported operand type(s) for *: 'Vector2D' and '{}'".format(type(other).__name__))
 
     def div(self, other):
-        if isinstance(other, Vector2D):
+        if other.__class__ is float:
+            return _vector(self.x / other, self.y / other)
+        elif isinstance(other, Vector2D):
             return Vector2D(self.x / other.x, self.y / other.y)
         elif isinstance(other, tuple) or isinstance(other, list):
             return Vector2D(self.x / other[0], self.y / other[1])
@@ -66,25 +85,80 @@ class Vector2D:
             raise IndexError("Index out of range")
         
     def __add__(self, other):
+        if other.__class__ is Vector2D:
+            return _vector(self.x + other.x, self.y + other.y)
         return self.add(other)
     
     def __radd__(self, other):
         return self.add(other)
     
     def __sub__(self, other):
+        if other.__class__ is Vector2D:
+            return _vector(self.x - other.x, self.y - other.y)
         return self.sub(other)
     
     def __rsub__(self, other):
         return Vector2D(0, 0).sub(self).add(other)
     
     def __mul__(self, other):
+        if other.__class__ is float:
+            return _vector(self.x * other, self.y * other)
         return self.mul(other)
     
     def __rmul__(self, other):
         return self.mul(other)
     
     def __truediv__(self, other):
+        if other.__class__ is float:
+            return _vector(self.x / other, self.y / other)
         return self.div(other)
+
+    # 제자리 연산: 새 객체를 만들지 않고 self를 바꿈
+    # (같은 Vector2D를 여러 곳에서 참조하고 있으면 모두 바뀌므로 주의)
+    def __iadd__(self, other):
+        if isinstance(other, Vector2D):
+            self.x += other.x
+            self.y += other.y
+        elif isinstance(other, (tuple, list)):
+            self.x += float(other[0])
+            self.y += float(other[1])
+        elif isinstance(other, (int, float)):
+            other = float(other)
+            self.x += other
+            self.y += other
+        else:
+            return NotImplemented
+        return self
+
+    def __isub__(self, other):
+        if isinstance(other, Vector2D):
+            self.x -= other.x
+            self.y -= other.y
+        elif isinstance(other, (tuple, list)):
+            self.x -= float(other[0])
+            self.y -= float(other[1])
+        elif isinstance(other, (int, float)):
+            other = float(other)
+            self.x -= other
+            self.y -= other
+        else:
+            return NotImplemented
+        return self
+
+    def __imul__(self, other):
+        if isinstance(other, Vector2D):
+            self.x *= other.x
+            self.y *= other.y
+        elif isinstance(other, (tuple, list)):
+            self.x *= float(other[0])
+            self.y *= float(other[1])
+        elif isinstance(other, (int, float)):
+            other = float(other)
+            self.x *= other
+            self.y *= other
+        else:
+            return NotImplemented
+        return self
     
     def __rtruediv__(self, other):
         if isinstance(other, Vector2D):
@@ -97,6 +171,9 @@ class Vector2D:
             raise TypeError("Unsupported operand type(s) for /: '{}' and 'Vector2D'".format(type(other).__name__))
     
 
+    def copy(self):
+        return _vector(self.x, self.y)
+
     def dot(self, other):
         return self.x * other.x + self.y * other.y
 
@@ -110,7 +187,7 @@ class Vector2D:
         magnitude = self.magnitude()
         if magnitude == 0:
             return Vector2D(0, 0)  #
-        return Vector2D(self.x / magnitude, self.y / magnitude)
+        return _vector(self.x / magnitude, self.y / magnitude)
     
     def __abs__(self):
         return Vector2D(abs(self.x), abs(self.y))
@@ -129,7 +206,7 @@ class Vector2D:
         return "Vector2D({}, {})".format(self.x, self.y)
 
     def __neg__(self):
-        return Vector2D(-self.x, -self.y)
+        return _vector(-self.x, -self.y)
         
     def rotate(self, angle, in_radians = True):
         """Rotate the vector by an angle in radians"""
@@ -140,7 +217,7 @@ class Vector2D:
         sin = math.sin(angle)
         x = self.x * cos - self.y * sin
         y = self.x * sin + self.y * cos
-        return Vector2D(x, y)
+        return _vector(x, y)
     
     def __eq__(self, other):
         return self.x == other.x and self.y == other.y
@@ -148,3 +225,5 @@ class Vector2D:
     def __ne__(self, other):
         return not self == other
 
+
+_new = object.__new__
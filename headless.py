@@ -0,0 +1,64 @@
+"""Run a scene without pygame.
+
+    python headless.py scene.json --steps 3600 --dt 0.002777 --snapshot-every 60 --out states.jsonl
+    python headless.py scene.json --until-rest 1.0 --out final.jsonl
+    python headless.py scene.json --steps 3600 --verify-replay
+
+Each snapshot is one JSON line: {"step", "time", "bodies": [...]}.
+"""
+import argparse
+import json
+import sys
+
+from components.runner import max_speed, run_headless, verify_replay
+from components.scene_loader import load_scene_file
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a scene description headless.")
+    parser.add_argument("scene", help="scene description (JSON)")
+    parser.add_argument("--dt", type=float, default=1 / 360)
+    parser.add_argument("--steps", type=int, help="number of steps to run")
+    parser.add_argument("--until-rest", type=float, metavar="SPEED",
+                        help="stop once every dynamic body is slower than SPEED")
+    parser.add_argument("--max-steps", type=int, default=1000000, help="limit when only --until-rest is given")
+    parser.add_argument("--snapshot-every", type=int, default=0, help="0 = only the final state")
+    parser.add_argument("--out", help="JSON lines output (default: stdout)")
+    parser.add_argument("--verify-replay", action="store_true",
+                        help="run the scene twice (second time with shuffled bodies) and compare every step")
+    args = parser.parse_args(argv)
+
+    if args.steps is None and args.until_rest is None:
+        parser.error("give --steps and/or --until-rest")
+
+    if args.verify_replay:
+        if args.steps is None:
+            parser.error("--verify-replay needs --steps")
+        mismatch = verify_replay(lambda: load_scene_file(args.scene), args.dt, args.steps, shuffle_seed=0)
+        print(json.dumps({"steps": args.steps, "identical": mismatch is None, "first_mismatch": mismatch}))
+        return 0 if mismatch is None else 1
+
+    scene = load_scene_file(args.scene)
+
+    until = None
+    if args.until_rest is not None:
+        until = lambda scene, step: max_speed(scene) < args.until_rest
+
+    out = open(args.out, "w") if args.out else sys.stdout
+
+    def write_snapshot(step, sim_time, states):
+        out.write(json.dumps({"step": step, "time": sim_time, "bodies": states}) + "\n")
+
+    try:
+        summary = run_headless(scene, args.dt, steps=args.steps, until=until, snapshot_every=args.snapshot_every,
+                               on_snapshot=write_snapshot, max_steps=args.max_steps)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(json.dumps(summary), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,14 +4,25 @@ from components.vector import Vector2D
 from practice_code.collision import collide
 from practice_code.body import Body, Circle, Fragment, Rectangle, Polygon
 from components.scene import Scene
-import random
-import math
+from components.broad_phase import SpatialHash
+from components.scene_loader import make_borders, polygon_from_points
+from components.sleep import SleepSystem
+from components.pair_cache import PairCache
+from components.recorder import TrajectoryRecorder
+from components.particles import ParticleSystem
+from components.renderer import Renderer
 
 # 기본 설정
 WIDTH, HEIGHT = 800, 600
-PLAYER_SPEED_X = PLAYER_SPEED_Y = 2
-FPS = 360
+FPS = 60  # 화면 갱신 속도
+PHYSICS_HZ = 360  # 물리 step 속도 (FPS와 무관하게 고정)
+# 입력은 화면 프레임마다 한 번 적용되므로 프레임당 물리 step 수만큼 곱함
+PLAYER_SPEED_X = PLAYER_SPEED_Y = 2 * PHYSICS_HZ / FPS
 GRAVITY = 9.8
+# 물리 step마다 상태를 파일로 기록 (예: "trajectory.trj", 읽기는 components.recorder.read_trajectory)
+RECORD_PATH = None
+# 한 번에 화면에 있을 수 있는 파티클 수 (넘치는 만큼은 만들지 않음)
+PARTICLE_CAPACITY = 100000
 COLORS = {
     "white": (255, 255, 255),
     "red": (255, 0, 0),
@@ -22,50 +33,17 @@ COLORS = {
     "cyan": (0, 255, 255),
 }
 
-# 파티클 리스트
-particles = []
-
 # 다각형의 속도를 저장할 변수
 polygon_velocity = Vector2D(0, 0)
 
-def create_particle_effect(pos, num_particles, area):
+def create_particle_effect(pos, num_particles, area, velocity=(0, 0)):
     #파티클 분해 효과 (넓이에 비례)
     base_life = 50  # 기본 생명력
     life_scale = 0.1  # 넓이에 따른 생명력 (얼마나 오래 파티클이 화면에 살아있을지지)
 
-    for _ in range(num_particles):
-        # 무작위 각도와 속력 생성
-        angle = random.uniform(0, 2 * math.pi)  # 0 ~ 360도 
-        speed = random.uniform(1, 5)  # 속력 범위 조정 가능
-
-        # 속도 계산
-        vel_x = math.cos(angle) * speed
-        vel_y = math.sin(angle) * speed
-
-        # 생명력 또한 다각형 넓이에 비례례
-        life = base_life + int(area * life_scale)
-
-        particles.append({
-            "pos": [pos[0], pos[1]],  # 시작 위치
-            "vel": [vel_x, vel_y],  # 속도
-            "radius": random.randint(2, 5),  # 크기
-            "life": life  
-        })
-
-# 파티클 업데이트 함수
-def update_particles():
-    for particle in particles[:]:
-        particle["pos"][0] += particle["vel"][0] #위치 업업데이트
-        particle["pos"][1] += particle["vel"][1]
-
-        particle["life"] -= 1  # 생명력 감소
-        if particle["life"] <= 0:  # 제거
-            particles.remove(particle)
-
-# 파티클 그리기 함수
-def draw_particles(screen):
-    for particle in particles:
-        pygame.draw.circle(screen, (0,0,0), (int(particle["pos"][0]), int(particle["pos"][1])), particle["radius"])
+    # 무작위 방향, 속력 1~5, 크기 2~5를 한 번에 생성
+    particles.emit(pos, num_particles, base_life + int(area * life_scale), speed=(1, 5), radius=(2, 5),
+                   velocity=velocity)
 
 
 # 초기화
@@ -73,16 +51,24 @@ pygame.init()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("2D Physics Engine")
 clock = pygame.time.Clock()
+renderer = Renderer(screen, HEIGHT, polygon_color=COLORS["black"], circle_color=COLORS["cyan"],
+                    name_colors={"Player Polygon (Movable)": COLORS["red"],
+                                 "Player Polygon (Static)": COLORS["blue"]})
 
 # 장면(Scene) 생성
-Scene = Scene([], GRAVITY)
+Scene = Scene([], GRAVITY, broad_phase=SpatialHash(cell_size=40), fixed_dt=1 / PHYSICS_HZ, sleep=SleepSystem(),
+              pair_cache=PairCache())
+
+# 파티클 (NumPy 배열, 난수는 Scene.rng에서 시드를 받음)
+particles = ParticleSystem(PARTICLE_CAPACITY, seed=Scene.rng.getrandbits(64))
+
+if RECORD_PATH is not None:
+    Scene.recorder = TrajectoryRecorder(RECORD_PATH)
 
 # 테두리 생성
 border_thickness = 10
-Scene.add(Rectangle(x=WIDTH / 2, y=HEIGHT, width=WIDTH, height=border_thickness, is_static=True, name="Top Border"))
-Scene.add(Rectangle(x=WIDTH / 2, y=0, width=WIDTH, height=border_thickness, is_static=True, name="Bottom Border"))
-Scene.add(Rectangle(x=0, y=HEIGHT / 2, width=border_thickness, height=HEIGHT, is_static=True, name="Left Border"))
-Scene.add(Rectangle(x=WIDTH, y=HEIGHT / 2, width=border_thickness, height=HEIGHT, is_static=True, name="Right Border"))
+for border in make_borders(WIDTH, HEIGHT, border_thickness):
+    Scene.add(border)
 
 # 점 리스트 (마우스 입력으로 다각형 정의)
 mouse_points = []
@@ -94,7 +80,7 @@ move_left = False
 move_right = False
 move_up = False
 move_down = False
-dt = 1 / FPS
+frame_time = 0
 
 
 # 게임 루프
@@ -102,6 +88,8 @@ while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            if Scene.recorder is not None:
+                Scene.recorder.close()
             pygame.quit()
             sys.exit()
         elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -111,17 +99,9 @@ while True:
         elif event.type == pygame.KEYDOWN:
             # 다각형 생성
             if event.key == pygame.K_RETURN and len(mouse_points) > 2:                    
-                avg_x = sum(point[0] for point in mouse_points) / len(mouse_points)
-                avg_y = sum(point[1] for point in mouse_points) / len(mouse_points)
-
-                new_polygon = Polygon(
-                    x=avg_x,
-                    y=avg_y,
-                    vertices=mouse_points,
-                    mass=50,
-                    is_static=False,  # 움직이는 다각형
-                    name="Player Polygon (Movable)"
-                )
+                new_polygon = polygon_from_points(mouse_points, is_static=False)  # 움직이는 다각형
+                # 방향키로 계속 빨라지므로 벽을 뚫지 않도록 연속 충돌 검사
+                new_polygon.ccd = True
                 print("움직이는 다각형 생성")
                 Scene.add(new_polygon)
                 polygon_created = True
@@ -131,17 +111,7 @@ while True:
 
             elif event.key == pygame.K_LSHIFT and len(mouse_points) > 2:       
                 # 정적인 다각형 생성 (쉬프트 키)
-                avg_x = sum(point[0] for point in mouse_points) / len(mouse_points)
-                avg_y = sum(point[1] for point in mouse_points) / len(mouse_points)
-
-                new_polygon = Polygon(
-                    x=avg_x,
-                    y=avg_y,
-                    vertices=mouse_points,
-                    mass=0,
-                    is_static=True,  # 정적인 다각형
-                    name="Player Polygon (Static)"
-                )
+                new_polygon = polygon_from_points(mouse_points, is_static=True)  # 정적인 다각형
                 print("정적인 다각형 생성")
 
                 # Scene에 추가
@@ -166,15 +136,15 @@ while True:
                 radius = 10  # 각 원의 반지름
                 num_circles = max(3, int(area / (3.14 * radius**2)))
 
-                fragment = Fragment(new_polygon.center.x, new_polygon.center.y, radius, num_circles)
+                fragment = Fragment(new_polygon.center.x, new_polygon.center.y, radius, num_circles, rng=Scene.rng)
 
                 for circle in fragment.circles:
                     circle.velocity = Vector2D(0, 0)
                     circle.angular_velocity = 0
+                    circle.ccd = True
                 
-                Scene.bodies.remove(new_polygon)
-                Scene.bodies.extend(fragment.circles)
-                Scene.add(fragment)
+                Scene.remove(new_polygon)
+                Scene.add_fragment(fragment)
                 new_polygon = None  # 다각형 제거
                 
 
@@ -195,30 +165,22 @@ while True:
                 # 넓이에 비례하여 파티클 개수 설정
                 num_particles = max(10, int(area * 0.05))  
 
-                # 다각형의 중심에서 파티클 생성
-                create_particle_effect([centroid.x, centroid.y], num_particles,area)
-                
-                # 파티클 초기 속도 설정 (다각형의 중심 속도 추가)
-                for particle in particles:
-                    particle["vel"][0] += polygon_velocity .x  # x 방향 속도 추가
-                    particle["vel"][1] += polygon_velocity .y  # y 방향 속도 추가
+                # 다각형의 중심에서 파티클 생성 (다각형의 중심 속도 추가)
+                create_particle_effect([centroid.x, centroid.y], num_particles, area,
+                                       (polygon_velocity.x, polygon_velocity.y))
 
                 
-                Scene.bodies.remove(new_polygon)  # 다각형 제거
+                Scene.remove(new_polygon)  # 다각형 제거
                 new_polygon = None  # 다각형 객체도 None으로 설정
 
             elif event.key == pygame.K_r and fragment:
 
 
-                # Fragment의 각 원을 Scene에서 제거
-                for circle in fragment.circles:
-                    if circle in Scene.bodies:
-                        Scene.bodies.remove(circle)  # 원을 Scene에서 제거
-
                 restored_polygon = fragment.restore_to_polygon()
 
+                # Fragment와 원들을 Scene에서 한 번에 제거
+                Scene.remove_fragment(fragment)
                 Scene.add(restored_polygon)
-                Scene.bodies.remove(fragment)  # Scene에서 Fragment 제거
                 fragment = None  # Fragment 객체도 None으로 설정
 
         elif event.type == pygame.KEYUP:
@@ -236,7 +198,8 @@ while True:
     if fragment:
         fragment.update_center()
         for circle in fragment.circles:
-            
+            if move_left or move_right or move_up or move_down:
+                Scene.wake(circle)  # 잠든 원도 움직이도록 깨움
             if move_left:
                 circle.velocity[0] -= PLAYER_SPEED_X/2
             if move_right:
@@ -248,6 +211,8 @@ while True:
 
     # 움직이는 다각형 이동
     if new_polygon:
+        if move_left or move_right or move_up or move_down:
+            Scene.wake(new_polygon)
         if move_left:
             new_polygon.velocity[0] -= PLAYER_SPEED_X
         if move_right:
@@ -257,17 +222,17 @@ while True:
         if move_down:
             new_polygon.velocity[1] -= PLAYER_SPEED_Y
 
-    # 물리 시뮬레이션 업데이트
-    Scene.step(dt)
+    # 물리 시뮬레이션 업데이트 (지난 프레임 시간만큼 고정 step으로 진행)
+    substeps = Scene.advance(frame_time)
 
-    # 파티클 업데이트
-    update_particles()
+    # 파티클 업데이트 (물리 step마다 한 번씩)
+    particles.update(substeps)
 
     # 화면 그리기
     screen.fill(COLORS["white"])
 
-        # 파티클 그리기
-    draw_particles(screen)
+    # 파티클 그리기
+    renderer.draw_particles(*particles.alive())
 
     # 마우스로 생성 중인 점과 선
     for point in mouse_points:
@@ -277,28 +242,8 @@ while True:
             screen, COLORS["blue"], False, [(p[0], HEIGHT - p[1]) for p in mouse_points], 2
         )
 
-    # 다각형 및 물리 객체 렌더링
-    for body in Scene.bodies:
-        if body.name == "Player Polygon (Movable)":
-            color = COLORS["red"]
-        elif body.name == "Player Polygon (Static)":
-            color = COLORS["blue"]
-        else:
-            color = COLORS["black"]
-
-        if body.shape_type == "Polygon":
-            pygame.draw.polygon(
-                screen,
-                color,
-                [(vertex.x, HEIGHT - vertex.y) for vertex in body.get_vertices()],
-            )
-        elif body.shape_type == "Circle":
-            pygame.draw.circle(
-                screen,
-                COLORS["cyan"],
-                (int(body.center[0]), int(HEIGHT - body.center[1])),
-                int(body.radius),
-            )
+    # 다각형 및 물리 객체 렌더링 (직전 물리 상태와 현재 상태 사이를 보간해서 그림)
+    renderer.draw_bodies(Scene.bodies, Scene.interpolated_transform)
 
     pygame.display.flip()
-    clock.tick(FPS)
+    frame_time = clock.tick(FPS) / 1000
@@ -1,10 +1,40 @@
 import math
 import random
 from components.vector import Vector2D
+from components.decomposition import clean_outline, convex_decomposition, is_convex, is_simple, mass_properties
+
+
+def _update_world_cache(body):
+    # 꼭짓점, 변의 법선, AABB를 한 번에 계산해서 저장
+    cos = math.cos(body.angle)
+    sin = math.sin(body.angle)
+    cx = body.center.x
+    cy = body.center.y
+
+    vertices = [Vector2D(v.x * cos - v.y * sin + cx, v.x * sin + v.y * cos + cy) for v in body.local_vertices]
+
+    normals = []
+    for i in range(len(vertices)):
+        va = vertices[i]
+        vb = vertices[(i + 1) % len(vertices)]
+        normals.append(Vector2D(-(vb.y - va.y), vb.x - va.x).normalize())
+
+    xs = [vertex.x for vertex in vertices]
+    ys = [vertex.y for vertex in vertices]
+
+    body._world_vertices = vertices
+    body._world_normals = normals
+    body._world_aabb = (min(xs), min(ys), max(xs), max(ys))
+    body._cache_version = body.transform_version
 
 
 class Body():
     def __init__(self, x, y, mass = 1, bounce = 0.5, name = None, is_static = False):
+        # BodyStore에 붙어 있으면 위치/속도 등은 store의 배열에 저장됨
+        self._store = None
+        self._store_index = -1
+        # center나 angle이 바뀔 때마다 증가 (꼭짓점 캐시 무효화용)
+        self._transform_version = 0
         self.center = Vector2D(x, y)
         self.angle = 0    
         self.name = name
@@ -20,6 +50,191 @@ class Body():
 
         self.is_fragment = False 
 
+        # 잠든 body는 적분/충돌 검사에서 빠짐 (components.sleep.SleepSystem)
+        self.is_sleeping = False
+        self.sleep_time = 0.0
+        # 잠들게 한 SleepSystem (잠든 동안 힘을 받으면 깨워 달라고 알림)
+        self._sleep_system = None
+
+        # Scene에 넣을 때 붙는 번호 (리스트 순서와 상관없이 유지됨)
+        self.body_id = None
+
+        # True면 빠르게 움직여도 얇은 벽을 뚫고 지나가지 않음 (components.ccd, 느려짐)
+        self.ccd = False
+
+        # 오목한 Polygon이면 볼록 조각(ConvexPiece) 리스트, 아니면 None
+        self.pieces = None
+
+        # apply_force / apply_torque로 쌓이고 Scene.step에서 적분한 뒤 0으로 비움
+        self._force_x = 0.0
+        self._force_y = 0.0
+        self._torque = 0.0
+        # 중력 배율 (0이면 중력을 받지 않음), 감쇠 (1/s, 매 step 속도에 1 / (1 + dt * damping)을 곱함)
+        self._gravity_scale = 1.0
+        self._linear_damping = 0.0
+        self._angular_damping = 0.0
+
+    @property
+    def transform_version(self):
+        if self._store is not None:
+            return int(self._store.version[self._store_index])
+        return self._transform_version
+
+    @property
+    def center(self):
+        if self._store is not None:
+            return self._center_view
+        return self._center
+
+    @center.setter
+    def center(self, value):
+        if self._store is not None:
+            self._store.set_position(self._store_index, value)
+        else:
+            self._center = value
+            self._transform_version += 1
+
+    @property
+    def angle(self):
+        if self._store is not None:
+            return float(self._store.angle[self._store_index])
+        return self._angle
+
+    @angle.setter
+    def angle(self, value):
+        if self._store is not None:
+            self._store.angle[self._store_index] = value
+            self._store.version[self._store_index] += 1
+        else:
+            self._angle = value
+            self._transform_version += 1
+
+    @property
+    def velocity(self):
+        if self._store is not None:
+            return self._velocity_view
+        return self._velocity
+
+    @velocity.setter
+    def velocity(self, value):
+        if self._store is not None:
+            self._store.velocity[self._store_index] = (value[0], value[1])
+        else:
+            self._velocity = value
+
+    @property
+    def angular_velocity(self):
+        if self._store is not None:
+            return float(self._store.angular_velocity[self._store_index])
+        return self._angular_velocity
+
+    @angular_velocity.setter
+    def angular_velocity(self, value):
+        if self._store is not None:
+            self._store.angular_velocity[self._store_index] = value
+        else:
+            self._angular_velocity = value
+
+    @property
+    def gravity_scale(self):
+        return self._gravity_scale
+
+    @gravity_scale.setter
+    def gravity_scale(self, value):
+        self._gravity_scale = value
+        if self._store is not None:
+            self._store.refresh_motion(self)
+
+    @property
+    def linear_damping(self):
+        return self._linear_damping
+
+    @linear_damping.setter
+    def linear_damping(self, value):
+        self._linear_damping = value
+        if self._store is not None:
+            self._store.refresh_motion(self)
+
+    @property
+    def angular_damping(self):
+        return self._angular_damping
+
+    @angular_damping.setter
+    def angular_damping(self, value):
+        self._angular_damping = value
+        if self._store is not None:
+            self._store.refresh_motion(self)
+
+    @property
+    def force(self):
+        # 이번 step에 쌓인 힘
+        if self._store is not None:
+            return Vector2D(*self._store.force[self._store_index])
+        return Vector2D(self._force_x, self._force_y)
+
+    @property
+    def torque(self):
+        if self._store is not None:
+            return float(self._store.torque[self._store_index])
+        return self._torque
+
+    def apply_force(self, force, point=None):
+        """Adds force (fx, fy) for the next step; applied at point (world) it also adds torque."""
+        fx, fy = force[0], force[1]
+        torque = 0.0
+        if point is not None:
+            center = self.center
+            torque = (point[0] - center.x) * fy - (point[1] - center.y) * fx
+        if self._store is not None:
+            self._store.add_force(self._store_index, fx, fy, torque)
+        else:
+            self._force_x += fx
+            self._force_y += fy
+            self._torque += torque
+        self._request_wake()
+
+    def apply_torque(self, torque):
+        if self._store is not None:
+            self._store.add_force(self._store_index, 0.0, 0.0, torque)
+        else:
+            self._torque += torque
+        self._request_wake()
+
+    def _request_wake(self):
+        # 잠든 body는 다음 step 시작에 섬째로 깨어나서 힘을 적분함
+        if self.is_sleeping and self._sleep_system is not None:
+            self._sleep_system.request_wake(self)
+
+    def clear_forces(self):
+        if self._store is not None:
+            self._store.force[self._store_index] = 0.0
+            self._store.torque[self._store_index] = 0.0
+        self._force_x = self._force_y = self._torque = 0.0
+
+    @property
+    def mass(self):
+        return self._mass
+
+    @mass.setter
+    def mass(self, value):
+        self._mass = value
+        if self._store is not None:
+            self._store.refresh_mass(self)
+
+    @property
+    def inertia(self):
+        return self._inertia
+
+    @inertia.setter
+    def inertia(self, value):
+        self._inertia = value
+        if self._store is not None:
+            self._store.refresh_mass(self)
+
+    def get_aabb(self):
+        # (min_x, min_y, max_x, max_y), None이면 충돌 검사 대상이 아님
+        return None
+
 class Rectangle(Body):
     def __init__(self, x, y, width, height, mass = 1, bounce = 0.5, name = None, is_static = False):
         super().__init__(x, y, mass, bounce, name, is_static)
@@ -29,6 +244,7 @@ class Rectangle(Body):
         half_width = self.width / 2
         half_height = self.height / 2
 
+        self._cache_version = -1
         self.local_vertices = [
             Vector2D(-half_width, -half_height),
             Vector2D(half_width, -half_height),
@@ -46,7 +262,21 @@ class Rectangle(Body):
         return [self.x_axis, self.y_axis] 
 
     def get_vertices(self):
-        return [vertex.rotate(self.angle).add(self.center) for vertex in self.local_vertices]
+        # 캐시된 리스트를 그대로 돌려주므로 수정하지 말 것
+        if self._cache_version != self.transform_version:
+            _update_world_cache(self)
+        return self._world_vertices
+
+    def get_normals(self):
+        # i번째 법선 = i번째 꼭짓점에서 i+1번째 꼭짓점으로 가는 변의 법선
+        if self._cache_version != self.transform_version:
+            _update_world_cache(self)
+        return self._world_normals
+
+    def get_aabb(self):
+        if self._cache_version != self.transform_version:
+            _update_world_cache(self)
+        return self._world_aabb
 
     def rotate(self, angle, in_radians=True):
         if not in_radians:
@@ -64,9 +294,35 @@ class Polygon(Body):
         )
 
         self.local_vertices = [Vector2D(vertex[0] - centroid[0], vertex[1] - centroid[1]) for vertex in vertices]
+        self._cache_version = -1
+
+        outline = clean_outline([(v.x, v.y) for v in self.local_vertices])
+        if len(outline) > 3 and not is_convex(outline):
+            if is_simple(outline):
+                # 오목한 다각형은 면적 중심을 회전 중심으로 (그린 자리는 그대로)
+                _, (cx, cy), _ = mass_properties(outline)
+                self.local_vertices = [Vector2D(v.x - cx, v.y - cy) for v in self.local_vertices]
+                self.center = Vector2D(self.center.x + cx, self.center.y + cy)
+                self.decompose()
+            if self.pieces is None:
+                # 스스로 교차하는 외곽선은 볼록 껍질로 대신함
+                self.local_vertices = [Vector2D(x, y) for x, y in convex_hull([(v.x, v.y) for v in self.local_vertices])]
       
         self.shape_type = "Polygon"
         self.inertia = self.calculate_inertia() if not is_static else float("inf")#
+
+    def decompose(self):
+        """Splits local_vertices into convex pieces (self.pieces) if the outline is concave.
+
+        Returns the pieces, or None (and pieces = None) if the outline is
+        convex or crosses itself.
+        """
+        outline = clean_outline([(v.x, v.y) for v in self.local_vertices])
+        pieces = None
+        if len(outline) > 3 and not is_convex(outline):
+            pieces = convex_decomposition(outline)
+        self.pieces = None if pieces is None else [ConvexPiece(self, piece) for piece in pieces]
+        return self.pieces
     
     def get_center(self):
     # get_vertices로 변환된 꼭짓점을 가져옴
@@ -77,10 +333,27 @@ class Polygon(Body):
         return Vector2D(center_x, center_y)
 
     def get_vertices(self):
-        return [vertex.rotate(self.angle).add(self.center) for vertex in self.local_vertices]
+        # 캐시된 리스트를 그대로 돌려주므로 수정하지 말 것
+        if self._cache_version != self.transform_version:
+            _update_world_cache(self)
+        return self._world_vertices
+
+    def get_normals(self):
+        # i번째 법선 = i번째 꼭짓점에서 i+1번째 꼭짓점으로 가는 변의 법선
+        if self._cache_version != self.transform_version:
+            _update_world_cache(self)
+        return self._world_normals
+
+    def get_aabb(self):
+        if self._cache_version != self.transform_version:
+            _update_world_cache(self)
+        return self._world_aabb
     
     ####
     def calculate_inertia(self):
+        if self.pieces:
+            # 조각들의 (원점 = 면적 중심 기준) 2차 모멘트 합
+            return self.mass / self.calculate_area() * sum(piece.moment for piece in self.pieces)
     # Initialize variables
         area = 0
         center = Vector2D(0, 0)
@@ -134,6 +407,8 @@ class Polygon(Body):
     
     def calculate_area(self):
         # 다각형의 면적을 구하는 함수 (Shoelace Theorem)
+        if self.pieces:
+            return sum(piece.area for piece in self.pieces)
         area = 0
         n = len(self.local_vertices)
 
@@ -144,6 +419,76 @@ class Polygon(Body):
 
         return abs(area) / 2
 
+class ConvexPiece:
+    """One convex part of a concave Polygon, in the parent's local coordinates.
+
+    Collision functions treat it like a Polygon (shape_type, center,
+    get_vertices, get_normals, get_aabb); it follows the parent's
+    transform. area, local_centroid and moment (second moment about the
+    parent's center, unit density) are computed once. get_aabb() is the
+    box around the piece's bounding circle, so it needs no vertices.
+    """
+    shape_type = "Polygon"
+    pieces = None
+
+    def __init__(self, parent, points):
+        self.parent = parent
+        self.local_vertices = [Vector2D(x, y) for x, y in points]
+        self.area, (cx, cy), self.moment = mass_properties(points)
+        self.local_centroid = Vector2D(cx, cy)
+        self.radius = max(math.hypot(x - cx, y - cy) for x, y in points)
+        self._bounds_version = None
+        self._cache_version = None
+
+    def _update_bounds(self):
+        parent = self.parent
+        cos = math.cos(parent.angle)
+        sin = math.sin(parent.angle)
+        c = self.local_centroid
+        x = c.x * cos - c.y * sin + parent.center.x
+        y = c.x * sin + c.y * cos + parent.center.y
+        self._center = Vector2D(x, y)
+        self._aabb = (x - self.radius, y - self.radius, x + self.radius, y + self.radius)
+        self._bounds_version = parent.transform_version
+
+    @property
+    def center(self):
+        if self._bounds_version != self.parent.transform_version:
+            self._update_bounds()
+        return self._center
+
+    def get_aabb(self):
+        if self._bounds_version != self.parent.transform_version:
+            self._update_bounds()
+        return self._aabb
+
+    def _update_world(self):
+        parent = self.parent
+        cos = math.cos(parent.angle)
+        sin = math.sin(parent.angle)
+        px = parent.center.x
+        py = parent.center.y
+        vertices = [Vector2D(v.x * cos - v.y * sin + px, v.x * sin + v.y * cos + py) for v in self.local_vertices]
+        normals = []
+        for i in range(len(vertices)):
+            va = vertices[i]
+            vb = vertices[(i + 1) % len(vertices)]
+            normals.append(Vector2D(-(vb.y - va.y), vb.x - va.x).normalize())
+        self._world_vertices = vertices
+        self._world_normals = normals
+        self._cache_version = parent.transform_version
+
+    def get_vertices(self):
+        if self._cache_version != self.parent.transform_version:
+            self._update_world()
+        return self._world_vertices
+
+    def get_normals(self):
+        if self._cache_version != self.parent.transform_version:
+            self._update_world()
+        return self._world_normals
+
+
 class Circle(Body):
     def __init__(self, x, y, radius, mass = 5, bounce = 0.5, name = None, is_static = False):
         super().__init__(x, y, mass, bounce, name, is_static)
@@ -153,6 +498,10 @@ class Circle(Body):
         self.velocity = Vector2D(0,0)
         self.angular_velocity = 1
 
+    def get_aabb(self):
+        return (self.center.x - self.radius, self.center.y - self.radius,
+                self.center.x + self.radius, self.center.y + self.radius)
+
     def rotate(self, angle, in_radians=True):
         if not in_radians:
             angle = math.radians(angle)
@@ -160,8 +509,11 @@ class Circle(Body):
 
 
 class Fragment(Body):
-    def __init__(self, x, y, radius, num_circles, spacing=2, mass=0.5, bounce=0.3, name="Fragment", is_static=False):
+    def __init__(self, x, y, radius, num_circles, spacing=2, mass=0.5, bounce=0.3, name="Fragment", is_static=False,
+                 rng=None):
         super().__init__(x, y, mass, bounce, name, is_static)
+        # rng: random.Random (예: Scene.rng), 없으면 전역 random 모듈
+        rng = rng if rng is not None else random
         self.is_fragment = True  # Fluid 객체는 True로 설정
         self.circles = []
         self.center = Vector2D(x, y)
@@ -169,8 +521,8 @@ class Fragment(Body):
         # 무작위 초기 위치 배치
         for _ in range(num_circles):
             # 중심 주변의 무작위 위치 생성
-            angle = random.uniform(0, 2 * math.pi)
-            distance = random.uniform(radius * spacing * 0.5, radius * spacing * 1.5)
+            angle = rng.uniform(0, 2 * math.pi)
+            distance = rng.uniform(radius * spacing * 0.5, radius * spacing * 1.5)
             circle_x = x + math.cos(angle) * distance
             circle_y = y + math.sin(angle) * distance
             circle = Circle(circle_x, circle_y, radius, mass, bounce)
@@ -1,45 +1,102 @@
 from components.vector import Vector2D
+from components.broad_phase import aabb_overlap
 from practice_code.body import Body, Polygon, Rectangle, Circle
 
 
 def collide(body_1: Body, body_2: Body, include_rotation = True):
+    normal, depth = collision_normal(body_1, body_2)
+
+    if normal is None or depth is None:
+        return
+    
+    contact_points = find_contact_points(body_1, body_2)
+    if not contact_points:
+        return
+        
+    if include_rotation:
+        response_with_rotation(body_1, body_2, normal, depth, contact_points)
+    else:
+        response(body_1, body_2, normal, depth)
+
+    return contact_points
+
+# collide()를 단계별로 나눈 함수들 (Scene에서 단계별 시간을 잴 때 사용)
+def collision_normal(body_1: Body, body_2: Body, cache = None):
+    # cache: components.pair_cache.PairEntry (다각형끼리일 때 지난 분리축을 먼저 시험)
     normal, depth = None, None
 
+    if body_1.pieces or body_2.pieces:
+        hit = compound_collision(body_1, body_2)
+        if cache is not None:
+            # 접촉점을 구할 때 같은 조각 쌍을 씀
+            cache.parts = None if hit is None else (hit[2], hit[3])
+        if hit is None:
+            return None, None
+        return hit[0], hit[1]
+
     if body_1.shape_type == "Polygon" and body_2.shape_type == "Polygon":
-        normal, depth = polygons_collision(body_1, body_2) 
+        normal, depth = polygons_collision(body_1, body_2, cache)
     elif body_1.shape_type == "Circle" and body_2.shape_type == "Circle":
         normal, depth = circles_collision(body_1, body_2)
     elif body_1.shape_type == "Polygon" and body_2.shape_type == "Circle":
         normal, depth = polygon_circle_collision(body_1, body_2)
     elif body_1.shape_type == "Circle" and body_2.shape_type == "Polygon":
         normal, depth = polygon_circle_collision(body_2, body_1)
+        if normal is not None:
+            normal = -normal
 
-    if normal is None or depth is None:
-        return
-    
+    return normal, depth
+
+def find_contact_points(body_1: Body, body_2: Body, cache = None):
+    if body_1.pieces or body_2.pieces:
+        parts = _compound_parts(body_1, body_2, cache)
+        # 겹치는 조각 쌍이 없으면 None (호출한 쪽에서 응답을 건너뜀)
+        return None if parts is None else find_contact_points(parts[0], parts[1])
     if body_1.shape_type == "Polygon" and body_2.shape_type == "Polygon":
-        contact_points = polygons_contact_points(body_1, body_2)
+        return polygons_contact_points(body_1, body_2)
     elif body_1.shape_type == "Circle" and body_2.shape_type == "Circle":
-        contact_points = circles_contact_points(body_1, body_2)
+        return circles_contact_points(body_1, body_2)
     elif body_1.shape_type == "Polygon" and body_2.shape_type == "Circle":
-        contact_points = polygon_circle_contact_points(body_1, body_2)
+        return polygon_circle_contact_points(body_1, body_2)
     elif body_1.shape_type == "Circle" and body_2.shape_type == "Polygon":
-        contact_points = polygon_circle_contact_points(body_2, body_1)
-        normal = -normal
-        
-        
-    if include_rotation:
-        response_with_rotation(body_1, body_2, normal, depth, contact_points)
-    else:
-        response(body_1, body_2, normal, depth)
-
-    return contact_points
+        return polygon_circle_contact_points(body_2, body_1)
+def _parts(body: Body):
+    return body.pieces or (body,)
+
+def compound_collision(body_1: Body, body_2: Body):
+    """Deepest collision between the convex pieces of body_1 and body_2.
+
+    Only pieces whose bounds overlap are tested; a body without an AABB
+    (Fragment) never collides. Returns (normal, depth, part_1, part_2) or
+    None. The pair cache's separating axis and edge hints are not used for
+    these pairs.
+    """
+    best = None
+    parts_2 = [(part, part.get_aabb()) for part in _parts(body_2)]
+    for part_1 in _parts(body_1):
+        aabb_1 = part_1.get_aabb()
+        if aabb_1 is None:
+            continue
+        for part_2, aabb_2 in parts_2:
+            if aabb_2 is None or not aabb_overlap(aabb_1, aabb_2):
+                continue
+            normal, depth = collision_normal(part_1, part_2)
+            if normal is not None and depth is not None and (best is None or depth > best[1]):
+                best = (normal, depth, part_1, part_2)
+    return best
+
+def _compound_parts(body_1: Body, body_2: Body, cache = None):
+    # collision_normal이 cache(PairEntry)에 남긴 조각 쌍, 없으면 다시 찾음
+    if cache is not None and cache.parts is not None:
+        return cache.parts
+    hit = compound_collision(body_1, body_2)
+    return None if hit is None else (hit[2], hit[3])
 ###############################################################################################################
                         # Practice Code
 ###############################################################################################################
 def response(body_1: Body, body_2: Body, normal_vector: Vector2D, penetration_depth: float):
-    # Reverse the normal vector
-    normal_vector *= -1
+    # Reverse the normal vector (without touching the caller's vector)
+    normal_vector = -normal_vector
 
     # Separate the bodies to prevent overlap (Implement this function if not provided)
     separate_bodies(body_1, body_2, normal_vector, penetration_depth)
@@ -76,8 +133,12 @@ def response(body_1: Body, body_2: Body, normal_vector: Vector2D, penetration_de
 
 
 def response_with_rotation(body_1: Body, body_2: Body, normal_vector: Vector2D, penetration_depth: float, contact_point: list[Vector2D]):
-    # Step 1: Reverse the normal vector
-    normal_vector *= -1  
+    # 접촉점이 없으면 회전 없이 응답
+    if not contact_point:
+        return response(body_1, body_2, normal_vector, penetration_depth)
+
+    # Step 1: Reverse the normal vector (without touching the caller's vector)
+    normal_vector = -normal_vector
 
     # Step 2: Separate the bodies to prevent overlap
     separate_bodies(body_1, body_2, normal_vector, penetration_depth)
@@ -139,22 +200,28 @@ def response_with_rotation(body_1: Body, body_2: Body, normal_vector: Vector2D,
 
 ############################################################################################################################################################
 
-def polygons_collision(polygon_1: Polygon, polygon_2: Polygon):
+def polygons_collision(polygon_1: Polygon, polygon_2: Polygon, cache = None):
     normal = Vector2D(0, 0)
     depth = float('inf')
     
     vertices1 = polygon_1.get_vertices()
     vertices2 = polygon_2.get_vertices()
+
+    # 지난번에 두 다각형을 갈라놓은 축이 아직도 갈라놓으면 바로 끝 (떨어진 채로 가까이 있는 쌍)
+    if cache is not None and cache.axis is not None:
+        min_a, max_a = project_vertices(vertices1, cache.axis)
+        min_b, max_b = project_vertices(vertices2, cache.axis)
+
+        if min_a >= max_b or min_b >= max_a:
+            return None, None
     
-    for i in range(len(vertices1)):
-        va = vertices1[i]
-        vb = vertices1[(i + 1) % len(vertices1)]
-        edge = vb - va
-        axis = Vector2D(-edge.y, edge.x).normalize()
-        min_a, max_a = project_vertices(polygon_1.get_vertices(), axis)
-        min_b, max_b = project_vertices(polygon_2.get_vertices(), axis)
+    for axis in polygon_1.get_normals():
+        min_a, max_a = project_vertices(vertices1, axis)
+        min_b, max_b = project_vertices(vertices2, axis)
 
         if min_a >= max_b or min_b >= max_a:
+            if cache is not None:
+                cache.axis = axis
             return None, None
 
         axis_depth = min(max_b - min_a, max_a - min_b)
@@ -164,15 +231,13 @@ def polygons_collision(polygon_1: Polygon, polygon_2: Polygon):
             normal = axis
 
     # Add axes from polygon_2
-    for i in range(len(vertices2)):
-        va = vertices2[i]
-        vb = vertices2[(i + 1) % len(vertices2)]
-        edge = vb - va
-        axis = Vector2D(-edge.y, edge.x).normalize()
-        min_a, max_a = project_vertices(polygon_1.get_vertices(), axis)
-        min_b, max_b = project_vertices(polygon_2.get_vertices(), axis)
+    for axis in polygon_2.get_normals():
+        min_a, max_a = project_vertices(vertices1, axis)
+        min_b, max_b = project_vertices(vertices2, axis)
 
         if min_a >= max_b or min_b >= max_a:
+            if cache is not None:
+                cache.axis = axis
             return None, None
 
         axis_depth = min(max_b - min_a, max_a - min_b)
@@ -183,9 +248,12 @@ def polygons_collision(polygon_1: Polygon, polygon_2: Polygon):
 
     direction = (polygon_1.center - polygon_2.center).normalize()
 
+    # normal은 캐시된 법선일 수 있으므로 제자리에서 바꾸지 않는다
     if direction.dot(normal) < 0:
-        normal *= -1
+        normal = -normal
 
+    if cache is not None:
+        cache.axis = None
 
     return normal, depth
 
@@ -198,14 +266,7 @@ def polygon_circle_collision(polygon: Polygon, circle: Circle):
     
     vertices = polygon.get_vertices()
     
-    for i in range(len(vertices)):
-        va = vertices[i]
-        vb = vertices[(i + 1) % len(vertices)]
-
-        edge = vb - va
-
-        axis = Vector2D(-edge.y, edge.x).normalize()
-       
+    for axis in polygon.get_normals():
         # project circle onto axis
         min_a, max_a = project_vertices(vertices, axis)
         min_b, max_b = project_circle(circle.center, circle.radius, axis)
@@ -241,7 +302,7 @@ def polygon_circle_collision(polygon: Polygon, circle: Circle):
     direction = (polygon.center - circle.center).normalize()
    
     if direction.dot(normal) < 0:
-        normal *= -1
+        normal = -normal
         
     return normal, penetration_depth
 
@@ -364,11 +425,14 @@ def polygons_contact_points(polygon_1: Polygon, polygon_2: Polygon):
     contact_point_1 = None
     contact_point_2 = None
 
-    for i in range(len(polygon_1.get_vertices())):
-        vp = polygon_1.get_vertices()[i]
-        for j in range(len(polygon_2.get_vertices())):
-            va = polygon_2.get_vertices()[j]
-            vb = polygon_2.get_vertices()[(j + 1) % len(polygon_2.get_vertices())]
+    vertices1 = polygon_1.get_vertices()
+    vertices2 = polygon_2.get_vertices()
+
+    for i in range(len(vertices1)):
+        vp = vertices1[i]
+        for j in range(len(vertices2)):
+            va = vertices2[j]
+            vb = vertices2[(j + 1) % len(vertices2)]
 
             cp, distance = point_to_line_segment_projection(vp, va, vb)
 
@@ -379,11 +443,11 @@ def polygons_contact_points(polygon_1: Polygon, polygon_2: Polygon):
                 contact_point_2 = None
                 contact_point_1 = cp
 
-    for i in range(len(polygon_2.get_vertices())):
-        vp = polygon_2.get_vertices()[i]
-        for j in range(len(polygon_1.get_vertices())):
-            va = polygon_1.get_vertices()[j]
-            vb = polygon_1.get_vertices()[(j + 1) % len(polygon_1.get_vertices())]
+    for i in range(len(vertices2)):
+        vp = vertices2[i]
+        for j in range(len(vertices1)):
+            va = vertices1[j]
+            vb = vertices1[(j + 1) % len(vertices1)]
 
             cp, distance = point_to_line_segment_projection(vp, va, vb)
 
@@ -421,3 +485,105 @@ def circles_contact_points(body_1: Circle, body_2: Circle):
 
     return [contact_point]
 
+
+def _furthest_vertex(vertices: list[Vector2D], direction: Vector2D, start = None):
+    count = len(vertices)
+    if start is None or start >= count:
+        return max(range(count), key=lambda k: vertices[k].dot(direction))
+
+    # 볼록 다각형이므로 지난번 꼭짓점에서 이웃을 따라 올라가면 최댓값에 닿는다
+    index = start
+    best = vertices[index].dot(direction)
+    while True:
+        next_index = (index + 1) % count
+        prev_index = index - 1 if index > 0 else count - 1
+        next_dot = vertices[next_index].dot(direction)
+        prev_dot = vertices[prev_index].dot(direction)
+        if next_dot > best and next_dot >= prev_dot:
+            index, best = next_index, next_dot
+        elif prev_dot > best:
+            index, best = prev_index, prev_dot
+        else:
+            return index
+
+def _best_edge(vertices: list[Vector2D], direction: Vector2D, start = None):
+    # direction 쪽으로 가장 튀어나온 꼭짓점과, 그 꼭짓점의 두 변 중 direction에 더 수직인 변
+    index = _furthest_vertex(vertices, direction, start)
+    v = vertices[index]
+    v_next = vertices[(index + 1) % len(vertices)]
+    v_prev = vertices[index - 1]
+
+    left = (v - v_next).normalize()
+    right = (v - v_prev).normalize()
+
+    if right.dot(direction) <= left.dot(direction):
+        return v, v_prev, v, index
+    return v, v, v_next, index
+
+def _clip(v1: Vector2D, v2: Vector2D, direction: Vector2D, offset: float):
+    # direction 방향으로 offset 이상인 부분만 남김
+    points = []
+    d1 = direction.dot(v1) - offset
+    d2 = direction.dot(v2) - offset
+    if d1 >= 0:
+        points.append(v1)
+    if d2 >= 0:
+        points.append(v2)
+    if d1 * d2 < 0:
+        points.append(v1 + (v2 - v1) * (d1 / (d1 - d2)))
+    return points
+
+def polygons_clipped_contact_points(polygon_1: Polygon, polygon_2: Polygon, normal: Vector2D, cache = None):
+    """Contact points from reference/incident edge clipping.
+
+    normal is collision_normal()'s result (pointing from polygon_2 to
+    polygon_1). Unlike polygons_contact_points, two nearly parallel faces
+    keep both contact points even when slightly rotated, which a stacking
+    solver needs. Falls back to polygons_contact_points if clipping fails.
+    With a cache (PairEntry), the edge search starts from last time's
+    vertices instead of scanning every vertex.
+    """
+    n = -normal
+    start_1 = start_2 = None
+    if cache is not None:
+        start_1, start_2 = cache.edge_1, cache.edge_2
+    max_1, a_1, b_1, index_1 = _best_edge(polygon_1.get_vertices(), n, start_1)
+    max_2, a_2, b_2, index_2 = _best_edge(polygon_2.get_vertices(), -n, start_2)
+    if cache is not None:
+        cache.edge_1, cache.edge_2 = index_1, index_2
+    edge_1 = b_1 - a_1
+    edge_2 = b_2 - a_2
+
+    if abs(edge_1.dot(n)) <= abs(edge_2.dot(n)):
+        reference_max, reference_a, reference_b = max_1, a_1, b_1
+        incident_a, incident_b = a_2, b_2
+        reference_normal = n
+    else:
+        reference_max, reference_a, reference_b = max_2, a_2, b_2
+        incident_a, incident_b = a_1, b_1
+        reference_normal = -n
+
+    reference = (reference_b - reference_a).normalize()
+
+    points = _clip(incident_a, incident_b, reference, reference.dot(reference_a))
+    if len(points) < 2:
+        return polygons_contact_points(polygon_1, polygon_2)
+    points = _clip(points[0], points[1], -reference, -reference.dot(reference_b))
+    if len(points) < 2:
+        return polygons_contact_points(polygon_1, polygon_2)
+
+    # reference 면 뒤로 들어간 점만 접촉점
+    limit = reference_normal.dot(reference_max) + 1e-6
+    points = [point for point in points if reference_normal.dot(point) <= limit]
+    if not points:
+        return polygons_contact_points(polygon_1, polygon_2)
+    return points
+
+def manifold_contact_points(body_1: Body, body_2: Body, normal: Vector2D, cache = None):
+    # solver용 접촉점: 다각형끼리는 clipping, 나머지는 find_contact_points와 같음
+    if body_1.pieces or body_2.pieces:
+        parts = _compound_parts(body_1, body_2, cache)
+        return None if parts is None else manifold_contact_points(parts[0], parts[1], normal)
+    if body_1.shape_type == "Polygon" and body_2.shape_type == "Polygon":
+        return polygons_clipped_contact_points(body_1, body_2, normal, cache)
+    return find_contact_points(body_1, body_2)
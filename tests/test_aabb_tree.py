@@ -0,0 +1,42 @@
+from components.aabb_tree import AABBTree
+from components.scene import Scene
+from components.sleep import SleepSystem
+from components.vector import Vector2D
+from practice_code.body import Circle, Rectangle
+
+
+def _resting_box_scene(broad_phase):
+    floor = Rectangle(0, 0, 400, 20, is_static=True)
+    box = Rectangle(0, 20, 20, 20)
+    scene = Scene([floor, box], broad_phase=broad_phase, sleep=SleepSystem())
+    for _ in range(2000):
+        scene.step(1 / 360)
+        if box.is_sleeping:
+            break
+    assert box.is_sleeping
+    return scene, box
+
+
+def test_teleported_sleeping_leaf_is_refit():
+    tree = AABBTree()
+    scene, box = _resting_box_scene(tree)
+
+    box.center = Vector2D(150, 40)
+    scene.candidate_pairs()
+    assert box.is_sleeping
+    assert box in tree.query((145, 35, 155, 45))
+    assert box not in tree.query((-5, 15, 5, 25))
+
+
+def test_circle_lands_on_teleported_sleeping_box():
+    scene, box = _resting_box_scene(AABBTree())
+    box.center = Vector2D(150, 40)
+
+    circle = Circle(150, 120, 5)
+    circle.angular_velocity = 0
+    circle.velocity = Vector2D(0, -100)
+    scene.add(circle)
+    for _ in range(720):
+        scene.step(1 / 360)
+        # 상자가 깨어나 같이 떨어져도 원은 항상 상자 위에 있어야 함
+        assert circle.center.y > box.center.y
@@ -0,0 +1,57 @@
+import random
+
+from components.aabb_tree import AABBTree
+from components.broad_phase import SpatialHash, SweepAndPrune, aabb_overlap, is_active
+from components.scene import Scene
+from components.solver import ContactSolver
+from practice_code.body import Circle, Fragment, Rectangle
+
+
+def _brute_force_pairs(bodies):
+    aabbs = [body.get_aabb() for body in bodies]
+    return sorted((i, j) for i in range(len(bodies)) for j in range(i + 1, len(bodies))
+                  if aabbs[i] is not None and aabbs[j] is not None and (is_active(bodies[i]) or is_active(bodies[j]))
+                  and aabb_overlap(aabbs[i], aabbs[j]))
+
+
+def _random_scene(broad_phase, seed=0):
+    rng = random.Random(seed)
+    scene = Scene([Rectangle(0, -10, 800, 20, is_static=True)], broad_phase=broad_phase, seed=seed)
+    for _ in range(60):
+        scene.add(Circle(rng.uniform(-380, 380), rng.uniform(0, 300), rng.uniform(4, 12)))
+    scene.add_fragment(Fragment(0, 200, 3, 5, rng=scene.rng))
+    return scene, rng
+
+
+def test_broad_phases_match_brute_force_through_add_and_remove():
+    for broad_phase in (SpatialHash(), SweepAndPrune(), AABBTree()):
+        scene, rng = _random_scene(broad_phase)
+        for step in range(60):
+            scene.step(1 / 120)
+            if step % 10 == 5:
+                scene.remove(rng.choice(scene.bodies[1:]))
+                scene.add(Circle(rng.uniform(-380, 380), 250, 6))
+            assert broad_phase.pairs(scene.bodies) == _brute_force_pairs(scene.bodies)
+
+
+def test_sweep_and_prune_resyncs_a_list_changed_behind_its_back():
+    broad_phase = SweepAndPrune()
+    scene, rng = _random_scene(broad_phase)
+    scene.step(1 / 120)
+    scene.bodies.append(Circle(0, 0, 10))
+    assert broad_phase.pairs(scene.bodies) == _brute_force_pairs(scene.bodies)
+    del scene.bodies[-1]
+    del scene.bodies[5]
+    assert broad_phase.pairs(scene.bodies) == _brute_force_pairs(scene.bodies)
+
+
+def test_remove_drops_warm_start_manifolds():
+    floor = Rectangle(0, -10, 400, 20, is_static=True)
+    box = Rectangle(0, 10, 20, 20)
+    solver = ContactSolver()
+    scene = Scene([floor, box], solver=solver)
+    for _ in range(20):
+        scene.step(1 / 360)
+    assert any(id(box) in key for key in solver.manifolds)
+    scene.remove(box)
+    assert not any(id(box) in key for key in solver.manifolds)
@@ -0,0 +1,35 @@
+from components.broad_phase import SpatialHash
+from components.scene import Scene
+from components.sleep import SleepSystem
+from components.vector import Vector2D
+from practice_code.body import Circle, Rectangle
+
+DT = 1 / 360
+
+
+def test_fast_body_crossing_the_sweep_is_found():
+    bullet = Circle(0, 0, 2)
+    bullet.ccd = True
+    bullet.angular_velocity = 0
+    bullet.velocity = Vector2D(10 / DT, 0)
+    # 이번 step에 총알이 지나가는 길을 아래에서 위로 가로지름 (끝 위치의 AABB는 겹치지 않음)
+    gate = Rectangle(5, -20, 4, 20)
+    gate.velocity = Vector2D(0, 40 / DT)
+    scene = Scene([bullet, gate], gravity=0, broad_phase=SpatialHash())
+    scene.update_position(DT)
+    assert bullet.center.x < 5
+
+
+def test_body_woken_by_a_force_is_swept():
+    wall = Rectangle(20, 0, 2, 100, is_static=True)
+    bullet = Circle(0, 0, 2)
+    bullet.ccd = True
+    bullet.angular_velocity = 0
+    scene = Scene([wall, bullet], gravity=0, broad_phase=SpatialHash(), sleep=SleepSystem())
+    scene.sleep.sleep_bodies(scene, [bullet])
+    assert bullet.is_sleeping
+
+    bullet.apply_force(Vector2D(40 / DT * bullet.mass / DT, 0))
+    scene.step(DT)
+    assert not bullet.is_sleeping
+    assert bullet.center.x < 20
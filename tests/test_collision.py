@@ -0,0 +1,40 @@
+from components.pair_cache import PairEntry
+from components.scene import Scene
+from components.vector import Vector2D
+from practice_code.body import Circle, Polygon, Rectangle
+from practice_code.collision import (collision_normal, find_contact_points, manifold_contact_points,
+                                     response_with_rotation)
+
+U_SHAPE = [(0, 0), (60, 0), (60, 60), (40, 60), (40, 20), (20, 20), (20, 60), (0, 60)]
+
+
+def test_compound_pair_without_overlapping_pieces_has_no_contact_points():
+    cup = Polygon(0, 0, U_SHAPE)
+    assert cup.pieces
+    # 컵 안쪽 빈 곳: AABB는 겹치지만 조각과는 닿지 않음
+    ball = Circle(cup.center.x, cup.center.y + 15, 3)
+    entry = PairEntry(cup, ball)
+    assert collision_normal(cup, ball, entry) == (None, None)
+    assert entry.parts is None
+    assert find_contact_points(cup, ball, entry) is None
+    assert manifold_contact_points(cup, ball, Vector2D(0, 1), entry) is None
+
+
+def test_response_without_contact_points_does_not_raise():
+    box_1 = Rectangle(0, 0, 20, 20)
+    box_2 = Rectangle(0, 18, 20, 20)
+    box_2.velocity = Vector2D(0, -10)
+    response_with_rotation(box_2, box_1, Vector2D(0, 1), 2, [])
+    assert box_2.center.y - box_1.center.y >= 20 - 1e-9
+
+
+def test_ball_dropped_into_cup_comes_to_rest():
+    floor = Rectangle(0, -10, 400, 20, is_static=True)
+    cup = Polygon(0, 0, U_SHAPE)
+    cup.center = Vector2D(0, 30)
+    ball = Circle(cup.center.x, 120, 5)
+    scene = Scene([floor, cup, ball])
+    for _ in range(1500):
+        scene.step(1 / 360)
+    assert floor.get_aabb()[3] - 1 < cup.get_aabb()[1]
+    assert cup.get_aabb()[1] < ball.center.y
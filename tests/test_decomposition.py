@@ -0,0 +1,21 @@
+from components.decomposition import convex_decomposition, is_convex, signed_area
+
+U_SHAPE = [(0, 0), (60, 0), (60, 60), (40, 60), (40, 20), (20, 20), (20, 60), (0, 60)]
+
+
+def test_pieces_are_convex_and_cover_the_outline():
+    pieces = convex_decomposition(U_SHAPE)
+    assert len(pieces) > 1
+    assert all(is_convex(piece) for piece in pieces)
+    assert abs(sum(signed_area(piece) for piece in pieces) - signed_area(U_SHAPE)) < 1e-9
+
+
+def test_convex_and_clockwise_outlines():
+    square = [(0, 0), (0, 10), (10, 10), (10, 0)]
+    pieces = convex_decomposition(square)
+    assert len(pieces) == 1
+    assert signed_area(pieces[0]) > 0
+
+
+def test_self_intersecting_outline_is_rejected():
+    assert convex_decomposition([(-50, -50), (50, 50), (50, -50), (-50, 50)]) is None
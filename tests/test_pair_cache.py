@@ -0,0 +1,47 @@
+from components.broad_phase import SpatialHash
+from components.pair_cache import PairCache
+from components.scene import Scene
+from components.solver import ContactSolver
+from practice_code.body import Circle, Rectangle
+
+
+def _pile(pair_cache):
+    floor = Rectangle(200, -10, 600, 20, is_static=True)
+    boxes = [Rectangle(20 + (k % 8) * 34, 15 + (k // 8) * 30, 30, 30, mass=5) for k in range(12)]
+    return Scene([floor] + boxes, broad_phase=SpatialHash(40), solver=ContactSolver(), pair_cache=pair_cache)
+
+
+def _poses(scene):
+    return [(body.center.x, body.center.y, body.angle) for body in scene.bodies]
+
+
+def test_zero_tolerance_reproduces_the_uncached_run():
+    plain = _pile(None)
+    cached = _pile(PairCache(linear_tolerance=0, angular_tolerance=0))
+    for _ in range(240):
+        plain.step(1 / 360)
+        cached.step(1 / 360)
+    assert _poses(cached) == _poses(plain)
+
+
+def test_default_tolerance_hits_a_resting_pile_and_stays_close():
+    plain = _pile(None)
+    cache = PairCache()
+    cached = _pile(cache)
+    for _ in range(480):
+        plain.step(1 / 360)
+        cached.step(1 / 360)
+    assert cache.hits > cache.misses
+    for pose, other in zip(_poses(cached), _poses(plain)):
+        assert max(abs(a - b) for a, b in zip(pose, other)) < 1e-2
+
+
+def test_spinning_circles_hit_the_cache():
+    cache = PairCache()
+    floor = Rectangle(0, -10, 400, 20, is_static=True)
+    # Circle은 기본 angular_velocity가 1이라 매 step 각도가 바뀜
+    balls = [Circle(-100 + 30 * k, 10, 10) for k in range(8)]
+    scene = Scene([floor] + balls, gravity=0, pair_cache=cache)
+    for _ in range(60):
+        scene.step(1 / 360)
+    assert cache.hits > 10 * cache.misses
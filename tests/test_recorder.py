@@ -0,0 +1,26 @@
+import numpy as np
+
+from components.recorder import TrajectoryRecorder, body_states, read_trajectory
+from components.scene import Scene
+from practice_code.body import Circle, Rectangle
+
+
+def test_recorded_states_round_trip_bit_for_bit(tmp_path):
+    path = str(tmp_path / "run.trj")
+    floor = Rectangle(0, -10, 400, 20, is_static=True, name="floor")
+    scene = Scene([floor, Circle(0, 50, 5), Rectangle(30, 40, 20, 20)])
+    expected = []
+    with TrajectoryRecorder(path, chunk_frames=16) as recorder:
+        scene.recorder = recorder
+        for step in range(100):
+            scene.step(1 / 360)
+            expected.append(body_states(scene.bodies))
+            if step == 49:
+                scene.add(Circle(-40, 80, 6))
+
+    frames = list(read_trajectory(path))
+    assert [frame[0] for frame in frames] == list(range(1, 101))
+    for (_, _, bodies, states), states_expected in zip(frames, expected):
+        assert len(bodies) == len(states_expected)
+        assert np.array_equal(states.view(np.uint64), states_expected.view(np.uint64))
+    assert frames[0][2][0]["name"] == "floor"
@@ -0,0 +1,18 @@
+from components.scene import Scene
+from practice_code.body import Circle
+
+
+def test_advance_sheds_time_past_the_substep_cap():
+    scene = Scene([Circle(0, 0, 5)], fixed_dt=0.01, max_substeps=4)
+    assert scene.advance(0.105) == 4
+    assert scene._accumulator < scene.fixed_dt
+    assert scene.alpha < 1.0
+    # 다음 프레임은 그 프레임의 시간만큼만
+    assert scene.advance(0.01) == 1
+
+
+def test_advance_carries_leftover_time():
+    scene = Scene([Circle(0, 0, 5)], fixed_dt=0.01, max_substeps=8)
+    assert scene.advance(0.025) == 2
+    assert abs(scene.alpha - 0.5) < 1e-9
+    assert scene.advance(0.005) == 1
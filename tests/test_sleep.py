@@ -0,0 +1,48 @@
+from components.aabb_tree import AABBTree
+from components.broad_phase import SpatialHash
+from components.scene import Scene
+from components.sleep import SleepSystem
+from components.vector import Vector2D
+from practice_code.body import Circle, Rectangle
+
+
+def _stack(broad_phase=None):
+    floor = Rectangle(0, -10, 400, 20, is_static=True)
+    shelf = Rectangle(0, 60, 100, 10, is_static=True)
+    boxes = [Rectangle(-30 + 30 * k, 75, 20, 20) for k in range(3)]
+    scene = Scene([floor, shelf] + boxes, broad_phase=broad_phase, sleep=SleepSystem(), gravity=500)
+    for _ in range(2000):
+        scene.step(1 / 360)
+        if all(box.is_sleeping for box in boxes):
+            break
+    assert all(box.is_sleeping for box in boxes)
+    return scene, shelf, boxes
+
+
+def test_removing_a_shelf_wakes_what_slept_on_it():
+    for broad_phase in (None, SpatialHash(), AABBTree()):
+        scene, shelf, boxes = _stack(broad_phase)
+        scene.remove(shelf)
+        for _ in range(360):
+            scene.step(1 / 360)
+        assert all(box.center.y < 40 for box in boxes)
+
+
+def test_apply_force_wakes_a_sleeping_body():
+    scene, shelf, boxes = _stack()
+    boxes[0].apply_force(Vector2D(0, 5000))
+    scene.step(1 / 360)
+    assert not boxes[0].is_sleeping
+    assert boxes[0].velocity.y > 0
+
+
+def test_falling_body_wakes_the_island_it_lands_on():
+    scene, shelf, boxes = _stack()
+    ball = Circle(boxes[1].center.x, 150, 5)
+    ball.velocity = Vector2D(0, -200)
+    scene.add(ball)
+    for _ in range(180):
+        scene.step(1 / 360)
+        if not boxes[1].is_sleeping:
+            break
+    assert not boxes[1].is_sleeping
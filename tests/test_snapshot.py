@@ -0,0 +1,100 @@
+from components.aabb_tree import AABBTree
+from components.broad_phase import SpatialHash
+from components.scene import Scene
+from components.sleep import SleepSystem
+from components.snapshot import SnapshotReader, SnapshotWriter
+from components.vector import Vector2D
+from practice_code.body import Circle, Polygon, Rectangle
+
+
+def _states(scene):
+    return [(body.center.x, body.center.y, body.angle, body.velocity.x, body.velocity.y, body.angular_velocity,
+             body.is_sleeping) for body in scene.bodies]
+
+
+def _pile_scene(**options):
+    bodies = [Rectangle(0, -10, 400, 20, is_static=True, name="floor")]
+    for k in range(4):
+        bodies.append(Rectangle(-60 + 40 * k, 20 + 25 * k, 20, 20, name="box {}".format(k)))
+    bodies.append(Circle(10, 150, 8))
+    bodies.append(Polygon(70, 120, [(0, 0), (30, 0), (30, 30), (15, 10), (0, 30)]))
+    return Scene(bodies, **options)
+
+
+def test_round_trip(tmp_path):
+    scene = _pile_scene(broad_phase=SpatialHash())
+    for _ in range(100):
+        scene.step(1 / 360)
+    path = str(tmp_path / "pile.scn")
+    scene.save(path)
+
+    loaded = Scene.load(path, broad_phase=SpatialHash())
+    assert _states(loaded) == _states(scene)
+    assert [body.name for body in loaded.bodies] == [body.name for body in scene.bodies]
+    assert loaded.gravity == scene.gravity
+
+
+def test_replay_from_snapshot_is_identical(tmp_path):
+    scene = _pile_scene(broad_phase=AABBTree(), deterministic=True)
+    path = str(tmp_path / "run.scn")
+    with SnapshotWriter(path, scene) as writer:
+        for step in range(600):
+            scene.step(1 / 360)
+            writer.write(scene, step, step / 360)
+
+    reader = SnapshotReader(path)
+    assert len(reader) == 600
+    replay = reader.build_scene(199, broad_phase=AABBTree(), deterministic=True)
+    for step in range(200, 600):
+        replay.step(1 / 360)
+        frame = reader.frame(step)["bodies"]
+        assert [(body.center.x, body.center.y) for body in replay.bodies] == list(zip(frame["x"].tolist(),
+                                                                                    frame["y"].tolist()))
+
+
+def _sleeping_snapshot(tmp_path):
+    floor = Rectangle(0, -10, 400, 20, is_static=True)
+    lower = Rectangle(0, 10, 20, 20)
+    upper = Rectangle(0, 30, 20, 20)
+    scene = Scene([floor, lower, upper], sleep=SleepSystem())
+    for _ in range(2000):
+        scene.step(1 / 360)
+        if lower.is_sleeping and upper.is_sleeping:
+            break
+    assert lower.is_sleeping and upper.is_sleeping
+    path = str(tmp_path / "asleep.scn")
+    scene.save(path)
+    return SnapshotReader(path)
+
+
+def test_restored_sleepers_share_an_island_and_wake_on_force(tmp_path):
+    reader = _sleeping_snapshot(tmp_path)
+    scene = reader.build_scene(sleep=SleepSystem(), broad_phase=AABBTree())
+    floor, lower, upper = scene.bodies
+    assert lower.is_sleeping and upper.is_sleeping
+    assert scene.sleep.sleeping_count() == 2
+
+    upper.apply_force(Vector2D(0, 1000))
+    scene.step(1 / 360)
+    assert not lower.is_sleeping and not upper.is_sleeping
+
+
+def test_apply_moves_sleeping_bodies_in_the_broad_phase(tmp_path):
+    reader = _sleeping_snapshot(tmp_path)
+    tree = AABBTree()
+    scene = reader.build_scene(sleep=SleepSystem(), broad_phase=tree)
+    floor, lower, upper = scene.bodies
+    lower.center = Vector2D(150, 10)
+    upper.center = Vector2D(150, 30)
+    scene.step(1 / 360)
+
+    reader.apply(scene, -1)
+    assert lower.is_sleeping and upper.is_sleeping
+    assert set(tree.query((-5, 5, 5, 35))) >= {lower, upper}
+    assert not set(tree.query((145, 5, 155, 35))) & {lower, upper}
+
+
+def test_apply_without_sleep_system_restores_awake(tmp_path):
+    reader = _sleeping_snapshot(tmp_path)
+    scene = reader.build_scene()
+    assert not any(body.is_sleeping for body in scene.bodies)